@@ -0,0 +1,66 @@
+"""
+OmniaClick - Бенчмарк пачек кликов
+
+Достигнутая частота кликов и процессорное время на клик в обычном режиме
+ClickerEngine при разных размерах пачки. Ввод идет в RecordingInputBackend
+без записи событий, поэтому измеряются только накладные расходы цикла кликов.
+
+Примеры:
+    python -m benchmarks.burst_benchmark
+    python -m benchmarks.burst_benchmark --interval 0.001 --bursts 1,10,100 --duration 2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLICK_MODES
+from core.clicker import ClickerEngine
+from core.input_backend import RecordingInputBackend
+
+
+def run_engine(interval: float, burst_size: int, duration: float) -> dict:
+    """Прогон обычного режима; возвращает частоту кликов и CPU на клик"""
+    backend = RecordingInputBackend(record=False)
+    engine = ClickerEngine(input_backend=backend)
+    engine.set_click_mode(CLICK_MODES["NORMAL"])
+    engine.interval = interval
+    engine.set_burst_size(burst_size)
+
+    cpu_started = time.process_time()
+    engine.start_clicking()
+    time.sleep(duration)
+    stats = engine.get_scheduler_stats()
+    engine.stop_clicking()
+    cpu = time.process_time() - cpu_started
+
+    clicks = max(1, backend.clicks)
+    return {
+        "tick_rate": stats["rate"],
+        "click_rate": stats["click_rate"],
+        "clicks": backend.clicks,
+        "cpu_per_click_us": cpu / clicks * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Частота кликов OmniaClick при пачках")
+    parser.add_argument("--interval", type=float, default=0.001, help="Интервал между тактами (сек)")
+    parser.add_argument("--bursts", default="1,10,100", help="Размеры пачек через запятую")
+    parser.add_argument("--duration", type=float, default=1.0, help="Длительность каждого прогона (сек)")
+    args = parser.parse_args()
+
+    print(f"Интервал {args.interval * 1000:.2f} мс, прогон {args.duration:.1f} сек")
+    print(f"{'пачка':>6} {'тактов/сек':>11} {'кликов/сек':>11} {'кликов':>9} {'CPU мкс/клик':>13}")
+    for burst_size in (int(value) for value in args.bursts.split(",")):
+        result = run_engine(args.interval, burst_size, args.duration)
+        print(f"{burst_size:>6} {result['tick_rate']:>11.0f} {result['click_rate']:>11.0f} "
+              f"{result['clicks']:>9} {result['cpu_per_click_us']:>13.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+OmniaClick - Бенчмарк поиска
+
+Запуск поиска ColorDetector на записанных кадрах без живого рабочего стола.
+
+Примеры:
+    python -m benchmarks.detection_benchmark --frames recorded_session.npz --color "#ff0000"
+    python -m benchmarks.detection_benchmark --synthetic 1920x1080 --iterations 200
+    python -m benchmarks.detection_benchmark --frames session.npz --template button.png
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.replay_source import ReplayScreenSource
+from core.buffer_pool import FrameBufferPool, MemoryTracker
+from core.color_detection import ColorDetector
+from core.template_matcher import Template, TemplateMatcher
+from config import OPENCV_AVAILABLE
+
+
+def make_synthetic_session(size: tuple, frame_count: int = 10, seed: int = 0) -> tuple:
+    """Детерминированная сессия: шум с красным квадратом и "кнопкой" в разных местах
+
+    Returns:
+        tuple: (путь к сессии, путь к PNG шаблона кнопки)
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    button = rng.integers(0, 256, (24, 48, 3), dtype=np.uint8)
+    frames = []
+    for _ in range(frame_count):
+        frame = rng.integers(0, 200, (height, width, 3), dtype=np.uint8)
+        x = int(rng.integers(0, width - 20))
+        y = int(rng.integers(0, height - 20))
+        frame[y:y + 12, x:x + 12] = (255, 0, 0)
+        x = int(rng.integers(0, width - button.shape[1]))
+        y = int(rng.integers(0, height - button.shape[0]))
+        frame[y:y + button.shape[0], x:x + button.shape[1]] = button
+        frames.append(frame)
+    folder = tempfile.mkdtemp(prefix="omnia_bench_")
+    path = os.path.join(folder, "session.npz")
+    np.savez(path, frames=np.stack(frames), timestamps=np.arange(frame_count) / 30.0)
+    template_path = os.path.join(folder, "button.png")
+    Image.fromarray(button).save(template_path)
+    return path, template_path
+
+
+def run_benchmark(name: str, search, iterations: int, memory: MemoryTracker = None) -> dict:
+    """Многократный запуск поиска и сбор времени"""
+    timings = []
+    found_count = 0
+    search()  # прогрев
+    for _ in range(iterations):
+        started = time.perf_counter()
+        found, _ = search()
+        timings.append((time.perf_counter() - started) * 1000)
+        found_count += 1 if found else 0
+        if memory:
+            memory.maybe_sample()
+
+    timings.sort()
+    result = {
+        "name": name,
+        "iterations": iterations,
+        "found": found_count,
+        "mean_ms": statistics.mean(timings),
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+    print(f"{name:<32} mean {result['mean_ms']:8.2f} ms  median {result['median_ms']:8.2f} ms  "
+          f"p95 {result['p95_ms']:8.2f} ms  found {found_count}/{iterations}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска OmniaClick на записанных кадрах")
+    parser.add_argument("--frames", help="Папка с PNG/NPZ кадрами или файл сессии .npz")
+    parser.add_argument("--synthetic", default="1920x1080", help="Размер синтетических кадров WxH")
+    parser.add_argument("--mode", default="fast", choices=["realtime", "fixed", "fast"])
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--color", default="#ff0000")
+    parser.add_argument("--tolerance", type=int, default=10)
+    parser.add_argument("--min-size", type=int, default=10, help="Минимальный размер цели для грубой сетки")
+    parser.add_argument("--no-pool", action="store_true", help="Без пула буферов кадров")
+    parser.add_argument("--template", help="Шаблон для поиска изображения (для --frames)")
+    parser.add_argument("--confidence", type=float, default=0.8)
+    args = parser.parse_args()
+
+    path = args.frames
+    template_path = args.template
+    if not path:
+        width, height = (int(v) for v in args.synthetic.lower().split("x"))
+        path, template_path = make_synthetic_session((width, height))
+
+    source = ReplayScreenSource(path, mode=args.mode, fps=args.fps)
+    print(f"Кадры: {path} ({len(source.frames)} шт., {source.screen_size()[0]}x{source.screen_size()[1]})")
+    pool = None if args.no_pool else FrameBufferPool()
+    source.set_buffer_pool(pool)
+    memory = MemoryTracker(sample_interval=0.05)
+    memory.sample()
+
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color(args.color)
+    detector.set_tolerance(args.tolerance)
+
+    run_benchmark("color: full resolution", detector._search_color_in_image, args.iterations, memory)
+
+    detector.set_min_target_size(args.min_size)
+    run_benchmark(f"color: coarse-to-fine ({args.min_size}px)", detector._search_color_in_image, args.iterations, memory)
+    detector.set_min_target_size(0)
+
+    if template_path and OPENCV_AVAILABLE:
+        # Шаблон декодируется один раз, как в кэше шаблонов
+        template = Template.from_file(template_path)
+        matcher = TemplateMatcher()
+
+        def search_image():
+            with source.grab_frame() as frame:
+                result = matcher.match(frame, template, args.confidence)
+            return result["found"], result["position"]
+
+        for mode in ("gray", "color"):
+            matcher.set_mode(mode)
+            run_benchmark(f"image: matchTemplate ({mode})", search_image, args.iterations, memory)
+
+    print(f"Захват: {source.get_stats()}")
+    print(f"Память: {memory.get_stats()}")
+    if pool:
+        print(f"Пул буферов: {pool.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+OmniaClick - Бенчмарк накладных расходов цикла кликов
+
+Время одной итерации для каждого режима: прежняя цепочка if/elif с hasattr,
+импортами в цикле, DEBUG-выводом и сборкой key_mapping на каждое нажатие
+против шага режима, собранного при запуске (ClickerEngine._compile_step).
+Ввод идет в RecordingInputBackend без записи, детекторы заменены заглушками,
+которые сразу "находят" цель, - измеряется только сам цикл.
+
+Примеры:
+    python -m benchmarks.loop_benchmark
+    python -m benchmarks.loop_benchmark --iterations 200000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLICK_MODES
+from core.clicker import ClickerEngine
+from core.input_backend import RecordingInputBackend
+
+
+class StubTemplateStore:
+    """Кэш шаблонов, в котором есть любой файл"""
+
+    def exists(self, path) -> bool:
+        return True
+
+
+class StubDetector:
+    """Детектор, который всегда находит цель и кликает через бэкенд ввода"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.current_template = "template.png"
+        self.template_store = StubTemplateStore()
+
+    def find_and_click_color(self, click_type="left") -> bool:
+        self.backend.click((10, 10), click_type)
+        return True
+
+    def find_and_click_image(self, template_path=None, click_type="left") -> bool:
+        self.backend.click((10, 10), click_type)
+        return True
+
+
+def legacy_iteration(engine):
+    """Итерация прежнего _click_loop (без ожидания) - для сравнения"""
+    if engine.click_mode == CLICK_MODES["COLOR"]:
+        if hasattr(engine, 'color_detector'):
+            found = engine.color_detector.find_and_click_color(engine.click_type)
+            if found:
+                engine.click_count += 1
+                engine.status_publisher.publish_count(engine.click_count)
+    elif engine.click_mode == CLICK_MODES["IMAGE"]:
+        if hasattr(engine, 'image_processor'):
+            if hasattr(engine, 'image_sequence') and engine.image_sequence:
+                print(f"DEBUG: Найдена последовательность изображений, длина: {len(engine.image_sequence)}")
+                print(f"DEBUG: Первый элемент: {engine.image_sequence[0] if engine.image_sequence else 'Нет элементов'}")
+                if not hasattr(engine, 'current_image_index'):
+                    engine.current_image_index = 0
+                if not hasattr(engine, 'image_sequence_clicks'):
+                    engine.image_sequence_clicks = 0
+                if not hasattr(engine, 'image_sequence_repeat_count'):
+                    engine.image_sequence_repeat_count = 0
+                current_item = engine.image_sequence[engine.current_image_index]
+                template_path = current_item.get('path')
+                if not engine.image_processor.template_store.exists(template_path):
+                    engine.current_image_index = (engine.current_image_index + 1) % len(engine.image_sequence)
+                    return
+                found = engine.image_processor.find_and_click_image(template_path=template_path, click_type=engine.click_type)
+                if found:
+                    engine.image_sequence_clicks += 1
+                    engine.click_count += 1
+                    engine.status_publisher.publish_count(engine.click_count)
+                    if engine.image_sequence_clicks >= current_item.get('clicks', 1):
+                        engine.image_sequence_clicks = 0
+                        engine.current_image_index = (engine.current_image_index + 1) % len(engine.image_sequence)
+                        if engine.current_image_index == 0:
+                            engine.image_sequence_repeat_count += 1
+            else:
+                template_path = getattr(engine.image_processor, 'current_template', None)
+                if engine.image_processor.find_and_click_image(template_path=template_path, click_type=engine.click_type):
+                    engine.click_count += 1
+                    engine.status_publisher.publish_count(engine.click_count)
+    elif engine.click_mode == CLICK_MODES["KEYBOARD"]:
+        if hasattr(engine, 'keyboard_sequence') and engine.keyboard_sequence:
+            import numpy  # Как прежний import pyautogui в цикле: модуль уже загружен (без дисплея pyautogui не импортируется)
+            current_key_entry = engine.keyboard_sequence[engine.current_keyboard_index]
+            key = current_key_entry['key']
+            key_mapping = {
+                'enter': 'enter', 'esc': 'escape', 'space': 'space', 'tab': 'tab', 'shift': 'shift',
+                'ctrl': 'ctrl', 'alt': 'alt', 'backspace': 'backspace', 'delete': 'delete', 'home': 'home',
+                'end': 'end', 'page_up': 'pageup', 'page_down': 'pagedown', 'up': 'up', 'down': 'down',
+                'left': 'left', 'right': 'right', 'insert': 'insert', 'caps_lock': 'capslock'
+            }
+            if key.startswith('f') and len(key) >= 2:
+                try:
+                    num = int(key[1:])
+                    if 1 <= num <= 12:
+                        key = f'f{num}'
+                except:
+                    pass
+            if key.startswith('num_'):
+                suffix = key[4:]
+                if suffix.isdigit():
+                    key = f'num{suffix}'
+                elif suffix == 'enter':
+                    key = 'numpadenter'
+                elif suffix == 'plus':
+                    key = 'add'
+                elif suffix == 'minus':
+                    key = 'subtract'
+            key = key_mapping.get(key, key)
+            engine.input_backend.press(key)
+            engine.keyboard_sequence_presses += 1
+            engine.click_count += 1
+            engine.status_publisher.publish_count(engine.click_count)
+            if engine.keyboard_sequence_presses >= current_key_entry['presses']:
+                engine.keyboard_sequence_presses = 0
+                engine.current_keyboard_index = (engine.current_keyboard_index + 1) % len(engine.keyboard_sequence)
+    elif engine.click_mode == CLICK_MODES["SEQUENCE"]:
+        if hasattr(engine, 'sequence_points') and engine.sequence_points:
+            point = engine.sequence_points[engine.current_sequence_index]
+            import numpy  # Как прежний import pyautogui в цикле: модуль уже загружен (без дисплея pyautogui не импортируется)
+            engine.input_backend.click((point['x'], point['y']), engine.click_type)
+            engine.sequence_clicks += 1
+            if engine.sequence_clicks >= point.get('clicks', 1):
+                engine.sequence_clicks = 0
+                engine.current_sequence_index = (engine.current_sequence_index + 1) % len(engine.sequence_points)
+            engine.click_count += 1
+            engine.status_publisher.publish_count(engine.click_count)
+    else:
+        engine.input_backend.click(button=engine.click_type)
+        engine.click_count += 1
+        engine.status_publisher.publish_count(engine.click_count)
+
+
+def make_engine(mode: str) -> ClickerEngine:
+    """Движок в заданном режиме с бэкендом-записью и заглушками детекторов"""
+    backend = RecordingInputBackend(record=False)
+    engine = ClickerEngine(input_backend=backend)
+    detector = StubDetector(backend)
+    engine.set_color_detector(detector)
+    engine.set_image_processor(detector)
+    engine.set_keyboard_sequence([{'key': 'num_1', 'presses': 2}, {'key': 'page_up', 'presses': 1}, {'key': 'f5', 'presses': 1}])
+    engine.set_sequence_points([{'x': 10, 'y': 20, 'clicks': 2}, {'x': 30, 'y': 40, 'clicks': 1}])
+    if mode == "image_sequence":
+        engine.set_image_sequence([{'type': 'image', 'path': 'a.png', 'clicks': 2}, {'type': 'image', 'path': 'b.png', 'clicks': 1}])
+        engine.set_image_sequence_repeats(0)
+        mode = CLICK_MODES["IMAGE"]
+    engine.set_click_mode(mode)
+    return engine
+
+
+def run_legacy(mode: str, iterations: int) -> float:
+    """Микросекунд на итерацию прежнего цикла"""
+    engine = make_engine(mode)
+    engine.current_image_index = engine.image_sequence_clicks = engine.image_sequence_repeat_count = 0
+    # DEBUG-вывод уходит в память, а не в терминал (иначе замер зависит от консоли)
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            engine.memory_tracker.maybe_sample()
+            legacy_iteration(engine)
+        elapsed = time.perf_counter() - started
+    return elapsed / iterations * 1e6
+
+
+def run_compiled(mode: str, iterations: int) -> float:
+    """Микросекунд на итерацию цикла с собранным шагом (тело _click_loop без ожидания)"""
+    engine = make_engine(mode)
+    publish_count = engine.status_publisher.publish_count
+    step = engine._compile_step()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        engine.memory_tracker.maybe_sample()
+        clicks = step()
+        if clicks:
+            engine.click_count += clicks
+            publish_count(engine.click_count)
+    elapsed = time.perf_counter() - started
+    return elapsed / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Накладные расходы итерации цикла кликов OmniaClick по режимам")
+    parser.add_argument("--iterations", type=int, default=100000, help="Итераций на каждый прогон")
+    args = parser.parse_args()
+
+    modes = [CLICK_MODES["NORMAL"], CLICK_MODES["COLOR"], CLICK_MODES["IMAGE"], "image_sequence",
+             CLICK_MODES["KEYBOARD"], CLICK_MODES["SEQUENCE"]]
+    print(f"Итераций на прогон: {args.iterations}")
+    print(f"{'режим':>15} {'прежний мкс':>12} {'шаг мкс':>9} {'ускорение':>10}")
+    for mode in modes:
+        legacy = run_legacy(mode, args.iterations)
+        compiled = run_compiled(mode, args.iterations)
+        print(f"{mode:>15} {legacy:>12.2f} {compiled:>9.2f} {legacy / compiled:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+OmniaClick - Бенчмарк параллельного поиска шаблонов
+
+Время поиска одного шаблона на большом кадре (деление на полосы) и набора
+шаблонов в одном кадре (по шаблону на поток) при разном числе потоков.
+
+Примеры:
+    python -m benchmarks.parallel_benchmark
+    python -m benchmarks.parallel_benchmark --size 3840x2160 --templates 20 --workers 1,2,4,8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import OPENCV_AVAILABLE
+
+
+def make_scene(size: tuple, template_count: int, seed: int = 0) -> tuple:
+    """Шумный кадр и шаблоны, вставленные в него в разных местах
+
+    Returns:
+        tuple: (кадр RGB, список массивов шаблонов)
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    templates = []
+    for _ in range(template_count):
+        template = rng.integers(0, 256, (32, 48, 3), dtype=np.uint8)
+        x = int(rng.integers(0, width - template.shape[1]))
+        y = int(rng.integers(0, height - template.shape[0]))
+        frame[y:y + template.shape[0], x:x + template.shape[1]] = template
+        templates.append(template)
+    return frame, templates
+
+
+def time_call(call, iterations: int) -> float:
+    """Медианное время вызова в мс (после прогрева)"""
+    call()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масштабирование поиска шаблонов OmniaClick по числу потоков")
+    parser.add_argument("--size", default="2560x1440", help="Размер кадра WxH")
+    parser.add_argument("--templates", type=int, default=20, help="Число шаблонов в наборе")
+    parser.add_argument("--workers", help="Список числа потоков через запятую (по умолчанию 1..число ядер)")
+    parser.add_argument("--mode", default="gray", choices=["gray", "color"])
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    if not OPENCV_AVAILABLE:
+        print("OpenCV недоступен - бенчмарк невозможен")
+        return 1
+
+    from core.frame import Frame
+    from core.parallel_matcher import ParallelMatcher
+    from core.template_matcher import Template
+
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    frame_pixels, template_pixels = make_scene((width, height), args.templates)
+    templates = [Template(pixels) for pixels in template_pixels]
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(value) for value in args.workers.split(",")]
+    else:
+        worker_counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))) or [1]
+
+    print(f"Кадр {width}x{height}, шаблонов {len(templates)}, режим {args.mode}, ядер {cores}")
+    print(f"{'потоков':>8} {'1 шаблон, мс':>14} {'ускорение':>10} {'набор, мс':>12} {'ускорение':>10}")
+
+    baseline = None
+    reference = None
+    for workers in worker_counts:
+        # Предфильтр выключен: меряется именно matchTemplate по всему кадру
+        matcher = ParallelMatcher(workers=workers, mode=args.mode, prefilter=False)
+        frame = Frame(frame_pixels)
+        matcher.frame_plane(frame)
+
+        single_ms = time_call(lambda: matcher.match(frame, templates[0]), args.iterations)
+        batch_ms = time_call(lambda: matcher.match_many(frame, templates), args.iterations)
+
+        # Результат не должен зависеть от числа потоков
+        positions = [result["position"] for result in matcher.match_many(frame, templates)]
+        if reference is None:
+            reference = positions
+        elif positions != reference:
+            print(f"ВНИМАНИЕ: результаты при {workers} потоках отличаются от результатов при {worker_counts[0]}")
+
+        if baseline is None:
+            baseline = (single_ms, batch_ms)
+        print(f"{workers:>8} {single_ms:>14.1f} {baseline[0] / single_ms:>9.2f}x "
+              f"{batch_ms:>12.1f} {baseline[1] / batch_ms:>9.2f}x")
+        matcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
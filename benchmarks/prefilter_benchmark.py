@@ -0,0 +1,123 @@
+"""
+OmniaClick - Бенчмарк цветового предфильтра
+
+Время поиска шаблона с предфильтром и без него на кадре, похожем на интерфейс
+(однотонные панели с мелким шумом), на шумном кадре, где предфильтр уступает
+полному поиску, и на патче проверки позиции (шаблон с отступами), все в
+исходном формате mss (BGRA). Кадр каждый раз новый, поэтому в замер входит и
+перевод кадра в RGB, который нужен предфильтру.
+
+Примеры:
+    python -m benchmarks.prefilter_benchmark
+    python -m benchmarks.prefilter_benchmark --size 3840x2160 --mode color --iterations 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import OPENCV_AVAILABLE, VERIFY_IMAGE_MARGIN
+
+
+def make_scene(size: tuple, seed: int = 0) -> tuple:
+    """Кадр из цветных панелей с шумом и кнопка-шаблон в нем
+
+    Returns:
+        tuple: (кадр BGRA, шаблон RGB, (x, y) шаблона в кадре)
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    for top in range(0, height, 120):
+        for left in range(0, width, 160):
+            frame[top:top + 120, left:left + 160] = rng.integers(40, 200, 3)
+    frame = np.clip(frame.astype(np.int16) + rng.integers(-6, 7, frame.shape), 0, 255).astype(np.uint8)
+
+    template = np.empty((36, 96, 3), dtype=np.uint8)
+    template[:] = (30, 110, 220)
+    template[10:26, 12:40] = (250, 250, 250)
+    template[10:26, 56:84] = (240, 200, 20)
+    x, y = width * 2 // 3, height * 3 // 5
+    frame[y:y + template.shape[0], x:x + template.shape[1]] = template
+
+    bgra = np.empty((height, width, 4), dtype=np.uint8)
+    bgra[:, :, :3] = frame[:, :, ::-1]
+    bgra[:, :, 3] = 255
+    return bgra, template, (x, y)
+
+
+def make_noise(raw: np.ndarray, template: np.ndarray, position: tuple, seed: int = 1) -> np.ndarray:
+    """Кадр BGRA из шума с тем же шаблоном (кандидатов слишком много - предфильтр уступает полному поиску)"""
+    noise = np.random.default_rng(seed).integers(0, 256, raw.shape, dtype=np.uint8)
+    noise[:, :, 3] = 255
+    x, y = position
+    noise[y:y + template.shape[0], x:x + template.shape[1], :3] = template[:, :, ::-1]
+    return noise
+
+
+def time_search(matcher, raw: np.ndarray, template, iterations: int) -> tuple:
+    """Медианное время поиска в мс на новом кадре и результат последнего поиска"""
+    from core.frame import Frame
+
+    matcher.match(Frame(raw, order="BGRA"), template)
+    timings = []
+    for _ in range(iterations):
+        frame = Frame(raw, order="BGRA")
+        started = time.perf_counter()
+        result = matcher.match(frame, template)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result, dict(matcher.last_stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выигрыш цветового предфильтра OmniaClick")
+    parser.add_argument("--size", default="2560x1440", help="Размер кадра WxH")
+    parser.add_argument("--mode", default="gray", choices=["gray", "color"])
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    if not OPENCV_AVAILABLE:
+        print("OpenCV недоступен - бенчмарк невозможен")
+        return 1
+
+    from core.template_matcher import Template, TemplateMatcher
+
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    raw, template_pixels, (x, y) = make_scene((width, height))
+    template = Template(template_pixels)
+    margin = VERIFY_IMAGE_MARGIN
+    patch = np.ascontiguousarray(raw[y - margin:y + template.height + margin,
+                                     x - margin:x + template.width + margin])
+
+    scenes = (
+        ("экран", raw, None),
+        ("шум", make_noise(raw, template_pixels, (x, y)), None),
+        ("патч", patch, None),
+        # Патч без порога площади: так предфильтр работал до TEMPLATE_PREFILTER_MIN_AREA_RATIO
+        ("патч*", patch, 0),
+    )
+
+    print(f"Кадр {width}x{height} BGRA, шаблон {template.width}x{template.height}, режим {args.mode}")
+    print(f"{'кадр':>10} {'без, мс':>9} {'с предфильтром, мс':>19} {'ускорение':>10}  предфильтр")
+    for name, pixels, min_area_ratio in scenes:
+        full_ms, full, _ = time_search(TemplateMatcher(args.mode, prefilter=False), pixels, template,
+                                       args.iterations)
+        matcher = TemplateMatcher(args.mode, prefilter=True)
+        if min_area_ratio is not None:
+            matcher.prefilter.min_area_ratio = min_area_ratio
+        filtered_ms, filtered, stats = time_search(matcher, pixels, template, args.iterations)
+        if filtered["box"] != full["box"]:
+            print(f"ВНИМАНИЕ: предфильтр нашел {filtered['box']}, полный поиск {full['box']}")
+        print(f"{name:>10} {full_ms:>9.2f} {filtered_ms:>19.2f} {full_ms / filtered_ms:>9.2f}x  "
+              f"{stats['prefilter']} ({stats['candidates']} обл.)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
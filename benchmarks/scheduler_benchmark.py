@@ -0,0 +1,73 @@
+"""
+OmniaClick - Бенчмарк планировщика кликов
+
+Сравнение достигнутой частоты и джиттера: прежний цикл (работа + time.sleep(interval))
+и ClickScheduler с абсолютными сроками - только сон и сон с активным досыпанием.
+
+Примеры:
+    python -m benchmarks.scheduler_benchmark
+    python -m benchmarks.scheduler_benchmark --intervals 0.001,0.0001 --duration 2 --work-us 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CLICK_SPIN_BUDGET
+from core.click_scheduler import ClickScheduler
+
+
+def busy_work(seconds: float):
+    """Имитация работы итерации (клик, поиск) активным ожиданием"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run_sleep_loop(interval: float, duration: float, work: float) -> float:
+    """Прежний цикл: работа, затем time.sleep(interval); возвращает частоту"""
+    ticks = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        busy_work(work)
+        time.sleep(interval)
+        ticks += 1
+    return ticks / (time.perf_counter() - started)
+
+
+def run_scheduler(interval: float, duration: float, work: float, spin_budget: float) -> dict:
+    """Цикл на ClickScheduler; возвращает статистику планировщика"""
+    scheduler = ClickScheduler(spin_budget=spin_budget)
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        busy_work(work)
+        scheduler.wait_next(interval)
+    return scheduler.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Частота и джиттер планировщика кликов OmniaClick")
+    parser.add_argument("--intervals", default="0.01,0.001,0.0001", help="Интервалы через запятую (сек)")
+    parser.add_argument("--duration", type=float, default=1.0, help="Длительность каждого прогона (сек)")
+    parser.add_argument("--work-us", type=float, default=20.0, help="Работа итерации (мкс)")
+    parser.add_argument("--spin-budget", type=float, default=CLICK_SPIN_BUDGET)
+    args = parser.parse_args()
+
+    work = args.work_us / 1e6
+    print(f"Работа итерации {args.work_us:.0f} мкс, прогон {args.duration:.1f} сек, spin {args.spin_budget * 1000:.1f} мс")
+    print(f"{'интервал':>10} {'цель/сек':>10} {'sleep/сек':>10} {'сон/сек':>10} {'p99 мкс':>9} "
+          f"{'гибрид/сек':>11} {'p99 мкс':>9}")
+    for interval in (float(value) for value in args.intervals.split(",")):
+        legacy_rate = run_sleep_loop(interval, args.duration, work)
+        sleep_only = run_scheduler(interval, args.duration, work, 0.0)
+        hybrid = run_scheduler(interval, args.duration, work, args.spin_budget)
+        print(f"{interval:>10.4f} {1 / interval:>10.0f} {legacy_rate:>10.0f} {sleep_only['rate']:>10.0f} "
+              f"{sleep_only['jitter_p99_us']:>9.0f} {hybrid['rate']:>11.0f} {hybrid['jitter_p99_us']:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
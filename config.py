@@ -23,10 +23,105 @@ DEFAULT_COLOR_TOLERANCE = 10
 DEFAULT_IMAGE_CONFIDENCE = 0.8
 DEFAULT_RECHECK_INTERVAL = 50  # Интервал перепроверки кэша поиска
 
+# Векторизованный поиск цвета
+COLOR_SEARCH_STRATEGY = "first"  # Стратегия выбора совпадения по умолчанию
+COLOR_SEARCH_STRATEGIES = ["first", "nearest", "best"]  # first - как старый обход, nearest - ближе к прошлой позиции, best - минимальная разность
+DEFAULT_MIN_TARGET_SIZE = 0  # Минимальный размер цели (пикс.) для поиска по грубой сетке, 0 - полный перебор
+
+# Слежение за целью (поиск сначала рядом с последним попаданием)
+TRACKING_ENABLED = False
+TRACKING_INITIAL_WINDOW = 64  # Сторона первого окна вокруг последней позиции (пикс.)
+TRACKING_EXPANSION = 2.0  # Во сколько раз растет окно на каждом уровне
+TRACKING_MAX_LEVELS = 3  # Количество уровней окна перед полным поиском
+
+# Проверка сохраненной позиции по небольшому патчу вместо периодического полного поиска
+VERIFY_EVERY_CLICKS = 0  # Проверять каждые N кликов (1 - перед каждым кликом, 0 - выключено)
+VERIFY_COLOR_RADIUS = 2  # Радиус патча вокруг позиции цвета (пикс.)
+VERIFY_IMAGE_MARGIN = 3  # Запас вокруг рамки шаблона при проверке (пикс.)
+
+# Адаптивный интервал перепроверки (растет, пока цель на месте, и сокращается после промаха)
+ADAPTIVE_RECHECK_ENABLED = False
+ADAPTIVE_RECHECK_INITIAL = 4  # Начальный интервал (клики)
+ADAPTIVE_RECHECK_MIN = 1
+ADAPTIVE_RECHECK_MAX = 1000
+ADAPTIVE_RECHECK_GROWTH = 1.5  # Множитель после успешной проверки
+ADAPTIVE_RECHECK_SHRINK = 0.25  # Множитель после промаха
+ADAPTIVE_RECHECK_MOVE_SHRINK = 0.5  # Множитель, если цель сдвинулась
+
+# Поиск шаблонов (OpenCV matchTemplate)
+TEMPLATE_MATCH_MODE = "gray"  # gray - по яркости (быстрее), color - по трем каналам
+TEMPLATE_MATCH_MODES = ["gray", "color"]
+TEMPLATE_MATCH_METHOD = "ccoeff_normed"  # Метод сравнения (как у pyautogui.locate)
+TEMPLATE_MATCH_METHODS = ["ccoeff_normed", "ccorr_normed", "sqdiff_normed"]
+TEMPLATE_CACHE_MAX_MB = 64  # Бюджет памяти декодированных шаблонов
+TEMPLATE_STAT_INTERVAL = 1.0  # Как часто проверять mtime/размер файла шаблона (сек)
+TEMPLATE_MULTI_SCALE = False  # Поиск шаблона в нескольких масштабах (изменение DPI/масштаба интерфейса)
+TEMPLATE_SCALE_RANGE = (0.5, 2.0)  # Диапазон масштабов шаблона
+TEMPLATE_SCALE_STEP = 1.1  # Шаг сетки масштабов (множитель)
+TEMPLATE_PYRAMID_MIN_SIZE = 8  # Минимальная сторона шаблона на уменьшенном уровне пирамиды (пикс.)
+TEMPLATE_PYRAMID_MAX_LEVELS = 3  # Сколько раз кадр может уменьшаться вдвое для грубого прохода
+TEMPLATE_SCALED_CACHE_SIZE = 64  # Сколько масштабированных вариантов шаблона хранить (на шаблон)
+LOCATE_ALL_MAX_RESULTS = 100  # Максимум совпадений в режиме "найти все"
+LOCATE_ALL_NMS_OVERLAP = 0.3  # Перекрытие (IoU), при котором совпадения считаются одним объектом
+LOCATE_ALL_MAX_AGE = 2.0  # Сколько секунд список найденных целей считается актуальным для кликов
+
+# Цветовой предфильтр: matchTemplate только там, где стоят цвета характерных пикселей шаблона
+TEMPLATE_PREFILTER_ENABLED = False  # Включать, если benchmarks/prefilter_benchmark показывает выигрыш на ваших кадрах
+TEMPLATE_PREFILTER_MIN_AREA_RATIO = 64  # Кадр меньше N площадей шаблона (патчи проверки) ищется без предфильтра
+TEMPLATE_PREFILTER_PIXELS = 6  # Число характерных пикселей в подписи шаблона
+TEMPLATE_PREFILTER_TOLERANCE = 24  # Допуск цвета на канал
+TEMPLATE_PREFILTER_MAX_MISSES = 1  # Сколько пикселей подписи может не совпасть
+TEMPLATE_PREFILTER_MAX_COVERAGE = 0.25  # Доля кадра, выше которой выгоднее полный поиск
+TEMPLATE_PREFILTER_MAX_REGIONS = 64
+TEMPLATE_PREFILTER_CELL = 32  # Ячейка сетки, по которой сливаются близкие кандидаты (пикс.)
+
+# Параллельный поиск шаблонов (потоки; matchTemplate отпускает GIL)
+TEMPLATE_MATCH_WORKERS = 0  # 0 - по числу ядер, 1 - без параллельности
+TEMPLATE_MATCH_MIN_TILE_AREA = 250000  # Меньшие кадры не делятся на полосы (позиций шаблона)
+PARALLEL_MATCH_POLL_INTERVAL = 0.02  # Как часто ожидание полос проверяет отмену (сек)
+
+# Поиск в отдельных процессах (кадры передаются через разделяемую память)
+DETECTOR_PROCESSES = 0  # 0 - поиск в процессе приложения
+FRAME_BUS_SLOTS = 4  # Слотов кадров в разделяемой памяти
+DETECTOR_POOL_TIMEOUT = 2.0  # Сколько ждать результатов процессов (сек)
+DETECTOR_POOL_POLL_INTERVAL = 0.05  # Как часто ожидание результатов проверяет отмену (сек)
+
+# Срок поиска: долгий поиск прерывается и не задерживает цикл кликов и остановку
+SEARCH_TIMEOUT = 2.0  # Секунд на один поиск (0 - без срока)
+
+# Захват экрана
+SCREEN_CAPTURE_BACKEND = "auto"  # auto (mss, если доступен), mss, pyautogui, synthetic, replay
+SCREEN_REPLAY_PATH = "recorded_session.npz"  # Папка с PNG/NPZ кадрами или файл сессии для бэкенда replay
+SCREEN_REPLAY_MODE = "realtime"  # realtime, fixed, fast
+FRAME_CACHE_ENABLED = True  # Общий кадр для всех детекторов в пределах одного такта
+FRAME_CACHE_MAX_AGE = 0.005  # Окно свежести кэшированного кадра (сек)
+BACKGROUND_CAPTURE_ENABLED = False  # Фоновый поток захвата области поиска (COLOR и IMAGE режимы)
+CAPTURE_RING_SIZE = 3  # Количество кадров в кольцевом буфере фонового захвата
+CAPTURE_MAX_FPS = 120  # Ограничение частоты фонового захвата (0 - без ограничения)
+CAPTURE_MAX_STALENESS = 0.1  # Максимальный возраст кадра из фонового потока (сек)
+FRAME_BUFFER_POOL_ENABLED = True  # Переиспользование буферов кадров вместо выделения на каждый снимок
+FRAME_BUFFER_POOL_SIZE = 4  # Свободных буферов на каждый размер области
+MEMORY_SAMPLE_INTERVAL = 1.0  # Интервал замеров RSS во время кликов (сек)
+
 # Интервалы для режимов
 TURBO_INTERVAL = 0.001     # Турбо режим
 EXTREME_INTERVAL = 0.0001  # Экстремальный режим
 
+# Планировщик кликов (абсолютные сроки по монотонным часам)
+CLICK_SPIN_BUDGET = 0.002  # Последние N сек до срока - активное ожидание вместо сна (0 - только сон)
+CLICK_SCHEDULER_MAX_LAG = 0.05  # Отставание (сек), после которого сроки переносятся, а не догоняются
+CLICK_SCHEDULER_SLEEP_SLICE = 0.1  # Максимальный отрезок сна (проверка остановки)
+CLICK_SCHEDULER_SAMPLES = 1000  # Сколько последних пробуждений хранить для джиттера
+CLICK_BURST_SIZE = 1  # Кликов за один такт расписания в обычном режиме (1 - без пачек)
+MAX_CLICK_BURST_SIZE = 1000  # Ограничение размера пачки
+
+# Ввод (мышь и клавиатура)
+INPUT_BACKEND = "pyautogui"  # pyautogui, auto (win32, затем xtest, затем pyautogui), win32, xtest, uinput, null (запись без ввода)
+INPUT_EXTREME_BACKEND = "auto"  # Бэкенд экстремального режима, если основной бэкенд не low_latency (auto, win32, xtest, uinput)
+INPUT_RECORD_MAX_EVENTS = 100000  # Ограничение записи событий бэкенда null
+INPUT_FAILSAFE = True  # Курсор в углу экрана останавливает ввод (как pyautogui.FAILSAFE)
+INPUT_FAILSAFE_INTERVAL = 0.05  # Секунд между проверками угла экрана при кликах в текущей позиции
+
 # Настройки оверлеев
 OVERLAY_COLORS = {
     "SELECTION": "blue",    # Цвет динамического выбора
@@ -36,6 +131,9 @@ OVERLAY_COLORS = {
 OVERLAY_WIDTH = 2
 OVERLAY_ALPHA = 0.3
 
+# Обновление статуса и счетчика в интерфейсе и трее
+STATUS_REFRESH_RATE = 20  # Раз в секунду (поток кликов не обращается к интерфейсу напрямую)
+
 # Настройки мониторинга
 ENABLE_SYSTEM_MONITORING = True
 SHOW_WINDOW_CHANGES = False  # Показывать смену окон в статусе
@@ -62,6 +160,13 @@ except ImportError:
     OPENCV_AVAILABLE = False
     print("OpenCV недоступен - поиск изображений будет менее точным")
 
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+    print("mss недоступен - захват экрана через pyautogui будет медленнее")
+
 # Настройки GUI
 APP_NAME = "OmniaClick"
 APP_TITLE = "OmniaClick - Автокликер Pro v1.0"
@@ -3,10 +3,24 @@ Core модули автокликера
 Содержит основную логику работы приложения
 """
 
-from .clicker import ClickerEngine
-from .hotkeys import HotkeyManager  
-from .color_detection import ColorDetector
-from .image_processing import ImageProcessor
+import importlib
+
+# Модули загружаются при первом обращении: clicker и hotkeys тянут pyautogui и
+# keyboard, которым нужен дисплей, а бенчмаркам без дисплея они не нужны
+_LAZY_EXPORTS = {
+    'ClickerEngine': '.clicker',
+    'HotkeyManager': '.hotkeys',
+    'ColorDetector': '.color_detection',
+    'ImageProcessor': '.image_processing',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'ClickerEngine',
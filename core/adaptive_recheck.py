@@ -0,0 +1,93 @@
+"""
+Адаптивный интервал перепроверки
+Содержит AdaptiveRecheck - интервал проверки сохраненной позиции, который растет, пока
+цель стоит на месте, и резко сокращается после промаха или сдвига
+"""
+
+import threading
+from config import *
+
+
+class AdaptiveRecheck:
+    """Интервал перепроверки (в кликах), выученный отдельно для каждой цели
+
+    Исходы проверки:
+        ok     - цель на месте, интервал умножается на growth
+        moved  - цель сдвинулась, интервал умножается на move_shrink
+        missed - цель пропала или ушла далеко, интервал умножается на shrink
+
+    Все клики с прошлой успешной проверки до промаха считаются потерянными
+    (оценка сверху: цель могла пропасть в любой момент между проверками).
+    """
+
+    def __init__(self, initial: int = ADAPTIVE_RECHECK_INITIAL, min_interval: int = ADAPTIVE_RECHECK_MIN,
+                 max_interval: int = ADAPTIVE_RECHECK_MAX, growth: float = ADAPTIVE_RECHECK_GROWTH,
+                 shrink: float = ADAPTIVE_RECHECK_SHRINK, move_shrink: float = ADAPTIVE_RECHECK_MOVE_SHRINK):
+        self.initial = initial
+        self.min_interval = max(1, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.growth = growth
+        self.shrink = shrink
+        self.move_shrink = move_shrink
+        self._targets = {}  # ключ цели -> статистика и текущий интервал
+        self._lock = threading.Lock()
+
+    def _target(self, key) -> dict:
+        target = self._targets.get(key)
+        if target is None:
+            target = {
+                "interval": float(min(self.max_interval, max(self.min_interval, self.initial))),
+                "ok": 0,
+                "moved": 0,
+                "missed": 0,
+                "clicks": 0,
+                "wasted_clicks": 0,
+            }
+            self._targets[key] = target
+        return target
+
+    def interval(self, key) -> int:
+        """Текущий интервал перепроверки цели в кликах"""
+        with self._lock:
+            return int(self._target(key)["interval"])
+
+    def record(self, key, outcome: str, clicks: int):
+        """
+        Учет исхода проверки
+
+        Args:
+            key: Цель (путь шаблона, цвет и т.п.)
+            outcome: "ok", "moved" или "missed"
+            clicks: Клики по сохраненной позиции с прошлой проверки
+        """
+        factor = {"ok": self.growth, "moved": self.move_shrink, "missed": self.shrink}[outcome]
+        with self._lock:
+            target = self._target(key)
+            target[outcome] += 1
+            target["clicks"] += clicks
+            if outcome == "missed":
+                target["wasted_clicks"] += clicks
+            interval = target["interval"] * factor
+            target["interval"] = min(float(self.max_interval), max(float(self.min_interval), interval))
+
+    def reset(self, key=None):
+        """Сброс выученного интервала одной цели или всех"""
+        with self._lock:
+            if key is None:
+                self._targets.clear()
+            else:
+                self._targets.pop(key, None)
+
+    def get_stats(self, key=None) -> dict:
+        """Текущий интервал и исходы проверок (для одной цели или сумма по всем)"""
+        with self._lock:
+            if key is not None:
+                target = dict(self._target(key))
+                target["interval"] = int(target["interval"])
+                return target
+            totals = {"targets": len(self._targets), "ok": 0, "moved": 0, "missed": 0,
+                      "clicks": 0, "wasted_clicks": 0}
+            for target in self._targets.values():
+                for name in ("ok", "moved", "missed", "clicks", "wasted_clicks"):
+                    totals[name] += target[name]
+            return totals
@@ -0,0 +1,205 @@
+"""
+Пул буферов кадров
+Содержит FrameBufferPool - набор переиспользуемых буферов под размер области поиска,
+и MemoryTracker для контроля пикового и установившегося потребления памяти
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+import numpy as np
+from config import *
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+class FrameBuffer:
+    """Буфер, выданный пулом
+
+    Владелец (обычно Frame) вызывает release(), чтобы вернуть буфер в пул.
+    Буфер, который так и не был освобожден, просто собирается сборщиком мусора.
+    """
+
+    def __init__(self, pool, array: np.ndarray):
+        self.pool = pool
+        self.array = array
+
+    def release(self):
+        """Возврат буфера в пул (повторный вызов ничего не делает)"""
+        if self.array is not None:
+            self.pool._give_back(self)
+
+
+class FrameBufferPool:
+    """Пул буферов кадров, сгруппированных по форме (размеру области)"""
+
+    def __init__(self, max_free_per_shape: int = FRAME_BUFFER_POOL_SIZE):
+        self.max_free_per_shape = max_free_per_shape
+        self._free = {}  # (shape, dtype) -> [np.ndarray]
+        self._lock = threading.Lock()
+
+        # Статистика
+        self.allocations = 0
+        self.reuses = 0
+        self.outstanding = 0
+        self.peak_outstanding = 0
+        self.bytes_allocated = 0
+
+    def acquire(self, shape: tuple, dtype=np.uint8) -> FrameBuffer:
+        """Получение буфера нужной формы (из пула или новый); содержимое не очищается"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            array = free.pop() if free else None
+            if array is not None:
+                self.reuses += 1
+            else:
+                self.allocations += 1
+            self.outstanding += 1
+            self.peak_outstanding = max(self.peak_outstanding, self.outstanding)
+
+        if array is None:
+            array = np.empty(shape, dtype=dtype)
+            with self._lock:
+                self.bytes_allocated += array.nbytes
+        else:
+            array.flags.writeable = True
+        return FrameBuffer(self, array)
+
+    def _give_back(self, buffer: FrameBuffer):
+        """Возврат буфера в пул"""
+        with self._lock:
+            array = buffer.array
+            if array is None:
+                return
+            buffer.array = None
+            key = (array.shape, array.dtype.str)
+            self.outstanding -= 1
+            free = self._free.setdefault(key, [])
+            if len(free) < self.max_free_per_shape:
+                free.append(array)
+            else:
+                self.bytes_allocated -= array.nbytes
+
+    def clear(self):
+        """Освобождение всех свободных буферов"""
+        with self._lock:
+            for free in self._free.values():
+                for array in free:
+                    self.bytes_allocated -= array.nbytes
+            self._free.clear()
+
+    def get_stats(self) -> dict:
+        """Статистика пула"""
+        with self._lock:
+            requests = self.allocations + self.reuses
+            return {
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+                "reuse_rate": self.reuses / requests if requests else 0.0,
+                "outstanding": self.outstanding,
+                "peak_outstanding": self.peak_outstanding,
+                "free_buffers": sum(len(free) for free in self._free.values()),
+                "pooled_mb": self.bytes_allocated / (1024 * 1024),
+            }
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_buffer_pool() -> FrameBufferPool:
+    """Общий пул буферов кадров"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = FrameBufferPool()
+        return _default_pool
+
+
+def get_rss() -> tuple:
+    """
+    Текущий и пиковый размер резидентной памяти процесса в байтах
+
+    Returns:
+        tuple: (current, peak); неизвестные значения - None
+    """
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process().memory_info()
+        peak = getattr(info, "peak_wset", None)  # Только Windows
+        return info.rss, peak
+
+    current = None
+    peak = None
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux отдает килобайты, macOS - байты
+        if sys.platform != "darwin":
+            peak *= 1024
+    except ImportError:
+        pass
+    return current, peak
+
+
+class MemoryTracker:
+    """Периодические замеры RSS для проверки, что долгие прогоны не растут"""
+
+    def __init__(self, sample_interval: float = MEMORY_SAMPLE_INTERVAL, max_samples: int = 600):
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.reset()
+
+    def reset(self):
+        """Сброс замеров"""
+        self.samples = []
+        self.start_rss = None
+        self.peak_rss = 0
+        self._last_sample = 0.0
+
+    def maybe_sample(self):
+        """Замер, если с прошлого прошло не меньше sample_interval"""
+        now = time.perf_counter()
+        if now - self._last_sample >= self.sample_interval:
+            self._last_sample = now
+            self.sample()
+
+    def sample(self):
+        """Замер текущего RSS"""
+        current, peak = get_rss()
+        if current is None:
+            return
+        if self.start_rss is None:
+            self.start_rss = current
+        self.peak_rss = max(self.peak_rss, current, peak or 0)
+        self.samples.append(current)
+        if len(self.samples) > self.max_samples:
+            del self.samples[0]
+
+    def get_stats(self) -> dict:
+        """Стартовый, текущий, пиковый и установившийся RSS в мегабайтах"""
+        megabyte = 1024 * 1024
+        if not self.samples:
+            return {"available": False}
+        # Установившийся уровень - медиана второй половины замеров
+        tail = self.samples[len(self.samples) // 2:]
+        return {
+            "available": True,
+            "start_mb": self.start_rss / megabyte,
+            "current_mb": self.samples[-1] / megabyte,
+            "peak_mb": self.peak_rss / megabyte,
+            "steady_mb": statistics.median(tail) / megabyte,
+            "growth_mb": (statistics.median(tail) - self.start_rss) / megabyte,
+            "samples": len(self.samples),
+        }
@@ -0,0 +1,73 @@
+"""
+Сроки и отмена поиска
+Содержит CancelToken - флаг отмены, который выставляет остановка кликера, и
+Deadline - срок поиска вместе с токеном, проверяемый между этапами поиска
+"""
+
+import threading
+import time
+
+
+class SearchInterrupted(Exception):
+    """Поиск прерван: reason - "cancelled" (отмена) или "timeout" (истек срок)"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """Потокобезопасный флаг отмены поиска"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Отмена всех поисков, проверяющих этот токен"""
+        self._event.set()
+
+    def reset(self):
+        """Сброс отмены перед новым запуском"""
+        self._event.clear()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class Deadline:
+    """Срок поиска по монотонным часам и (необязательно) токен отмены
+
+    check() вызывается между этапами поиска (уровни пирамиды, полосы кадра,
+    шаблоны, окна слежения) и бросает SearchInterrupted, если поиск пора прервать.
+    """
+
+    def __init__(self, seconds: float = None, token: CancelToken = None):
+        self.expires = time.monotonic() + seconds if seconds else None
+        self.token = token
+
+    def remaining(self):
+        """Секунд до срока (None - срока нет)"""
+        if self.expires is None:
+            return None
+        return max(0.0, self.expires - time.monotonic())
+
+    def reason(self):
+        """Причина прерывания или None, если поиск можно продолжать"""
+        if self.token is not None and self.token.cancelled:
+            return "cancelled"
+        if self.expires is not None and time.monotonic() >= self.expires:
+            return "timeout"
+        return None
+
+    def check(self):
+        """Прерывание поиска, если он отменен или истек срок"""
+        reason = self.reason()
+        if reason:
+            raise SearchInterrupted(reason)
+
+
+def check_deadline(deadline: Deadline = None):
+    """Проверка срока, если он задан"""
+    if deadline is not None:
+        deadline.check()
@@ -0,0 +1,200 @@
+"""
+Фоновый захват экрана
+Содержит BackgroundCaptureSource - поток-производитель, который непрерывно захватывает
+область поиска в кольцевой буфер заранее выделенных кадров
+"""
+
+import threading
+import time
+import numpy as np
+from config import *
+from .screen_source import ScreenSource
+from .frame import Frame
+
+
+class BackgroundCaptureSource(ScreenSource):
+    """Источник кадров с фоновым потоком захвата
+
+    Производитель пишет в слот кольцевого буфера, который не совпадает ни с последним
+    опубликованным кадром, ни с кадрами, которыми еще владеют потребители, после чего
+    публикует его одним присваиванием. Слот принадлежит кадру Frame: кольцо держит
+    одну ссылку, каждый потребитель и каждая вырезка - свою (retain/release), и
+    производитель не трогает слот, пока на его кадр есть ссылки кроме кольца.
+    Потребители не берут блокировок.
+    """
+
+    def __init__(self, source: ScreenSource, region: tuple = None,
+                 ring_size: int = CAPTURE_RING_SIZE, max_fps: float = CAPTURE_MAX_FPS,
+                 max_staleness: float = CAPTURE_MAX_STALENESS):
+        super().__init__()
+        self.source = source
+        self.name = f"background:{source.name}"
+        self.region = tuple(int(v) for v in region) if region else None
+        self.ring_size = max(3, ring_size)
+        self.max_fps = max_fps
+        self.max_staleness = max_staleness
+
+        # Кольцевой буфер: слоты выделяются по размеру первого кадра
+        self._slots = None
+        self._frames = None  # Последний кадр каждого слота (кольцо держит на него одну ссылку)
+        self._latest = None  # (индекс слота, Frame поверх слота)
+
+        self.running = False
+        self.capture_thread = None
+        self._first_frame = threading.Event()
+
+        # Статистика
+        self.frames_produced = 0
+        self.frames_consumed = 0
+        self.fallback_captures = 0
+        self._started_at = 0.0
+
+    def start(self) -> bool:
+        """Запуск потока захвата"""
+        if self.running:
+            return False
+        self.running = True
+        self._first_frame.clear()
+        self._started_at = time.perf_counter()
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.capture_thread.start()
+        return True
+
+    def stop(self):
+        """Остановка потока захвата"""
+        if not self.running:
+            return
+        self.running = False
+        if self.capture_thread and self.capture_thread.is_alive():
+            self.capture_thread.join(timeout=1.0)
+        self.capture_thread = None
+
+    def _capture_loop(self):
+        """Цикл производителя"""
+        frame_interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+
+        while self.running:
+            started = time.perf_counter()
+            try:
+                with self.source.grab_frame(self.region) as captured:
+                    raw = captured.raw
+
+                    if self._slots is None or self._slots[0].shape != raw.shape:
+                        # Старые слоты остаются у кадров, которыми еще владеют потребители
+                        self._slots = [np.empty_like(raw) for _ in range(self.ring_size)]
+                        self._frames = [None] * self.ring_size
+                        self._latest = None
+
+                    index = self._next_slot()
+                    if index is None:
+                        # Всеми слотами владеют потребители - кадр пропускается
+                        time.sleep(0.001)
+                        continue
+                    previous = self._frames[index]
+                    if previous is not None:
+                        previous.release()
+
+                    # Копия в слот кольца; буфер снимка сразу возвращается в пул
+                    np.copyto(self._slots[index], raw)
+                    view = self._slots[index].view()
+                    view.flags.writeable = False
+                    frame = Frame(view, captured.left, captured.top, captured.timestamp, captured.order)
+                    self._frames[index] = frame
+
+                # Публикация кадра - одно атомарное присваивание
+                self._latest = (index, frame)
+                self.frames_produced += 1
+                self._first_frame.set()
+
+            except Exception as e:
+                print(f"Ошибка фонового захвата: {e}")
+                time.sleep(0.1)
+                continue
+
+            if frame_interval:
+                remaining = frame_interval - (time.perf_counter() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+    def _next_slot(self):
+        """Свободный слот: не последний опубликованный и без владельцев кроме кольца (None - свободных нет)"""
+        latest = self._latest
+        start = latest[0] + 1 if latest is not None else 0
+        for offset in range(self.ring_size):
+            index = (start + offset) % self.ring_size
+            if latest is not None and index == latest[0]:
+                continue
+            frame = self._frames[index]
+            if frame is None or frame.refs <= 1:
+                return index
+        return None
+
+    def latest(self, wait: float = 0.0):
+        """
+        Последний захваченный кадр
+
+        Кадр содержит время захвата (timestamp) и общий для всех потребителей
+        кэш производных плоскостей. Вызывающий становится владельцем кадра и
+        должен освободить его через release() (или with) - до этого слот кадра
+        не перезаписывается.
+
+        Args:
+            wait: Сколько ждать первый кадр, если его еще нет (сек)
+
+        Returns:
+            Frame или None
+        """
+        if self._latest is None and wait > 0:
+            self._first_frame.wait(wait)
+        while True:
+            latest = self._latest
+            if latest is None:
+                return None
+            frame = latest[1].retain()
+            # Производитель никогда не пишет в последний опубликованный слот, поэтому
+            # если после retain кадр все еще последний - слот уже защищен ссылкой
+            if self._latest is latest:
+                break
+            frame.release()
+
+        self.frames_consumed += 1
+        return frame
+
+    def grab_frame(self, region: tuple = None):
+        """Последний кадр (или его вырезка), либо прямой захват, если кадр не подходит"""
+        if self.running:
+            frame = self.latest(wait=self.max_staleness)
+            if frame is not None:
+                if frame.age <= self.max_staleness:
+                    if region is None and self.region is None:
+                        return frame
+                    if region is not None:
+                        cropped = frame.crop(region)
+                        if cropped is not None:
+                            frame.release()
+                            return cropped
+                frame.release()
+
+        self.fallback_captures += 1
+        return self.source.grab_frame(region)
+
+    def screen_size(self) -> tuple:
+        return self.source.screen_size()
+
+    def close(self):
+        self.stop()
+
+    def get_stats(self) -> dict:
+        """Статистика производителя и потребителей"""
+        stats = self.source.get_stats()
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        latest = self._latest
+        stats.update({
+            "backend": self.name,
+            "frames_produced": self.frames_produced,
+            "frames_consumed": self.frames_consumed,
+            "fallback_captures": self.fallback_captures,
+            "capture_fps": self.frames_produced / elapsed if elapsed > 0 else 0.0,
+            "frame_age_ms": latest[1].age * 1000 if latest else None,
+        })
+        return stats
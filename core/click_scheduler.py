@@ -0,0 +1,102 @@
+"""
+Планировщик кликов по абсолютным срокам
+Содержит ClickScheduler - ожидание следующего клика по монотонным часам
+со сном и точным досыпанием в активном ожидании (spin)
+"""
+
+import time
+from collections import deque
+from config import *
+
+
+class ClickScheduler:
+    """Расписание кликов: срок i-го клика = старт + i * interval
+
+    Работа между кликами (поиск, сам клик) не добавляется к интервалу: ожидание
+    идет до абсолютного срока, а не interval секунд после работы. Большую часть
+    ожидания поток спит, последние spin_budget секунд крутится на perf_counter,
+    потому что time.sleep просыпается с опозданием в десятки-сотни микросекунд.
+
+    Если цикл отстал больше чем на max_lag секунд (долгий поиск, пауза), сроки
+    переносятся на текущее время - пропущенные клики не догоняются пачкой.
+    """
+
+    def __init__(self, spin_budget: float = CLICK_SPIN_BUDGET, max_lag: float = CLICK_SCHEDULER_MAX_LAG,
+                 samples: int = CLICK_SCHEDULER_SAMPLES):
+        self.spin_budget = max(0.0, spin_budget)
+        self.max_lag = max_lag
+        self._lateness = deque(maxlen=samples)  # Опоздание пробуждения относительно срока (сек)
+        self.start()
+
+    def start(self):
+        """Начало расписания с текущего момента (со сбросом статистики)"""
+        now = time.perf_counter()
+        self.started = now
+        self.deadline = now
+        self.ticks = 0
+        self.rebased = 0
+        self.last_tick = now
+        self._lateness.clear()
+
+    def rebase(self):
+        """Перенос расписания на текущее время (после паузы)"""
+        self.deadline = time.perf_counter()
+
+    def wait_next(self, interval: float, running=None) -> bool:
+        """
+        Ожидание срока следующего клика
+
+        Args:
+            interval: Интервал между кликами (читается на каждом шаге, поэтому
+                      изменение интервала применяется сразу)
+            running: Функция без аргументов; ожидание прерывается, когда она вернет False
+
+        Returns:
+            bool: True - срок наступил, False - ожидание прервано
+        """
+        self.deadline += interval
+        now = time.perf_counter()
+        if now - self.deadline > self.max_lag:
+            self.deadline = now
+            self.rebased += 1
+
+        # Сон частями, чтобы длинный интервал не задерживал остановку
+        while True:
+            remaining = self.deadline - time.perf_counter() - self.spin_budget
+            if remaining <= 0:
+                break
+            if running is not None and not running():
+                return False
+            time.sleep(min(remaining, CLICK_SCHEDULER_SLEEP_SLICE))
+
+        # Точное досыпание до срока
+        deadline = self.deadline
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+
+        self._lateness.append(now - deadline)
+        self.ticks += 1
+        self.last_tick = now
+        return True
+
+    def get_stats(self) -> dict:
+        """Достигнутая частота и джиттер (опоздание пробуждения) в микросекундах"""
+        elapsed = self.last_tick - self.started
+        lateness = sorted(self._lateness)
+        stats = {
+            "ticks": self.ticks,
+            "rate": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "rebased": self.rebased,
+            "jitter_mean_us": 0.0,
+            "jitter_p50_us": 0.0,
+            "jitter_p99_us": 0.0,
+            "jitter_max_us": 0.0,
+        }
+        if lateness:
+            stats["jitter_mean_us"] = sum(lateness) / len(lateness) * 1e6
+            stats["jitter_p50_us"] = lateness[len(lateness) // 2] * 1e6
+            stats["jitter_p99_us"] = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))] * 1e6
+            stats["jitter_max_us"] = lateness[-1] * 1e6
+        return stats
@@ -6,19 +6,41 @@
 import threading
 import time
 import os
-import pyautogui
 from config import *
+from .screen_source import get_screen_source
+from .capture_thread import BackgroundCaptureSource
+from .buffer_pool import MemoryTracker, get_buffer_pool
+from .click_scheduler import ClickScheduler
+from .input_backend import create_input_backend, get_input_backend
+from .status_publisher import StatusPublisher
+
+# Имена клавиш из настроек -> имена бэкенда ввода
+KEY_ALIASES = {
+    'esc': 'escape',
+    'page_up': 'pageup',
+    'page_down': 'pagedown',
+    'caps_lock': 'capslock',
+    'num_enter': 'numpadenter',
+    'num_plus': 'add',
+    'num_minus': 'subtract',
+}
+
+
+def resolve_key(key: str) -> str:
+    """Имя клавиши для бэкенда ввода ("num_1" -> "num1", "f05" -> "f5", "page_up" -> "pageup")"""
+    if key in KEY_ALIASES:
+        return KEY_ALIASES[key]
+    if key.startswith('num_') and key[4:].isdigit():
+        return f'num{key[4:]}'
+    if key.startswith('f') and key[1:].isdigit() and 1 <= int(key[1:]) <= 12:
+        return f'f{int(key[1:])}'
+    return key
 
-try:
-    import win32api
-    import win32con
-except ImportError:
-    pass
 
 class ClickerEngine:
     """Основной движок для выполнения кликов"""
     
-    def __init__(self):
+    def __init__(self, input_backend=None):
         self.clicking = False
         self.click_thread = None
         self.click_count = 0
@@ -29,28 +51,46 @@ class ClickerEngine:
         self.click_type = DEFAULT_CLICK_TYPE
         self.turbo_mode = False
         self.extreme_mode = False
+        self.burst_size = CLICK_BURST_SIZE  # Кликов за такт в обычном режиме
         
         # Режимы кликов
         self.click_mode = CLICK_MODES["NORMAL"]
         
+        # Фоновый захват экрана
+        self.background_capture = BACKGROUND_CAPTURE_ENABLED
+        self.capture_source = None
+        self._capture_detector = None
+        self._previous_detector_source = None
+        
+        # Контроль памяти во время кликов
+        self.memory_tracker = MemoryTracker()
+        
+        # Расписание кликов по абсолютным срокам
+        self.scheduler = ClickScheduler()
+        
+        # Бэкенд ввода (мышь и клавиатура; None - общий бэкенд приложения)
+        self.input_backend = input_backend or get_input_backend()
+        self._extreme_backend = None  # Бэкенд экстремального режима (None - еще не создан, False - недоступен)
+        
+        # Детекторы и последовательности режимов
+        self.color_detector = None
+        self.image_processor = None
+        self.keyboard_sequence = []
+        self.sequence_points = []
+        self.image_sequence = []
+        self.image_sequence_repeats = 1
+        
+        # Шаг текущего режима (собирается при запуске; None - собрать заново)
+        self._step = None
+        
         # Переменные для последовательностей
         self.current_keyboard_index = 0
         self.keyboard_sequence_presses = 0
         self.current_sequence_index = 0
         self.sequence_clicks = 0
         
-        # Настройка pyautogui
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0
-        
-        # Коллбэки для обновления UI
-        self.on_click_callback = None
-        self.on_status_change_callback = None
-        
-    def set_callbacks(self, on_click=None, on_status_change=None):
-        """Установка коллбэков для обновления UI"""
-        self.on_click_callback = on_click
-        self.on_status_change_callback = on_status_change
+        # Статус и счетчик для UI (интерфейс забирает их сам в своем потоке)
+        self.status_publisher = StatusPublisher()
         
     def start_clicking(self):
         """Запуск кликера"""
@@ -66,13 +106,23 @@ class ClickerEngine:
         self.current_sequence_index = 0
         self.sequence_clicks = 0
         # Сброс переменных последовательности изображений
-        if hasattr(self, 'image_sequence'):
-            self.current_image_index = 0
-            self.image_sequence_clicks = 0
-            self.image_sequence_repeat_count = 0
+        self.current_image_index = 0
+        self.image_sequence_clicks = 0
+        self.image_sequence_repeat_count = 0
+        
+        self.status_publisher.publish_count(0)
+        self.status_publisher.publish_status("running")
+            
+        # Поиск снова разрешен после отмены прошлой остановкой
+        for detector in self._detectors():
+            detector.reset_cancel()
+            
+        self._start_background_capture()
+        
+        self._step = self._compile_step()
         
-        if self.on_status_change_callback:
-            self.on_status_change_callback("running")
+        self.memory_tracker.reset()
+        self.memory_tracker.sample()
             
         self.click_thread = threading.Thread(target=self._click_loop, daemon=True)
         self.click_thread.start()
@@ -85,13 +135,74 @@ class ClickerEngine:
             
         self.clicking = False
         
-        if self.on_status_change_callback:
-            self.on_status_change_callback("stopped")
+        # Прерываем текущий поиск, чтобы поток кликов не ждал его окончания
+        for detector in self._detectors():
+            detector.cancel_search()
+        
+        self.status_publisher.publish_status("stopped")
             
-        if self.click_thread and self.click_thread.is_alive():
+        if (self.click_thread and self.click_thread.is_alive() and
+                self.click_thread is not threading.current_thread()):
             self.click_thread.join(timeout=1.0)
+            
+        self._stop_background_capture()
+        
+        stats = self.get_scheduler_stats()
+        if stats["ticks"]:
+            burst = f" (пачки по {stats['burst_size']}, {stats['rate']:.1f} пачек/сек)" if stats["burst_size"] > 1 else ""
+            print(f"Частота кликов: {stats['click_rate']:.1f}/сек{burst}, джиттер p50 {stats['jitter_p50_us']:.0f} мкс, "
+                  f"p99 {stats['jitter_p99_us']:.0f} мкс")
         return True
         
+    def set_background_capture(self, enabled):
+        """Включение/выключение фонового потока захвата"""
+        self.background_capture = enabled
+        
+    def _detectors(self) -> list:
+        """Все подключенные детекторы (цвет и изображение)"""
+        return [detector for detector in (self.color_detector, self.image_processor) if detector is not None]
+        
+    def _get_detector(self):
+        """Детектор текущего режима, которому нужен захват экрана"""
+        if self.click_mode == CLICK_MODES["COLOR"]:
+            return self.color_detector
+        if self.click_mode == CLICK_MODES["IMAGE"]:
+            return self.image_processor
+        return None
+        
+    def _start_background_capture(self):
+        """Запуск фонового захвата области поиска текущего детектора"""
+        detector = self._get_detector()
+        if not self.background_capture or detector is None:
+            return
+            
+        try:
+            region = None
+            if detector.search_area:
+                x1, y1, x2, y2 = detector.search_area
+                region = (x1, y1, x2 - x1, y2 - y1)
+                
+            self.capture_source = BackgroundCaptureSource(
+                detector.screen_source or get_screen_source(), region=region
+            )
+            self.capture_source.start()
+            self._previous_detector_source = detector.screen_source
+            detector.set_screen_source(self.capture_source)
+            self._capture_detector = detector
+        except Exception as e:
+            print(f"Ошибка запуска фонового захвата: {e}")
+            self.capture_source = None
+            
+    def _stop_background_capture(self):
+        """Остановка фонового захвата и возврат прежнего источника кадров"""
+        if not self.capture_source:
+            return
+            
+        self.capture_source.stop()
+        self._capture_detector.set_screen_source(self._previous_detector_source)
+        self.capture_source = None
+        self._capture_detector = None
+
     def pause(self):
         """Пауза кликера"""
         self.paused = True
@@ -105,8 +216,7 @@ class ClickerEngine:
         self.click_count = 0
         
         # Уведомляем о сбросе
-        if self.on_click_callback:
-            self.on_click_callback(self.click_count)
+        self.status_publisher.publish_count(self.click_count)
             
     def set_interval(self, interval):
         """Установка интервала между кликами"""
@@ -116,6 +226,7 @@ class ClickerEngine:
         """Установка типа клика"""
         if click_type in CLICK_TYPES:
             self.click_type = click_type
+            self._step = None
             
     def set_turbo_mode(self, enabled):
         """Включение/выключение турбо режима"""
@@ -123,326 +234,318 @@ class ClickerEngine:
         if enabled:
             self.extreme_mode = False
             self.interval = TURBO_INTERVAL
+            self._step = None
             
     def set_extreme_mode(self, enabled):
-        """Включение/выключение экстремального режима"""
-        if not WIN32_AVAILABLE:
+        """Включение/выключение экстремального режима (нужен бэкенд ввода без накладных расходов)"""
+        if enabled and not self.extreme_available():
             return False
             
         self.extreme_mode = enabled
         if enabled:
             self.turbo_mode = False
             self.interval = EXTREME_INTERVAL
+        self._step = None
         return True
         
+    def extreme_available(self):
+        """Доступен ли экстремальный режим (есть бэкенд ввода без накладных расходов)"""
+        return self._low_latency_backend() is not None
+        
+    def _low_latency_backend(self):
+        """Бэкенд кликов экстремального режима
+
+        Основной бэкенд, если он без накладных расходов, иначе отдельный
+        INPUT_EXTREME_BACKEND (как раньше win32api только в экстремальном режиме).
+        None - такого бэкенда нет.
+        """
+        if self.input_backend.low_latency:
+            return self.input_backend
+        if self._extreme_backend is None:
+            backend = create_input_backend(INPUT_EXTREME_BACKEND)
+            self._extreme_backend = backend if backend.low_latency else False
+        return self._extreme_backend or None
+        
+    def set_input_backend(self, input_backend):
+        """Замена бэкенда ввода кликера и подключенных детекторов"""
+        self.input_backend = input_backend
+        for detector in self._detectors():
+            detector.set_input_backend(input_backend)
+        if self.extreme_mode and not self.extreme_available():
+            self.extreme_mode = False
+        self._step = None
+            
+    def set_burst_size(self, burst_size):
+        """Количество кликов за один такт в обычном режиме (одним пакетным вызовом бэкенда ввода)"""
+        self.burst_size = max(1, min(MAX_CLICK_BURST_SIZE, int(burst_size)))
+        self._step = None
+            
     def set_click_mode(self, mode):
         """Установка режима кликов"""
         if mode in CLICK_MODES.values():
             self.click_mode = mode
+            self._step = None
             
     def set_color_detector(self, color_detector):
         self.color_detector = color_detector
+        self._step = None
 
     def set_image_processor(self, image_processor):
         self.image_processor = image_processor
+        self._step = None
 
     def set_keyboard_sequence(self, keyboard_sequence):
         self.keyboard_sequence = keyboard_sequence
+        self._step = None
 
     def set_sequence_points(self, sequence_points):
         self.sequence_points = sequence_points
         self.current_sequence_index = 0
         self.sequence_clicks = 0
+        self._step = None
 
     def set_image_sequence(self, image_sequence):
         self.image_sequence = image_sequence
         self.current_image_index = 0
         self.image_sequence_clicks = 0
         self.image_sequence_repeat_count = 0
+        self._step = None
 
     def set_image_sequence_repeats(self, repeats):
         self.image_sequence_repeats = repeats
+        self._step = None
 
     def _click_loop(self):
-        """Основной цикл кликов"""
+        """Основной цикл кликов: шаг режима, учет кликов, ожидание срока следующего шага"""
+        scheduler = self.scheduler
+        publish_count = self.status_publisher.publish_count
+        running = lambda: self.clicking
+        
+        scheduler.start()
         while self.clicking:
             try:
                 if self.paused:
                     time.sleep(0.1)
+                    scheduler.rebase()
                     continue
+                
+                self.memory_tracker.maybe_sample()
 
-                # Выполняем клик в зависимости от режима
-                if self.click_mode == CLICK_MODES["COLOR"]:
-                    if hasattr(self, 'color_detector'):
-                        found = self.color_detector.find_and_click_color(self.click_type)
-                        if found:
-                            self.click_count += 1
-                            if self.on_click_callback:
-                                self.on_click_callback(self.click_count)
-                elif self.click_mode == CLICK_MODES["IMAGE"]:
-                    if hasattr(self, 'image_processor'):
-                        # Проверяем, есть ли последовательность изображений
-                        if hasattr(self, 'image_sequence') and self.image_sequence:
-                            print(f"DEBUG: Найдена последовательность изображений, длина: {len(self.image_sequence)}")
-                            print(f"DEBUG: Первый элемент: {self.image_sequence[0] if self.image_sequence else 'Нет элементов'}")
-                            # Режим последовательности изображений с поддержкой клавиш
-                            if not hasattr(self, 'current_image_index'):
-                                self.current_image_index = 0
-                            if not hasattr(self, 'image_sequence_clicks'):
-                                self.image_sequence_clicks = 0
-                            if not hasattr(self, 'image_sequence_repeat_count'):
-                                self.image_sequence_repeat_count = 0
-                                
-                            current_item = self.image_sequence[self.current_image_index]
-                            
-                            # Обрабатываем клавиши
-                            if current_item.get('type') == 'key':
-                                # Нажимаем клавишу
-                                key = current_item['key']
-                                presses = current_item['presses']
-                                
-                                import pyautogui
-                                import keyboard
-                                
-                                for _ in range(presses):
-                                    try:
-                                        keyboard.press_and_release(key)
-                                        time.sleep(0.1)  # Небольшая пауза между нажатиями
-                                    except Exception as e:
-                                        print(f"Ошибка нажатия клавиши {key}: {e}")
-                                
-                                # Переходим к следующему элементу
-                                self.current_image_index = (self.current_image_index + 1) % len(self.image_sequence)
-                                
-                                # Если прошли всю последовательность
-                                if self.current_image_index == 0:
-                                    self.image_sequence_repeat_count += 1
-                                    
-                                    # Проверяем, нужно ли остановиться
-                                    max_repeats = getattr(self, 'image_sequence_repeats', 1)
-                                    if max_repeats > 0 and self.image_sequence_repeat_count >= max_repeats:
-                                        # Останавливаем кликер после завершения последовательности
-                                        self.stop_clicking()
-                                        continue
-                                
-                                self.click_count += 1
-                                if self.on_click_callback:
-                                    self.on_click_callback(self.click_count)
-                            
-                            # Обрабатываем шаблоны изображений
-                            else:
-                                # Проверяем существование файла шаблона
-                                template_path = current_item.get('path')
-                                if not template_path or not os.path.exists(template_path):
-                                    print(f"Файл шаблона не найден: {template_path}")
-                                    # Переходим к следующему элементу
-                                    self.current_image_index = (self.current_image_index + 1) % len(self.image_sequence)
-                                    continue
-                                
-                                # Пытаемся найти и кликнуть по текущему шаблону
-                                found = self.image_processor.find_and_click_image(template_path=template_path, click_type=self.click_type)
-                                if found:
-                                    self.image_sequence_clicks += 1
-                                    self.click_count += 1
-                                    if self.on_click_callback:
-                                        self.on_click_callback(self.click_count)
-                                    
-                                    # Проверяем, достигли ли нужного количества кликов
-                                    if self.image_sequence_clicks >= current_item.get('clicks', 1):
-                                        self.image_sequence_clicks = 0
-                                        self.current_image_index = (self.current_image_index + 1) % len(self.image_sequence)
-                                        
-                                        # Если прошли всю последовательность
-                                        if self.current_image_index == 0:
-                                            self.image_sequence_repeat_count += 1
-                                            
-                                            # Проверяем, нужно ли остановиться
-                                            max_repeats = getattr(self, 'image_sequence_repeats', 1)
-                                            if max_repeats > 0 and self.image_sequence_repeat_count >= max_repeats:
-                                                # Останавливаем кликер после завершения последовательности
-                                                self.stop_clicking()
-                                                continue
-                                else:
-                                    # Если изображение не найдено, делаем небольшую паузу
-                                    time.sleep(0.05)
-                        else:
-                            # Обычный режим поиска изображений
-                            template_path = getattr(self.image_processor, 'current_template', None)
-                            found = self.image_processor.find_and_click_image(template_path=template_path, click_type=self.click_type)
-                            if found:
-                                self.click_count += 1
-                                if self.on_click_callback:
-                                    self.on_click_callback(self.click_count)
-                            else:
-                                # Если изображение не найдено, делаем небольшую паузу
-                                time.sleep(0.05)
-                elif self.click_mode == CLICK_MODES["KEYBOARD"]:
-                    if hasattr(self, 'keyboard_sequence') and self.keyboard_sequence:
-                        import pyautogui
-                        
-                        current_key_entry = self.keyboard_sequence[self.current_keyboard_index]
-                        
-                        try:
-                            # Нажимаем клавишу
-                            key = current_key_entry['key']
-                            
-                            # Преобразуем некоторые клавиши для pyautogui
-                            key_mapping = {
-                                'enter': 'enter',
-                                'esc': 'escape', 
-                                'space': 'space',
-                                'tab': 'tab',
-                                'shift': 'shift',
-                                'ctrl': 'ctrl',
-                                'alt': 'alt',
-                                'backspace': 'backspace',
-                                'delete': 'delete',
-                                'home': 'home',
-                                'end': 'end',
-                                'page_up': 'pageup',
-                                'page_down': 'pagedown',
-                                'up': 'up',
-                                'down': 'down',
-                                'left': 'left',
-                                'right': 'right',
-                                'insert': 'insert',
-                                'caps_lock': 'capslock'
-                            }
-                            
-                            # Функциональные клавиши
-                            if key.startswith('f') and len(key) >= 2:
-                                try:
-                                    num = int(key[1:])
-                                    if 1 <= num <= 12:
-                                        key = f'f{num}'
-                                except:
-                                    pass
-                                    
-                            # Цифровая клавиатура
-                            if key.startswith('num_'):
-                                suffix = key[4:]
-                                if suffix.isdigit():
-                                    key = f'num{suffix}'
-                                elif suffix == 'enter':
-                                    key = 'numpadenter'
-                                elif suffix == 'plus':
-                                    key = 'add'
-                                elif suffix == 'minus':
-                                    key = 'subtract'
-                            
-                            # Применяем маппинг
-                            key = key_mapping.get(key, key)
-                            
-                            pyautogui.press(key)
-                            self.keyboard_sequence_presses += 1
-                            self.click_count += 1
-                            
-                            if self.on_click_callback:
-                                self.on_click_callback(self.click_count)
-                            
-                            # Проверяем, достигли ли нужного количества нажатий
-                            if self.keyboard_sequence_presses >= current_key_entry['presses']:
-                                self.keyboard_sequence_presses = 0
-                                self.current_keyboard_index = (self.current_keyboard_index + 1) % len(self.keyboard_sequence)
-                                
-                        except Exception as e:
-                            print(f"Ошибка нажатия клавиши {current_key_entry['key']}: {e}")
-                            return False
-                elif self.click_mode == CLICK_MODES["SEQUENCE"]:
-                    if hasattr(self, 'sequence_points') and self.sequence_points:
-                        point = self.sequence_points[self.current_sequence_index]
-                        import pyautogui
-                        pyautogui.click(point['x'], point['y'], button=self.click_type)
-                        self.sequence_clicks += 1
-                        if self.sequence_clicks >= point.get('clicks', 1):
-                            self.sequence_clicks = 0
-                            self.current_sequence_index = (self.current_sequence_index + 1) % len(self.sequence_points)
-                        self.click_count += 1
-                        if self.on_click_callback:
-                            self.on_click_callback(self.click_count)
-                else:  # NORMAL
-                    self._perform_normal_click()
+                # Шаг режима (после смены настроек собирается заново)
+                step = self._step
+                if step is None:
+                    step = self._step = self._compile_step()
+                clicks = step()
+                
+                if clicks:
+                    self.click_count += clicks
+                    publish_count(self.click_count)
 
-                # Задержка между кликами
+                # Ожидание срока следующего клика (время работы уже учтено)
                 if self.interval > 0:
-                    time.sleep(self.interval)
+                    scheduler.wait_next(self.interval, running)
 
             except Exception as e:
                 print(f"Ошибка в цикле кликов: {e}")
                 self.stop_clicking()
                 break
                 
-    def _perform_normal_click(self):
-        """Выполнение обычного клика в текущей позиции мыши"""
-        try:
-            if self.extreme_mode and WIN32_AVAILABLE:
-                self._extreme_click()
+    def _compile_step(self):
+        """
+        Сборка шага текущего режима
+        
+        Шаг - функция без аргументов, которая выполняет одну итерацию режима и
+        возвращает число выполненных кликов. Детекторы, бэкенд ввода, тип клика
+        и имена клавиш связываются здесь один раз, а не на каждой итерации.
+        """
+        if self.click_mode == CLICK_MODES["COLOR"]:
+            return self._compile_color_step()
+        if self.click_mode == CLICK_MODES["IMAGE"]:
+            if self.image_sequence:
+                return self._compile_image_sequence_step()
+            return self._compile_image_step()
+        if self.click_mode == CLICK_MODES["KEYBOARD"]:
+            return self._compile_keyboard_step()
+        if self.click_mode == CLICK_MODES["SEQUENCE"]:
+            return self._compile_sequence_step()
+        return self._compile_normal_step()
+        
+    @staticmethod
+    def _idle_step():
+        """Шаг режима без цели (детектор или последовательность не заданы)"""
+        return 0
+        
+    def _compile_normal_step(self):
+        """Клик (или пачка из burst_size кликов) в текущей позиции мыши"""
+        button = self.click_type
+        burst_size = self.burst_size
+        backend = self._low_latency_backend() if self.extreme_mode else self.input_backend
+        click = backend.click
+        click_burst = backend.click_burst
+        
+        def step():
+            try:
+                if burst_size > 1:
+                    click_burst(burst_size, button=button)
+                else:
+                    click(button=button)
+                return burst_size
+            except Exception as e:
+                print(f"Ошибка при выполнении клика: {e}")
+                return 0
+                
+        return step
+        
+    def _compile_color_step(self):
+        """Поиск цвета и клик по нему"""
+        if self.color_detector is None:
+            return self._idle_step
+            
+        button = self.click_type
+        find_and_click = self.color_detector.find_and_click_color
+        
+        def step():
+            return 1 if find_and_click(button) else 0
+            
+        return step
+        
+    def _compile_image_step(self):
+        """Поиск текущего шаблона и клик по нему"""
+        processor = self.image_processor
+        if processor is None:
+            return self._idle_step
+            
+        button = self.click_type
+        find_and_click = processor.find_and_click_image
+        
+        def step():
+            # Текущий шаблон может смениться во время работы
+            if find_and_click(template_path=processor.current_template, click_type=button):
+                return 1
+            # Если изображение не найдено, делаем небольшую паузу
+            time.sleep(0.05)
+            return 0
+            
+        return step
+        
+    def _compile_image_sequence_step(self):
+        """Последовательность шаблонов и клавиш с ограничением числа повторов"""
+        processor = self.image_processor
+        if processor is None:
+            return self._idle_step
+            
+        button = self.click_type
+        find_and_click = processor.find_and_click_image
+        template_exists = processor.template_store.exists
+        press = self.input_backend.press
+        max_repeats = self.image_sequence_repeats
+        
+        # (тип, клавиша или путь шаблона, нажатий или кликов)
+        items = []
+        for item in self.image_sequence:
+            if item.get('type') == 'key':
+                items.append(('key', resolve_key(item['key']), item['presses']))
             else:
-                self._regular_click()
+                items.append(('image', item.get('path'), item.get('clicks', 1)))
+        length = len(items)
+        self.current_image_index %= length
+        
+        def advance():
+            """Переход к следующему элементу; False - последовательность завершена и кликер остановлен"""
+            self.current_image_index = (self.current_image_index + 1) % length
+            if self.current_image_index == 0:
+                self.image_sequence_repeat_count += 1
+                if max_repeats > 0 and self.image_sequence_repeat_count >= max_repeats:
+                    self.stop_clicking()
+                    return False
+            return True
+            
+        def step():
+            kind, target, amount = items[self.current_image_index]
+            
+            if kind == 'key':
+                for _ in range(amount):
+                    try:
+                        press(target)
+                        time.sleep(0.1)  # Небольшая пауза между нажатиями
+                    except Exception as e:
+                        print(f"Ошибка нажатия клавиши {target}: {e}")
+                return 1 if advance() else 0
                 
-            self.click_count += 1
-            if self.on_click_callback:
-                self.on_click_callback(self.click_count)
+            # Проверяем существование файла шаблона (через кэш шаблонов)
+            if not template_exists(target):
+                print(f"Файл шаблона не найден: {target}")
+                self.current_image_index = (self.current_image_index + 1) % length
+                return 0
                 
-        except Exception as e:
-            print(f"Ошибка при выполнении клика: {e}")
+            if not find_and_click(template_path=target, click_type=button):
+                # Если изображение не найдено, делаем небольшую паузу
+                time.sleep(0.05)
+                return 0
+                
+            self.image_sequence_clicks += 1
+            if self.image_sequence_clicks >= amount:
+                self.image_sequence_clicks = 0
+                advance()
+            return 1
             
-    def _regular_click(self):
-        """Обычный клик через pyautogui"""
-        if self.click_type == "left":
-            pyautogui.click()
-        elif self.click_type == "right":
-            pyautogui.rightClick()
-        elif self.click_type == "middle":
-            pyautogui.middleClick()
+        return step
+        
+    def _compile_keyboard_step(self):
+        """Нажатия клавиш по очереди, каждая заданное число раз"""
+        if not self.keyboard_sequence:
+            return self._idle_step
             
-    def _extreme_click(self):
-        """Экстремальный клик через win32api"""
-        if not WIN32_AVAILABLE:
-            return self._regular_click()
+        press = self.input_backend.press
+        entries = [(resolve_key(entry['key']), entry['presses']) for entry in self.keyboard_sequence]
+        length = len(entries)
+        self.current_keyboard_index %= length
+        
+        def step():
+            key, presses = entries[self.current_keyboard_index]
+            try:
+                press(key)
+            except Exception as e:
+                raise RuntimeError(f"Ошибка нажатия клавиши {key}: {e}")
+                
+            self.keyboard_sequence_presses += 1
+            # Проверяем, достигли ли нужного количества нажатий
+            if self.keyboard_sequence_presses >= presses:
+                self.keyboard_sequence_presses = 0
+                self.current_keyboard_index = (self.current_keyboard_index + 1) % length
+            return 1
+            
+        return step
+        
+    def _compile_sequence_step(self):
+        """Клики по точкам по очереди, в каждую заданное число раз"""
+        if not self.sequence_points:
+            return self._idle_step
+            
+        button = self.click_type
+        click = self.input_backend.click
+        points = [((point['x'], point['y']), point.get('clicks', 1)) for point in self.sequence_points]
+        length = len(points)
+        self.current_sequence_index %= length
+        
+        def step():
+            position, clicks = points[self.current_sequence_index]
+            click(position, button)
+            self.sequence_clicks += 1
+            if self.sequence_clicks >= clicks:
+                self.sequence_clicks = 0
+                self.current_sequence_index = (self.current_sequence_index + 1) % length
+            return 1
             
-        x, y = pyautogui.position()
-        
-        if self.click_type == "left":
-            win32api.SetCursorPos((x, y))
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, x, y, 0, 0)
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, x, y, 0, 0)
-        elif self.click_type == "right":
-            win32api.SetCursorPos((x, y))
-            win32api.mouse_event(win32con.MOUSEEVENTF_RIGHTDOWN, x, y, 0, 0)
-            win32api.mouse_event(win32con.MOUSEEVENTF_RIGHTUP, x, y, 0, 0)
-        elif self.click_type == "middle":
-            win32api.SetCursorPos((x, y))
-            win32api.mouse_event(win32con.MOUSEEVENTF_MIDDLEDOWN, x, y, 0, 0)
-            win32api.mouse_event(win32con.MOUSEEVENTF_MIDDLEUP, x, y, 0, 0)
+        return step
             
     def click_at_position(self, x, y):
         """Клик в определенной позиции"""
         try:
-            current_x, current_y = pyautogui.position()
-            
-            if self.extreme_mode and WIN32_AVAILABLE:
-                win32api.SetCursorPos((x, y))
-                if self.click_type == "left":
-                    win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, x, y, 0, 0)
-                    win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, x, y, 0, 0)
-                elif self.click_type == "right":
-                    win32api.mouse_event(win32con.MOUSEEVENTF_RIGHTDOWN, x, y, 0, 0)
-                    win32api.mouse_event(win32con.MOUSEEVENTF_RIGHTUP, x, y, 0, 0)
-                elif self.click_type == "middle":
-                    win32api.mouse_event(win32con.MOUSEEVENTF_MIDDLEDOWN, x, y, 0, 0)
-                    win32api.mouse_event(win32con.MOUSEEVENTF_MIDDLEUP, x, y, 0, 0)
-            else:
-                if self.click_type == "left":
-                    pyautogui.click(x, y)
-                elif self.click_type == "right":
-                    pyautogui.rightClick(x, y)
-                elif self.click_type == "middle":
-                    pyautogui.middleClick(x, y)
+            self.input_backend.click((x, y), self.click_type)
                     
             self.click_count += 1
-            if self.on_click_callback:
-                self.on_click_callback(self.click_count)
+            self.status_publisher.publish_count(self.click_count)
                 
         except Exception as e:
             print(f"Ошибка при клике в позиции ({x}, {y}): {e}")
@@ -453,4 +556,17 @@ class ClickerEngine:
         
     def get_click_count(self):
         """Получение количества кликов"""
-        return self.click_count 
\ No newline at end of file
+        return self.click_count
+        
+    def get_scheduler_stats(self):
+        """Достигнутая частота тактов и кликов (с учетом пачек) и джиттер расписания"""
+        stats = self.scheduler.get_stats()
+        stats["burst_size"] = self.burst_size if self.click_mode == CLICK_MODES["NORMAL"] else 1
+        stats["click_rate"] = stats["rate"] * stats["burst_size"]
+        return stats
+        
+    def get_memory_stats(self):
+        """Пиковое и установившееся потребление памяти и статистика пула буферов"""
+        stats = self.memory_tracker.get_stats()
+        stats["buffer_pool"] = get_buffer_pool().get_stats()
+        return stats 
\ No newline at end of file
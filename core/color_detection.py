@@ -3,16 +3,21 @@
 Содержит ColorDetector класс для работы с цветовым кликингом
 """
 
-import pyautogui
 from PIL import Image
 import threading
 import time
 from config import *
+from .color_matching import ColorMatcher
+from .screen_source import get_screen_source
+from .input_backend import get_input_backend
+from .tracking import TrackingSearch
+from .adaptive_recheck import AdaptiveRecheck
+from .cancellation import CancelToken, Deadline, SearchInterrupted
 
 class ColorDetector:
     """Класс для обнаружения цветов на экране"""
     
-    def __init__(self):
+    def __init__(self, screen_source=None):
         self.target_color = DEFAULT_COLOR
         self.tolerance = DEFAULT_COLOR_TOLERANCE
         self.search_area = None  # (x1, y1, x2, y2)
@@ -24,9 +29,39 @@ class ColorDetector:
         self.clicks_since_last_search = 0
         self.recheck_interval = DEFAULT_RECHECK_INTERVAL
         
+        # Векторизованный поиск
+        self.matcher = ColorMatcher()
+        self.search_strategy = COLOR_SEARCH_STRATEGY
+        self.min_target_size = DEFAULT_MIN_TARGET_SIZE  # 0 - поиск в полном разрешении
+        self.last_search_stats = {}
+        
+        # Слежение: поиск сначала в окнах вокруг последнего попадания
+        self.tracking = TRACKING_ENABLED
+        self.tracker = TrackingSearch()
+        
+        # Проверка сохраненной позиции по патчу (0 - периодический полный поиск)
+        self.verify_every = VERIFY_EVERY_CLICKS
+        self.verify_stats = {"verifications": 0, "failures": 0}
+        
+        # Адаптивный интервал проверки для каждой цели
+        self.adaptive_recheck = ADAPTIVE_RECHECK_ENABLED
+        self.recheck_policy = AdaptiveRecheck()
+        
+        # Срок поиска и отмена (остановка кликера прерывает поиск)
+        self.search_timeout = SEARCH_TIMEOUT
+        self.cancel_token = CancelToken()
+        self.last_search_interrupted = None  # "cancelled", "timeout" или None
+        
+        # Источник кадров (None - общий источник приложения)
+        self.screen_source = screen_source
+        
+        # Бэкенд ввода для кликов (None - общий бэкенд приложения)
+        self.input_backend = None
+        
         # Коллбэки
         self.on_color_found_callback = None
         self.on_color_not_found_callback = None
+        self.callbacks = {}
         
     def set_callbacks(self, on_found=None, on_not_found=None):
         """Установка коллбэков для результатов поиска"""
@@ -43,6 +78,84 @@ class ColorDetector:
         self.tolerance = max(0, min(100, tolerance))
         self._invalidate_cache()
         
+    def set_screen_source(self, screen_source):
+        """Установка источника кадров экрана"""
+        self.screen_source = screen_source
+        self._invalidate_cache()
+        
+    def _get_screen_source(self):
+        """Текущий источник кадров"""
+        return self.screen_source or get_screen_source()
+        
+    def set_input_backend(self, input_backend):
+        """Установка бэкенда ввода для кликов"""
+        self.input_backend = input_backend
+        
+    def _get_input_backend(self):
+        """Текущий бэкенд ввода"""
+        return self.input_backend or get_input_backend()
+        
+    def set_search_strategy(self, strategy):
+        """Установка стратегии выбора совпадения ("first", "nearest", "best")"""
+        if strategy in COLOR_SEARCH_STRATEGIES:
+            self.search_strategy = strategy
+            
+    def set_min_target_size(self, size):
+        """Установка минимального размера цели для поиска по грубой сетке (0 - выключено)"""
+        self.min_target_size = max(0, int(size))
+        self._invalidate_cache()
+        
+    def set_tracking(self, enabled, initial_window=None, expansion=None, max_levels=None):
+        """Включение слежения за целью и настройка окон поиска"""
+        self.tracking = enabled
+        self.tracker.configure(initial_window, expansion, max_levels)
+        self.tracker.reset()
+        
+    def get_tracking_stats(self) -> dict:
+        """Попадания по уровням окна слежения"""
+        return self.tracker.get_stats()
+        
+    def set_verify_every(self, clicks):
+        """Проверка сохраненной позиции каждые N кликов (0 - выключено)"""
+        self.verify_every = max(0, int(clicks))
+        
+    def get_verify_stats(self) -> dict:
+        """Количество проверок позиции и неудачных проверок"""
+        return dict(self.verify_stats)
+        
+    def set_adaptive_recheck(self, enabled):
+        """Включение адаптивного интервала проверки (проверка идет по патчу)"""
+        self.adaptive_recheck = enabled
+        
+    def get_recheck_stats(self) -> dict:
+        """Текущий интервал, исходы проверок и потерянные клики для текущей цели"""
+        stats = self.recheck_policy.get_stats((self.target_color, self.tolerance))
+        stats.update(self.verify_stats)
+        return stats
+        
+    def _recheck_needed(self) -> bool:
+        """Нужен ли полный поиск перед кликом по сохраненной позиции"""
+        key = (self.target_color, self.tolerance)
+        if self.adaptive_recheck:
+            interval = self.recheck_policy.interval(key)
+        elif self.verify_every > 0:
+            interval = self.verify_every
+        else:
+            return self.clicks_since_last_search >= self.recheck_interval
+        if self.clicks_since_last_search < interval:
+            return False
+        # Дешевая проверка патча под позицией; полный поиск - только если она не прошла
+        clicks = self.clicks_since_last_search
+        self.clicks_since_last_search = 0
+        self.verify_stats["verifications"] += 1
+        previous = self.last_found_position
+        if self._verify_cached_position():
+            self.recheck_policy.record(key, "ok" if self.last_found_position == previous else "moved", clicks)
+            return False
+        self.verify_stats["failures"] += 1
+        self.recheck_policy.record(key, "missed", clicks)
+        return True
+        
     def set_search_area(self, x1, y1, x2, y2):
         """Установка области поиска"""
         self.search_area = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
@@ -92,7 +205,7 @@ class ColorDetector:
                 return True, self.last_found_position
                 
             # Выполняем поиск
-            found, position = self._search_color_in_image()
+            found, position = self._search()
             
             # Обновляем кэш
             if found:
@@ -135,9 +248,9 @@ class ColorDetector:
             if self.last_found_position:
                 # Периодически проверяем, что цвет еще там
                 self.clicks_since_last_search += 1
-                if self.clicks_since_last_search >= self.recheck_interval:
+                if self._recheck_needed():
                     # Время для перепроверки
-                    found, pos = self._search_color_in_image()
+                    found, pos = self._search()
                     if found:
                         self.last_found_position = pos
                         self.clicks_since_last_search = 0
@@ -149,8 +262,7 @@ class ColorDetector:
                         return False
                 
                 # Выполняем клик
-                import pyautogui
-                pyautogui.click(self.last_found_position, button=click_type)
+                self._get_input_backend().click(self.last_found_position, click_type)
                 
                 # Вызываем коллбэк успешного клика
                 if 'on_click_success' in self.callbacks:
@@ -159,15 +271,14 @@ class ColorDetector:
                 return True
             
             # Иначе ищем цвет
-            found, pos = self._search_color_in_image()
+            found, pos = self._search()
             if found:
                 self.last_found_position = pos
                 self.clicks_since_last_search = 0
                 self._update_cache(pos)
                 
                 # Выполняем клик
-                import pyautogui
-                pyautogui.click(pos, button=click_type)
+                self._get_input_backend().click(pos, click_type)
                 
                 # Вызываем коллбэк успешного клика
                 if 'on_click_success' in self.callbacks:
@@ -176,7 +287,7 @@ class ColorDetector:
                 return True
             else:
                 self.last_found_position = None
-                if 'on_click_failed' in self.callbacks:
+                if 'on_click_failed' in self.callbacks and self.last_search_interrupted != "cancelled":
                     self.callbacks['on_click_failed']("Цвет не найден")
                 return False
                 
@@ -186,45 +297,135 @@ class ColorDetector:
                 self.callbacks['on_error'](f"Ошибка клика по цвету: {e}")
             return False
             
-    def _search_color_in_image(self) -> tuple:
+    def _verify_cached_position(self) -> bool:
+        """Проверка, что цвет все еще под сохраненной позицией (захват нескольких пикселей)"""
+        x, y = self.last_found_position
+        radius = VERIFY_COLOR_RADIUS
+        try:
+            source = self._get_screen_source()
+            # Патч обрезается по всем краям экрана: у края он просто меньше
+            screen_width, screen_height = source.screen_size()
+            left, top = max(0, x - radius), max(0, y - radius)
+            right, bottom = min(screen_width, x + radius + 1), min(screen_height, y + radius + 1)
+            if right <= left or bottom <= top:
+                return False
+            with source.grab_frame((left, top, right - left, bottom - top)) as patch:
+                found, pos = self.matcher.find(patch, self.hex_to_rgb(self.target_color), self.tolerance,
+                                               strategy="nearest", anchor=(x - left, y - top))
+            if found:
+                # Цель могла сдвинуться на пару пикселей - кликаем по ближайшему совпадению
+                self.last_found_position = (pos[0] + left, pos[1] + top)
+            return found
+        except Exception as e:
+            print(f"Ошибка проверки позиции цвета: {e}")
+            return False
+            
+    def _search_bounds(self) -> tuple:
+        """Граница поиска (left, top, width, height): область поиска или весь экран"""
+        if self.search_area:
+            x1, y1, x2, y2 = self.search_area
+            return x1, y1, x2 - x1, y2 - y1
+        width, height = self._get_screen_source().screen_size()
+        return 0, 0, width, height
+        
+    def set_search_timeout(self, seconds):
+        """Срок одного поиска в секундах (0 - без срока)"""
+        self.search_timeout = max(0.0, seconds)
+        
+    def cancel_search(self):
+        """Прерывание текущего и последующих поисков (до reset_cancel)"""
+        self.cancel_token.cancel()
+        
+    def reset_cancel(self):
+        """Разрешение поиска после отмены"""
+        self.cancel_token.reset()
+        
+    def _new_deadline(self) -> Deadline:
+        """Срок нового поиска с токеном отмены детектора"""
+        return Deadline(self.search_timeout, self.cancel_token)
+        
+    def _search(self) -> tuple:
+        """Поиск цвета: со слежением - сначала рядом с последним попаданием"""
+        deadline = self._new_deadline()
+        self.last_search_interrupted = None
+        try:
+            if not self.tracking:
+                return self._search_color_in_image(deadline=deadline)
+            return self.tracker.search(
+                lambda region: self._search_color_in_image(region, deadline), self._search_bounds(),
+                key=(self.target_color, self.tolerance)
+            )
+        except SearchInterrupted as e:
+            self.last_search_interrupted = e.reason
+            print("Поиск цвета отменен" if e.reason == "cancelled" else "Поиск цвета прерван по сроку")
+            return False, None
+        
+    def _search_color_in_image(self, region: tuple = None, deadline: Deadline = None) -> tuple:
         """
         Ищет цвет на экране и возвращает (найдено, позиция)
         
+        Args:
+            region: Регион (left, top, width, height); None - вся область поиска
+            deadline: Срок и отмена поиска; при прерывании - SearchInterrupted
+        
         Returns:
             tuple: (True, (x, y)) или (False, None)
         """
+        screenshot = None
         try:
-            import pyautogui
+            if deadline:
+                deadline.check()
+            source = self._get_screen_source()
             
             # Определяем область поиска
-            if self.search_area:
+            if region:
+                screenshot = source.grab_frame(region)
+            elif self.search_area:
                 x1, y1, x2, y2 = self.search_area
-                screenshot = pyautogui.screenshot(region=(x1, y1, x2 - x1, y2 - y1))
-                offset_x, offset_y = x1, y1
+                screenshot = source.grab_frame((x1, y1, x2 - x1, y2 - y1))
             else:
-                screenshot = pyautogui.screenshot()
-                offset_x, offset_y = 0, 0
+                screenshot = source.grab_frame()
+            offset_x, offset_y = screenshot.left, screenshot.top
+            if deadline:
+                deadline.check()
             
             # Преобразуем цель в RGB
             target_rgb = self.hex_to_rgb(self.target_color)
             
-            # Поиск пикселя (оптимизированный алгоритм)
-            width, height = screenshot.size
-            step = max(1, min(width, height) // 100)  # Адаптивный шаг поиска
+            # Для "nearest" ищем ближе всего к последней найденной позиции
+            anchor = None
+            if self.last_found_position:
+                anchor = (self.last_found_position[0] - offset_x,
+                          self.last_found_position[1] - offset_y)
+            
+            if self.min_target_size > 1:
+                # Грубая сетка с шагом по размеру цели и уточнением вокруг попаданий
+                found, pos = self.matcher.find_coarse_to_fine(
+                    screenshot, target_rgb, self.tolerance, self.min_target_size,
+                    strategy=self.search_strategy, anchor=anchor, deadline=deadline
+                )
+            else:
+                # Маска совпадений для всего кадра за один проход
+                found, pos = self.matcher.find(
+                    screenshot, target_rgb, self.tolerance,
+                    strategy=self.search_strategy, anchor=anchor
+                )
+            self.last_search_stats = dict(self.matcher.last_stats)
             
-            for x in range(0, width, step):
-                for y in range(0, height, step):
-                    pixel = screenshot.getpixel((x, y))
-                    if self.color_matches(pixel, target_rgb):
-                        click_x = x + offset_x
-                        click_y = y + offset_y
-                        return True, (click_x, click_y)
+            if found:
+                return True, (pos[0] + offset_x, pos[1] + offset_y)
                         
             return False, None
             
+        except SearchInterrupted:
+            raise
         except Exception as e:
             print(f"Ошибка при поиске цвета в изображении: {e}")
             return False, None
+        finally:
+            # Возвращаем буферы кадра в пул
+            if screenshot is not None:
+                screenshot.release()
             
     def _find_exact_position(self, pixel_rgb: tuple) -> tuple:
         """
@@ -236,33 +437,51 @@ class ColorDetector:
         Returns:
             tuple: (найдено, (x, y)) или (False, None)
         """
+        screenshot = None
         try:
-            import pyautogui
+            source = self._get_screen_source()
             
             # Определяем область детального поиска
             if self.search_area:
                 x1, y1, x2, y2 = self.search_area
-                screenshot = pyautogui.screenshot(region=(x1, y1, x2 - x1, y2 - y1))
-                offset_x, offset_y = x1, y1
+                screenshot = source.grab_frame((x1, y1, x2 - x1, y2 - y1))
             else:
-                screenshot = pyautogui.screenshot()
-                offset_x, offset_y = 0, 0
-            
-            width, height = screenshot.size
+                screenshot = source.grab_frame()
+            offset_x, offset_y = screenshot.left, screenshot.top
             
-            # Детальный поиск пиксель за пикселем
-            for x in range(width):
-                for y in range(height):
-                    pixel = screenshot.getpixel((x, y))
-                    if self.color_matches(pixel, pixel_rgb):
-                        return True, (x + offset_x, y + offset_y)
+            # Детальный поиск по всем пикселям
+            found, pos = self.matcher.find(screenshot, pixel_rgb, self.tolerance, strategy="first")
+            if found:
+                return True, (pos[0] + offset_x, pos[1] + offset_y)
                         
             return False, None
             
         except Exception as e:
             print(f"Ошибка детального поиска цвета: {e}")
             return False, None
+        finally:
+            # Возвращаем буферы кадра в пул
+            if screenshot is not None:
+                screenshot.release()
             
+    def _can_use_cache(self) -> bool:
+        """Проверка возможности использования кэшированной позиции"""
+        if (self.last_found_position is None or
+            self.last_target_color != self.target_color or
+            self.last_tolerance != self.tolerance or
+            self.clicks_since_last_search >= self.recheck_interval):
+            return False
+            
+        return True
+        
+    def _update_cache(self, position: tuple):
+        """Обновление кэша найденной позиции"""
+        self.last_found_position = position
+        self.last_target_color = self.target_color
+        self.last_tolerance = self.tolerance
+        self.clicks_since_last_search = 0
+        self.last_search_time = time.time()
+        
     def reset_search_cache(self):
         """Сброс кэша поиска"""
         self.last_found_position = None
@@ -280,13 +499,17 @@ class ColorDetector:
     def pick_color_at_position(self, x, y):
         """Получение цвета в определенной позиции экрана"""
         try:
-            pixel = pyautogui.pixel(x, y)
+            pixel = self._get_screen_source().pixel(x, y)
             # Конвертируем RGB в HEX
             return f"#{pixel[0]:02x}{pixel[1]:02x}{pixel[2]:02x}"
         except Exception as e:
             print(f"Ошибка при получении цвета в позиции ({x}, {y}): {e}")
             return None
             
+    def get_search_stats(self) -> dict:
+        """Статистика последнего поиска (сколько пикселей реально проверено)"""
+        return dict(self.last_search_stats)
+        
     def get_search_area_info(self):
         """Получение информации об области поиска"""
         if not self.search_area:
@@ -0,0 +1,217 @@
+"""
+Векторизованный поиск цвета в кадре
+Содержит ColorMatcher класс, который считает маску совпадений для всей области за один проход
+"""
+
+import math
+import numpy as np
+from config import *
+from .frame import Frame
+from .cancellation import check_deadline
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+
+class ColorMatcher:
+    """Векторизованный поиск пикселей заданного цвета с учетом толерантности"""
+
+    def __init__(self):
+        # Статистика последнего поиска
+        self.last_stats = {}
+
+    @staticmethod
+    def max_difference(tolerance: float) -> int:
+        """
+        Максимальная суммарная разность каналов для толерантности в процентах
+
+        Та же формула, что и в ColorDetector.color_matches: 3 * 255 * (tolerance / 100).
+        Разность целочисленная, поэтому порог округляется вниз.
+        """
+        return int(math.floor(3 * 255 * (tolerance / 100.0) + 1e-9))
+
+    @staticmethod
+    def to_pixels(image) -> np.ndarray:
+        """Преобразование кадра (Frame, PIL Image или массив) в массив (H, W, 3) uint8"""
+        if isinstance(image, Frame):
+            return image.rgb
+        pixels = np.asarray(image)
+        if pixels.ndim == 2:
+            pixels = np.stack([pixels] * 3, axis=2)
+        if pixels.shape[2] > 3:
+            pixels = pixels[:, :, :3]
+        if pixels.dtype != np.uint8:
+            pixels = pixels.astype(np.uint8)
+        return pixels
+
+    def difference(self, pixels: np.ndarray, target_rgb: tuple) -> np.ndarray:
+        """Суммарная разность |R-r| + |G-g| + |B-b| для каждого пикселя (uint16)"""
+        r, g, b = (int(c) for c in target_rgb[:3])
+
+        if OPENCV_AVAILABLE:
+            pixels = np.ascontiguousarray(pixels)
+            diff = cv2.absdiff(pixels, (r, g, b, 0))
+            ch_r, ch_g, ch_b = cv2.split(diff)
+            total = cv2.add(ch_r, ch_g, dtype=cv2.CV_16U)
+            return cv2.add(total, ch_b, dtype=cv2.CV_16U)
+
+        # Без OpenCV считаем поканально, чтобы не создавать промежуточный (H, W, 3) int16
+        total = np.abs(pixels[:, :, 0].astype(np.int16) - r).astype(np.uint16)
+        total += np.abs(pixels[:, :, 1].astype(np.int16) - g).astype(np.uint16)
+        total += np.abs(pixels[:, :, 2].astype(np.int16) - b).astype(np.uint16)
+        return total
+
+    def compute_mask(self, pixels: np.ndarray, target_rgb: tuple, tolerance: float) -> tuple:
+        """
+        Маска совпадений для всего кадра
+
+        Returns:
+            tuple: (mask, diff) - булева маска (H, W) и суммарная разность
+        """
+        diff = self.difference(pixels, target_rgb)
+        return diff <= self.max_difference(tolerance), diff
+
+    def find(self, image, target_rgb: tuple, tolerance: float,
+             strategy: str = "first", anchor: tuple = None) -> tuple:
+        """
+        Поиск цвета в кадре
+
+        Args:
+            image: Кадр (Frame, PIL Image или массив (H, W, 3))
+            target_rgb: Целевой цвет (r, g, b)
+            tolerance: Толерантность в процентах (0-100)
+            strategy: "first" - первый пиксель в порядке обхода столбцов (как в старом цикле),
+                      "nearest" - ближайший к anchor, "best" - с минимальной разностью
+            anchor: Точка (x, y) в координатах кадра для стратегии "nearest"
+
+        Returns:
+            tuple: (найдено, (x, y)) в координатах кадра или (False, None)
+        """
+        pixels = self.to_pixels(image)
+        height, width = pixels.shape[:2]
+        mask, diff = self.compute_mask(pixels, target_rgb, tolerance)
+
+        self.last_stats = {
+            "pixels_examined": width * height,
+            "matches": None,
+        }
+
+        # Старый цикл обходил x во внешнем цикле, y во внутреннем - сохраняем этот порядок
+        columns = mask.any(axis=0)
+        if not columns.any():
+            self.last_stats["matches"] = 0
+            return False, None
+
+        if strategy == "nearest":
+            ys, xs = np.nonzero(mask)
+            self.last_stats["matches"] = len(xs)
+            if anchor is None:
+                anchor = (width // 2, height // 2)
+            distances = (xs - anchor[0]) ** 2 + (ys - anchor[1]) ** 2
+            # При равном расстоянии выбираем первый в порядке обхода столбцов
+            order = np.lexsort((ys, xs, distances))
+            index = order[0]
+            return True, (int(xs[index]), int(ys[index]))
+
+        if strategy == "best":
+            scores = np.where(mask, diff, np.iinfo(np.uint16).max)
+            # Транспонируем, чтобы argmin при равенстве брал первый в порядке столбцов
+            index = int(np.argmin(scores.T))
+            x, y = divmod(index, height)
+            return True, (int(x), int(y))
+
+        # strategy == "first"
+        x = int(np.argmax(columns))
+        y = int(np.argmax(mask[:, x]))
+        return True, (x, y)
+
+    def find_coarse_to_fine(self, image, target_rgb: tuple, tolerance: float, min_size: int,
+                            strategy: str = "first", anchor: tuple = None, deadline=None) -> tuple:
+        """
+        Поиск по грубой сетке с уточнением вокруг попаданий
+
+        Шаг сетки равен min_size, поэтому любая цель размером не меньше
+        min_size x min_size содержит хотя бы один узел сетки и не пропускается.
+        Попадания на сетке уточняются в полном разрешении только в соседних блоках.
+
+        Args:
+            image: Кадр (Frame, PIL Image или массив (H, W, 3))
+            target_rgb: Целевой цвет (r, g, b)
+            tolerance: Толерантность в процентах (0-100)
+            min_size: Минимальный размер цели в пикселях
+            strategy: "first", "nearest" или "best" (см. find)
+            anchor: Точка (x, y) в координатах кадра для стратегии "nearest"
+            deadline: Срок и отмена поиска (Deadline), проверяются между проходами
+
+        Returns:
+            tuple: (найдено, (x, y)) в координатах кадра или (False, None)
+        """
+        step = max(1, int(min_size))
+        if step == 1:
+            return self.find(image, target_rgb, tolerance, strategy, anchor)
+
+        pixels = self.to_pixels(image)
+        height, width = pixels.shape[:2]
+        max_diff = self.max_difference(tolerance)
+
+        # Грубый проход по узлам сетки
+        coarse = np.ascontiguousarray(pixels[::step, ::step])
+        coarse_mask = self.difference(coarse, target_rgb) <= max_diff
+        examined = coarse_mask.size
+
+        if not coarse_mask.any():
+            self.last_stats = {"pixels_examined": examined, "matches": 0, "coarse_hits": 0, "step": step}
+            return False, None
+
+        check_deadline(deadline)
+
+        # Узел (i, j) лежит в левом верхнем углу блока (i, j); цель вокруг узла
+        # может занимать соседние блоки, поэтому расширяем попадания на 1 блок
+        refine = coarse_mask.copy()
+        refine[1:, :] |= coarse_mask[:-1, :]
+        refine[:-1, :] |= coarse_mask[1:, :]
+        refine[:, 1:] |= refine[:, :-1].copy()
+        refine[:, :-1] |= refine[:, 1:].copy()
+
+        # Координаты всех пикселей выбранных блоков без циклов Python
+        block_rows, block_cols = np.nonzero(refine)
+        offsets = np.arange(step)
+        ys = (block_rows[:, None, None] * step + offsets[None, :, None]) + np.zeros((1, 1, step), dtype=np.intp)
+        xs = (block_cols[:, None, None] * step + offsets[None, None, :]) + np.zeros((1, step, 1), dtype=np.intp)
+        ys = ys.ravel()
+        xs = xs.ravel()
+        inside = (ys < height) & (xs < width)
+        ys = ys[inside]
+        xs = xs[inside]
+        examined += len(xs)
+
+        candidates = pixels[ys, xs].astype(np.int16)
+        target = np.array(target_rgb[:3], dtype=np.int16)
+        diff = np.abs(candidates - target).sum(axis=1)
+        matched = diff <= max_diff
+
+        self.last_stats = {
+            "pixels_examined": int(examined),
+            "matches": int(matched.sum()),
+            "coarse_hits": int(coarse_mask.sum()),
+            "step": step,
+        }
+
+        if not matched.any():
+            return False, None
+
+        return True, self._select_candidate(xs[matched], ys[matched], diff[matched],
+                                            strategy, anchor, width, height)
+
+    def _select_candidate(self, xs, ys, diff, strategy, anchor, width, height) -> tuple:
+        """Выбор одного совпадения из списка кандидатов по стратегии"""
+        if strategy == "nearest":
+            if anchor is None:
+                anchor = (width // 2, height // 2)
+            distances = (xs - anchor[0]) ** 2 + (ys - anchor[1]) ** 2
+            index = np.lexsort((ys, xs, distances))[0]
+        elif strategy == "best":
+            index = np.lexsort((ys, xs, diff))[0]
+        else:
+            index = np.lexsort((ys, xs))[0]
+        return int(xs[index]), int(ys[index])
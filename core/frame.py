@@ -0,0 +1,233 @@
+"""
+Кадр экрана
+Содержит Frame - обертку над буфером захвата с лениво вычисляемыми производными плоскостями
+"""
+
+import threading
+import time
+import numpy as np
+from PIL import Image
+from config import *
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+
+# Порядок каналов сырого буфера, который понимает Frame
+CHANNEL_ORDERS = ("RGB", "BGR", "BGRA")
+
+
+class Frame:
+    """Кадр экрана поверх сырого буфера захвата
+
+    Сырой буфер (raw) хранится как NumPy-представление без копирования. Производные
+    плоскости (rgb, bgr, gray, hsv, уменьшенные копии) вычисляются при первом
+    обращении и запоминаются, поэтому поиск по цвету и по изображению делят
+    одни и те же преобразования. Вырезка (crop) тоже не копирует данные и
+    переиспользует уже посчитанные плоскости родительского кадра.
+
+    Если у кадра есть пул буферов, сырой буфер и производные плоскости берутся
+    из пула. Каждый владелец кадра (потребитель, кэш, вырезка) держит ссылку:
+    retain() добавляет владельца, release() (или выход из with) снимает его, и
+    когда владельцев не осталось, все буферы кадра возвращаются в пул.
+    """
+
+    def __init__(self, raw: np.ndarray, left: int = 0, top: int = 0,
+                 timestamp: float = None, order: str = "RGB", buffer=None, pool=None):
+        if order not in CHANNEL_ORDERS:
+            raise ValueError(f"Неизвестный порядок каналов: {order}")
+        self.raw = raw
+        self.order = order
+        self.left = int(left)
+        self.top = int(top)
+        self.timestamp = time.perf_counter() if timestamp is None else timestamp
+        self.pool = pool if pool is not None else getattr(buffer, "pool", None)
+        self._buffers = [buffer] if buffer is not None else []
+        self._parent = None  # Кадр, буфер которого делит вырезка
+        self._refs = 1
+        self._planes = {}
+        # Реентерабельная: фабрика плоскости может запросить другую плоскость (hsv -> bgr)
+        self._lock = threading.RLock()
+
+    def retain(self):
+        """Добавление владельца кадра"""
+        with self._lock:
+            self._refs += 1
+        return self
+
+    def release(self):
+        """Снятие владельца; без владельцев буферы кадра возвращаются в пул"""
+        with self._lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            buffers, self._buffers = self._buffers, []
+            parent, self._parent = self._parent, None
+            self._planes = {}
+        for buffer in buffers:
+            buffer.release()
+        if parent is not None:
+            parent.release()
+
+    @property
+    def refs(self) -> int:
+        """Число владельцев кадра"""
+        return self._refs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    @property
+    def width(self) -> int:
+        return self.raw.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.raw.shape[0]
+
+    @property
+    def region(self) -> tuple:
+        """Регион кадра на экране (left, top, width, height)"""
+        return self.left, self.top, self.width, self.height
+
+    @property
+    def age(self) -> float:
+        """Возраст кадра в секундах"""
+        return time.perf_counter() - self.timestamp
+
+    def _plane(self, name: str, factory):
+        """Ленивое вычисление и запоминание плоскости"""
+        plane = self._planes.get(name)
+        if plane is None:
+            with self._lock:
+                plane = self._planes.get(name)
+                if plane is None:
+                    plane = factory()
+                    plane.flags.writeable = False
+                    self._planes[name] = plane
+        return plane
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Плоскость (H, W, 3) RGB"""
+        if self.order == "RGB":
+            return self.raw
+        return self._plane("rgb", self._make_rgb)
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """Плоскость (H, W, 3) BGR (родной формат OpenCV)"""
+        if self.order == "BGR":
+            return self.raw
+        return self._plane("bgr", self._make_bgr)
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Плоскость (H, W) в оттенках серого"""
+        return self._plane("gray", self._make_gray)
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """Плоскость (H, W, 3) HSV (формат OpenCV: H 0-179)"""
+        return self._plane("hsv", self._make_hsv)
+
+    def downscaled(self, factor: int, plane: str = "gray") -> np.ndarray:
+        """Уменьшенная в factor раз плоскость (запоминается для каждого factor)"""
+        factor = int(factor)
+        if factor <= 1:
+            return getattr(self, plane)
+        return self._plane(f"{plane}/{factor}", lambda: self._make_downscaled(plane, factor))
+
+    def _allocate(self, shape: tuple) -> np.ndarray:
+        """Массив под плоскость: из пула кадра или новый (у освобожденного кадра - всегда новый)"""
+        if self.pool is None or self._refs <= 0:
+            # Буфер освобожденного кадра уже некому вернуть в пул
+            return np.empty(shape, dtype=np.uint8)
+        buffer = self.pool.acquire(shape)
+        self._buffers.append(buffer)
+        return buffer.array
+
+    def _make_rgb(self) -> np.ndarray:
+        out = self._allocate((self.height, self.width, 3))
+        if OPENCV_AVAILABLE:
+            code = cv2.COLOR_BGRA2RGB if self.order == "BGRA" else cv2.COLOR_BGR2RGB
+            return cv2.cvtColor(np.ascontiguousarray(self.raw), code, dst=out)
+        np.copyto(out, self.raw[:, :, 2::-1])
+        return out
+
+    def _make_bgr(self) -> np.ndarray:
+        out = self._allocate((self.height, self.width, 3))
+        if OPENCV_AVAILABLE:
+            code = cv2.COLOR_BGRA2BGR if self.order == "BGRA" else cv2.COLOR_RGB2BGR
+            return cv2.cvtColor(np.ascontiguousarray(self.raw), code, dst=out)
+        if self.order == "BGRA":
+            np.copyto(out, self.raw[:, :, :3])
+        else:
+            np.copyto(out, self.raw[:, :, ::-1])
+        return out
+
+    def _make_gray(self) -> np.ndarray:
+        out = self._allocate((self.height, self.width))
+        if OPENCV_AVAILABLE:
+            code = {"RGB": cv2.COLOR_RGB2GRAY, "BGR": cv2.COLOR_BGR2GRAY, "BGRA": cv2.COLOR_BGRA2GRAY}[self.order]
+            return cv2.cvtColor(np.ascontiguousarray(self.raw), code, dst=out)
+        rgb = self.rgb.astype(np.float32)
+        gray = rgb[:, :, 0] * 0.299 + rgb[:, :, 1] * 0.587 + rgb[:, :, 2] * 0.114
+        np.copyto(out, np.round(gray), casting="unsafe")
+        return out
+
+    def _make_hsv(self) -> np.ndarray:
+        if not OPENCV_AVAILABLE:
+            return np.asarray(Image.fromarray(self.rgb).convert("HSV"))
+        return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV, dst=self._allocate((self.height, self.width, 3)))
+
+    def _make_downscaled(self, plane: str, factor: int) -> np.ndarray:
+        source = getattr(self, plane)
+        height = max(1, source.shape[0] // factor)
+        width = max(1, source.shape[1] // factor)
+        out = self._allocate((height, width) + source.shape[2:])
+        if OPENCV_AVAILABLE:
+            return cv2.resize(np.ascontiguousarray(source), (width, height), dst=out,
+                              interpolation=cv2.INTER_AREA)
+        np.copyto(out, source[::factor, ::factor][:height, :width])
+        return out
+
+    def crop(self, region: tuple):
+        """
+        Вырезка региона (left, top, width, height) в координатах экрана без копирования
+
+        Вызывающий становится владельцем вырезки и должен освободить ее через release().
+
+        Returns:
+            Frame или None, если регион не помещается в кадр
+        """
+        left, top, width, height = (int(v) for v in region)
+        x = left - self.left
+        y = top - self.top
+        if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            return None
+        if x == 0 and y == 0 and width == self.width and height == self.height:
+            return self.retain()
+
+        # Вырезка держит родительский кадр, пока сама не освобождена
+        cropped = Frame(self.raw[y:y + height, x:x + width], left, top, self.timestamp,
+                        self.order, pool=self.pool)
+        cropped._parent = self.retain()
+        # Уже посчитанные плоскости переиспользуются вырезкой
+        for name in ("rgb", "bgr", "gray", "hsv"):
+            plane = self._planes.get(name)
+            if plane is not None:
+                cropped._planes[name] = plane[y:y + height, x:x + width]
+        return cropped
+
+    def to_image(self) -> Image.Image:
+        """Кадр как PIL Image (RGB)"""
+        return Image.fromarray(np.ascontiguousarray(self.rgb))
+
+    def contains_point(self, x: int, y: int) -> bool:
+        """Проверка, что точка экрана попадает в кадр"""
+        return self.left <= x < self.left + self.width and self.top <= y < self.top + self.height
@@ -0,0 +1,299 @@
+"""
+Шина кадров в разделяемой памяти и пул процессов поиска
+Содержит FrameBus - слоты multiprocessing.shared_memory под кадры экрана, и
+DetectorPool - процессы, которые ищут шаблоны прямо в слотах без копирования
+и возвращают результаты через очередь
+"""
+
+import itertools
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from config import *
+from .frame import Frame
+
+
+class FrameBus:
+    """Кольцо слотов разделяемой памяти под кадры
+
+    Кадр записывается в слот одним копированием сырого буфера захвата (в исходном
+    порядке каналов, например BGRA у mss), процессы-читатели открывают слот как
+    массив NumPy без копирования. Слот занят, пока его не освободит владелец шины.
+    """
+
+    def __init__(self, slot_bytes: int, slots: int = FRAME_BUS_SLOTS):
+        self.slot_bytes = int(slot_bytes)
+        self.blocks = [shared_memory.SharedMemory(create=True, size=self.slot_bytes) for _ in range(slots)]
+        self._free = list(range(slots))
+        self._condition = threading.Condition()
+
+    @property
+    def names(self) -> list:
+        """Имена блоков разделяемой памяти (для подключения из других процессов)"""
+        return [block.name for block in self.blocks]
+
+    def acquire(self, timeout: float = None):
+        """Свободный слот или None, если за timeout ни один не освободился"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._free, timeout):
+                return None
+            return self._free.pop(0)
+
+    def free(self, slot: int):
+        """Возврат слота в кольцо"""
+        with self._condition:
+            self._free.append(slot)
+            self._condition.notify()
+
+    def write(self, slot: int, frame: Frame) -> tuple:
+        """
+        Запись сырого буфера кадра в слот
+
+        Returns:
+            tuple: (форма, порядок каналов) для чтения слота или None, если кадр не помещается
+        """
+        raw = frame.raw
+        if raw.nbytes > self.slot_bytes:
+            return None
+        view = np.ndarray(raw.shape, dtype=np.uint8, buffer=self.blocks[slot].buf)
+        np.copyto(view, raw)
+        return raw.shape, frame.order
+
+    def close(self):
+        """Освобождение разделяемой памяти"""
+        for block in self.blocks:
+            try:
+                block.close()
+                block.unlink()
+            except Exception as e:
+                print(f"Ошибка освобождения разделяемой памяти: {e}")
+        self.blocks = []
+
+
+def _detector_worker(slot_names: list, jobs, results):
+    """Процесс поиска: задания (слот, шаблоны) из jobs, результаты в results"""
+    from .template_matcher import TemplateMatcher
+    from .template_store import TemplateStore
+
+    # Блоки создает и удаляет родитель; процесс только подключается к ним
+    blocks = [shared_memory.SharedMemory(name=name) for name in slot_names]
+
+    matcher = TemplateMatcher(prefilter=False)
+    store = TemplateStore()
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+            job_id, slot, shape, order, paths, settings = job
+            try:
+                matcher.set_mode(settings["mode"])
+                matcher.set_method(settings["method"])
+                matcher.set_prefilter(settings["prefilter"])
+                frame = Frame(np.ndarray(shape, dtype=np.uint8, buffer=blocks[slot].buf), order=order)
+                scales = settings.get("scales") or {}
+                matches = []
+                for path in paths:
+                    template = store.get(path)
+                    if template is None:
+                        matches.append(None)
+                    elif settings["multi_scale"]:
+                        # Масштаб из кэша родителя проверяется первым, как в его процессе
+                        if path in scales:
+                            matcher.scale_cache[template.path or id(template)] = scales[path]
+                        matches.append(matcher.match_multiscale(frame, template, settings["threshold"],
+                                                                settings["scale_range"]))
+                    else:
+                        matches.append(matcher.match(frame, template, settings["threshold"]))
+                # Представления слота не должны переживать задание
+                del frame
+                results.put((job_id, matches, None))
+            except Exception as e:
+                results.put((job_id, None, str(e)))
+    finally:
+        for block in blocks:
+            block.close()
+
+
+class DetectorPool:
+    """Пул процессов поиска шаблонов поверх FrameBus
+
+    detect() записывает кадр в свободный слот, делит шаблоны на задания по числу
+    процессов и ждет результатов; слот освобождается, когда вернулись все его
+    задания (в том числе опоздавшие после таймаута).
+    """
+
+    def __init__(self, processes: int = DETECTOR_PROCESSES, slots: int = FRAME_BUS_SLOTS,
+                 timeout: float = DETECTOR_POOL_TIMEOUT):
+        self.processes = max(1, processes)
+        self.slots = slots
+        self.timeout = timeout
+        self.bus = None
+        self._workers = []
+        self._jobs = None
+        self._results = None
+        self._collector = None
+        self._job_ids = itertools.count()
+        self._pending = {}  # job_id -> слот
+        self._slot_jobs = {}  # слот -> число незавершенных заданий
+        self._done = {}  # job_id -> (результаты, ошибка)
+        self._abandoned = set()  # Задания, результатов которых уже никто не ждет
+        self._condition = threading.Condition()
+        self.running = False
+
+        # Статистика
+        self.stats = {"detections": 0, "timeouts": 0, "interrupted": 0, "errors": 0, "fallbacks": 0}
+
+    def start(self, slot_bytes: int = None):
+        """
+        Запуск процессов поиска
+
+        Args:
+            slot_bytes: Размер слота кадра; по умолчанию - кадр BGRA на весь экран
+        """
+        if self.running:
+            return
+        if slot_bytes is None:
+            from .screen_source import get_screen_source
+            width, height = get_screen_source().screen_size()
+            slot_bytes = width * height * 4
+
+        # spawn одинаково работает на Windows и Linux и не копирует потоки родителя
+        context = multiprocessing.get_context("spawn")
+        self.bus = FrameBus(slot_bytes, self.slots)
+        self._jobs = context.Queue()
+        self._results = context.Queue()
+        self._workers = [
+            context.Process(target=_detector_worker, args=(self.bus.names, self._jobs, self._results),
+                            name=f"omnia-detector-{index}", daemon=True)
+            for index in range(self.processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+        self._collector = threading.Thread(target=self._collect, name="omnia-detector-results", daemon=True)
+        self._collector.start()
+        self.running = True
+        print(f"Пул процессов поиска запущен: {self.processes} проц., слотов {self.slots}")
+
+    def _collect(self):
+        """Поток приема результатов от процессов"""
+        while True:
+            item = self._results.get()
+            if item is None:
+                break
+            job_id, matches, error = item
+            with self._condition:
+                slot = self._pending.pop(job_id, None)
+                if job_id in self._abandoned:
+                    self._abandoned.discard(job_id)
+                else:
+                    self._done[job_id] = (matches, error)
+                if slot is not None:
+                    self._slot_jobs[slot] -= 1
+                    if self._slot_jobs[slot] == 0:
+                        del self._slot_jobs[slot]
+                        self.bus.free(slot)
+                self._condition.notify_all()
+
+    def detect(self, frame: Frame, template_paths: list, settings: dict, timeout: float = None,
+               deadline=None):
+        """
+        Поиск шаблонов в кадре процессами пула
+
+        Args:
+            frame: Кадр экрана
+            template_paths: Пути к шаблонам
+            settings: mode, method, prefilter, threshold, multi_scale, scale_range и
+                      (необязательно) scales - известные масштабы шаблонов по путям
+            timeout: Сколько ждать результатов (по умолчанию self.timeout)
+            deadline: Срок и отмена поиска (Deadline); ожидание прерывается вместе с ним
+
+        Returns:
+            list: Результат match для каждого шаблона (координаты кадра) или None
+                  для незагруженного шаблона; None целиком - пул не смог выполнить
+                  поиск, и его нужно выполнить в своем процессе
+        """
+        if not self.running or not template_paths:
+            return None
+        timeout = self.timeout if timeout is None else timeout
+        if deadline is not None and deadline.remaining() is not None:
+            timeout = min(timeout, deadline.remaining())
+
+        slot = self.bus.acquire(timeout)
+        if slot is None:
+            self.stats["fallbacks"] += 1
+            return None
+        layout = self.bus.write(slot, frame)
+        if layout is None:
+            self.bus.free(slot)
+            self.stats["fallbacks"] += 1
+            return None
+        shape, order = layout
+
+        # Шаблоны делятся на задания по числу процессов, порядок сохраняется
+        chunk = -(-len(template_paths) // self.processes)
+        chunks = [template_paths[start:start + chunk] for start in range(0, len(template_paths), chunk)]
+        with self._condition:
+            job_ids = [next(self._job_ids) for _ in chunks]
+            for job_id in job_ids:
+                self._pending[job_id] = slot
+            self._slot_jobs[slot] = len(job_ids)
+        for job_id, paths in zip(job_ids, chunks):
+            self._jobs.put((job_id, slot, shape, order, list(paths), settings))
+
+        wait_until = time.monotonic() + timeout
+        interrupted = None
+        with self._condition:
+            while True:
+                finished = all(job_id in self._done for job_id in job_ids)
+                interrupted = None if finished or deadline is None else deadline.reason()
+                left = wait_until - time.monotonic()
+                if finished or interrupted or left <= 0:
+                    break
+                # Ожидание частями, чтобы отмена не ждала всего срока
+                self._condition.wait(min(left, DETECTOR_POOL_POLL_INTERVAL))
+            outcomes = [self._done.pop(job_id, None) for job_id in job_ids]
+            if not finished:
+                self._abandoned.update(job_id for job_id in job_ids if job_id in self._pending)
+        if not finished:
+            self.stats["interrupted" if interrupted == "cancelled" else "timeouts"] += 1
+            return None
+
+        matches = []
+        for result, error in outcomes:
+            if error is not None:
+                print(f"Ошибка поиска в процессе: {error}")
+                self.stats["errors"] += 1
+                return None
+            matches.extend(result)
+        self.stats["detections"] += 1
+        return matches
+
+    def get_stats(self) -> dict:
+        """Статистика пула"""
+        stats = dict(self.stats)
+        stats["processes"] = sum(1 for worker in self._workers if worker.is_alive())
+        return stats
+
+    def close(self):
+        """Остановка процессов и освобождение разделяемой памяти"""
+        if not self.running:
+            return
+        self.running = False
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+        self._results.put(None)
+        self._collector.join(timeout=1.0)
+        self._jobs.close()
+        self._results.close()
+        self.bus.close()
+        self.bus = None
+        print("Пул процессов поиска остановлен")
@@ -0,0 +1,126 @@
+"""
+Кэш кадров экрана
+Содержит CachedScreenSource - обертку над ScreenSource, которая отдает один и тот же кадр
+всем потребителям в пределах короткого окна свежести
+"""
+
+import threading
+import time
+from config import *
+from .screen_source import ScreenSource
+
+
+class CachedScreenSource(ScreenSource):
+    """Источник кадров с кэшем по региону
+
+    Кадр считается свежим max_age секунд. Запрос меньшей области отдается
+    вырезкой (без копирования) из свежего кадра большей области. Кэш сам владеет
+    сохраненными кадрами и отдает потребителям дополнительную ссылку (retain),
+    поэтому буфер возвращается в пул только когда кадр устарел и все его отпустили.
+    """
+
+    def __init__(self, source: ScreenSource, max_age: float = FRAME_CACHE_MAX_AGE):
+        super().__init__()
+        self.source = source
+        self.name = f"cached:{source.name}"
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._frames = {}  # region -> Frame
+        self.hits = 0
+        self.crop_hits = 0
+        self.misses = 0
+
+    def set_max_age(self, max_age: float):
+        """Установка окна свежести кадра в секундах"""
+        self.max_age = max(0.0, max_age)
+
+    def grab_frame(self, region: tuple = None):
+        """Захват области с использованием кэша"""
+        key = tuple(int(v) for v in region) if region else None
+        now = time.perf_counter()
+
+        with self._lock:
+            cached = self._lookup(key, now)
+            if cached is not None:
+                return cached.retain()
+
+        frame = self.source.grab_frame(region)
+        frame.raw.flags.writeable = False  # Кадр общий для всех потребителей
+
+        with self._lock:
+            self.misses += 1
+            self._prune(now)
+            replaced = self._frames.get(key)
+            self._frames[key] = frame.retain()
+        if replaced is not None:
+            replaced.release()
+        return frame
+
+    def _lookup(self, key, now: float):
+        """Поиск свежего кадра: точное совпадение региона или вырезка из большего"""
+        frame = self._frames.get(key)
+        if frame is not None and now - frame.timestamp <= self.max_age:
+            self.hits += 1
+            return frame
+
+        if key is None:
+            return None
+
+        for frame in self._frames.values():
+            if now - frame.timestamp > self.max_age:
+                continue
+            # Вырезка делит с кадром буфер и уже посчитанные плоскости
+            cropped = frame.crop(key)
+            if cropped is not None:
+                self.crop_hits += 1
+                # Запоминаем вырезку, чтобы ее плоскости тоже считались один раз
+                replaced = self._frames.get(key)
+                if replaced is not None:
+                    replaced.release()
+                self._frames[key] = cropped
+                return cropped
+        return None
+
+    def _prune(self, now: float):
+        """Удаление устаревших кадров"""
+        expired = [key for key, frame in self._frames.items()
+                   if now - frame.timestamp > self.max_age]
+        for key in expired:
+            self._frames.pop(key).release()
+
+    def invalidate(self):
+        """Сброс всех кэшированных кадров"""
+        with self._lock:
+            frames = list(self._frames.values())
+            self._frames.clear()
+        for frame in frames:
+            frame.release()
+
+    def screen_size(self) -> tuple:
+        return self.source.screen_size()
+
+    def close(self):
+        self.invalidate()
+        self.source.close()
+
+    def get_stats(self) -> dict:
+        """Статистика захвата и кэша"""
+        stats = self.source.get_stats()
+        with self._lock:
+            requests = self.hits + self.crop_hits + self.misses
+            stats.update({
+                "backend": self.name,
+                "cache_hits": self.hits,
+                "cache_crop_hits": self.crop_hits,
+                "cache_misses": self.misses,
+                "cache_hit_rate": (self.hits + self.crop_hits) / requests if requests else 0.0,
+            })
+        return stats
+
+    def reset_stats(self):
+        """Сброс статистики захвата и кэша"""
+        self.source.reset_stats()
+        with self._lock:
+            self.hits = 0
+            self.crop_hits = 0
+            self.misses = 0
@@ -3,21 +3,71 @@
 Содержит ImageProcessor класс для работы с поиском изображений на экране
 """
 
-import pyautogui
 import os
 import uuid
 from PIL import Image
 import threading
 import time
 from config import *
+from .screen_source import get_screen_source
+from .input_backend import get_input_backend
+from .parallel_matcher import ParallelMatcher
+from .template_store import get_template_store
+from .tracking import TrackingSearch
+from .adaptive_recheck import AdaptiveRecheck
+from .cancellation import CancelToken, Deadline, SearchInterrupted
 
 class ImageProcessor:
     """Класс для обработки изображений и поиска шаблонов"""
     
-    def __init__(self):
+    def __init__(self, screen_source=None):
         self.confidence = DEFAULT_IMAGE_CONFIDENCE
         self.search_area = None  # (x1, y1, x2, y2)
         
+        # Источник кадров (None - общий источник приложения)
+        self.screen_source = screen_source
+        
+        # Бэкенд ввода для кликов (None - общий бэкенд приложения)
+        self.input_backend = None
+        
+        # Прямой поиск через matchTemplate (без OpenCV - pyautogui.locate)
+        self.template_matcher = ParallelMatcher() if OPENCV_AVAILABLE else None
+        self.last_match = None
+        
+        # Многомасштабный поиск (шаблон снят при другом DPI/масштабе интерфейса)
+        self.multi_scale = TEMPLATE_MULTI_SCALE
+        self.scale_range = TEMPLATE_SCALE_RANGE
+        
+        # Декодированные шаблоны в памяти (без чтения файла на каждом поиске)
+        self.template_store = get_template_store()
+        
+        # Пул процессов поиска (None - поиск в процессе приложения)
+        self.detector_pool = None
+        
+        # Слежение: поиск сначала в окнах вокруг последнего попадания
+        self.tracking = TRACKING_ENABLED
+        self.tracker = TrackingSearch()
+        
+        # Проверка сохраненной позиции по патчу (0 - периодический полный поиск)
+        self.verify_every = VERIFY_EVERY_CLICKS
+        self.verify_stats = {"verifications": 0, "failures": 0}
+        
+        # Адаптивный интервал проверки для каждой цели
+        self.adaptive_recheck = ADAPTIVE_RECHECK_ENABLED
+        self.recheck_policy = AdaptiveRecheck()
+        
+        # Срок поиска и отмена (остановка кликера прерывает поиск)
+        self.search_timeout = SEARCH_TIMEOUT
+        self.cancel_token = CancelToken()
+        self.last_search_interrupted = None  # "cancelled", "timeout" или None
+        
+        # Режим "найти все": клики по списку найденных целей без повторного поиска
+        self.locate_all = False
+        self.hits_max_age = LOCATE_ALL_MAX_AGE
+        self.pending_hits = []
+        self.pending_hits_template = None
+        self.pending_hits_time = 0.0
+        
         # Кэширование для оптимизации
         self.last_found_position = None
         self.last_template_path = None
@@ -48,6 +98,87 @@ class ImageProcessor:
         if on_sequence_complete:
             self.callbacks['on_sequence_complete'] = on_sequence_complete
         
+    def set_screen_source(self, screen_source):
+        """Установка источника кадров экрана"""
+        self.screen_source = screen_source
+        self._invalidate_cache()
+        
+    def _get_screen_source(self):
+        """Текущий источник кадров"""
+        return self.screen_source or get_screen_source()
+        
+    def set_input_backend(self, input_backend):
+        """Установка бэкенда ввода для кликов"""
+        self.input_backend = input_backend
+        
+    def _get_input_backend(self):
+        """Текущий бэкенд ввода"""
+        return self.input_backend or get_input_backend()
+        
+    def set_match_mode(self, mode):
+        """Установка режима сравнения шаблона ("gray" или "color")"""
+        if self.template_matcher:
+            self.template_matcher.set_mode(mode)
+            self._invalidate_cache()
+            
+    def set_match_method(self, method):
+        """Установка метода сравнения шаблона"""
+        if self.template_matcher:
+            self.template_matcher.set_method(method)
+            self._invalidate_cache()
+            
+    def set_prefilter(self, enabled):
+        """Включение/выключение цветового предфильтра областей-кандидатов"""
+        if self.template_matcher:
+            self.template_matcher.set_prefilter(enabled)
+            
+    def set_match_workers(self, workers):
+        """Число потоков поиска шаблонов (0 - по числу ядер, 1 - без параллельности)"""
+        if self.template_matcher:
+            self.template_matcher.set_workers(workers)
+            
+    def set_detector_pool(self, detector_pool):
+        """Подключение пула процессов поиска (None - поиск в своем процессе)"""
+        self.detector_pool = detector_pool
+        
+    def _pool_detect(self, frame, template_paths: list, deadline: Deadline = None):
+        """Поиск шаблонов в пуле процессов; None - пул недоступен, искать самим"""
+        if not self.detector_pool or not self.detector_pool.running or not self.template_matcher:
+            return None
+        settings = {
+            "mode": self.template_matcher.mode,
+            "method": self.template_matcher.method,
+            "prefilter": self.template_matcher.prefilter is not None,
+            "threshold": self.confidence,
+            "multi_scale": self.multi_scale,
+            "scale_range": self.scale_range,
+        }
+        if self.multi_scale:
+            # Процессы пула начинают с масштабов, уже известных этому процессу
+            scale_cache = self.template_matcher.scale_cache
+            settings["scales"] = {path: scale_cache[path] for path in template_paths if path in scale_cache}
+        matches = self.detector_pool.detect(frame, template_paths, settings, deadline=deadline)
+        if matches and self.multi_scale:
+            # Масштаб из пула запоминается так же, как при поиске в своем процессе
+            for template_path, match in zip(template_paths, matches):
+                if match and match["found"] and match.get("scale") is not None:
+                    self.template_matcher.scale_cache[template_path] = match["scale"]
+        return matches
+        
+    def set_multi_scale(self, enabled, scale_range=None):
+        """Включение/выключение поиска шаблона в нескольких масштабах"""
+        self.multi_scale = enabled
+        if scale_range:
+            low, high = scale_range
+            self.scale_range = (min(low, high), max(low, high))
+        self._invalidate_cache()
+        
+    def get_template_scale(self, template_path):
+        """Масштаб, на котором шаблон был найден в последний раз (None - еще не найден)"""
+        if not self.template_matcher:
+            return None
+        return self.template_matcher.scale_cache.get(template_path)
+        
     def set_confidence(self, confidence):
         """Установка уровня точности поиска (0.0 - 1.0)"""
         self.confidence = max(0.0, min(1.0, confidence))
@@ -68,6 +199,66 @@ class ImageProcessor:
         self.last_found_position = None
         self.last_template_path = None
         self.clicks_since_last_search = 0
+        self.pending_hits = []
+        self.pending_hits_template = None
+        
+    def set_tracking(self, enabled, initial_window=None, expansion=None, max_levels=None):
+        """Включение слежения за целью и настройка окон поиска"""
+        self.tracking = enabled
+        self.tracker.configure(initial_window, expansion, max_levels)
+        self.tracker.reset()
+        
+    def get_tracking_stats(self) -> dict:
+        """Попадания по уровням окна слежения"""
+        return self.tracker.get_stats()
+        
+    def set_verify_every(self, clicks):
+        """Проверка сохраненной позиции каждые N кликов (0 - выключено)"""
+        self.verify_every = max(0, int(clicks))
+        
+    def get_verify_stats(self) -> dict:
+        """Количество проверок позиции и неудачных проверок"""
+        return dict(self.verify_stats)
+        
+    def set_adaptive_recheck(self, enabled):
+        """Включение адаптивного интервала проверки (проверка идет по патчу)"""
+        self.adaptive_recheck = enabled
+        
+    def get_recheck_stats(self) -> dict:
+        """Текущий интервал, исходы проверок и потерянные клики для текущей цели"""
+        stats = self.recheck_policy.get_stats(self.last_template_path)
+        stats.update(self.verify_stats)
+        return stats
+        
+    def _recheck_needed(self) -> bool:
+        """Нужен ли полный поиск перед кликом по сохраненной позиции"""
+        key = self.last_template_path
+        if self.adaptive_recheck:
+            interval = self.recheck_policy.interval(key)
+        elif self.verify_every > 0:
+            interval = self.verify_every
+        else:
+            return self.clicks_since_last_search >= self.recheck_interval
+        if self.clicks_since_last_search < interval:
+            return False
+        # Дешевая проверка патча под позицией; полный поиск - только если она не прошла
+        clicks = self.clicks_since_last_search
+        self.clicks_since_last_search = 0
+        self.verify_stats["verifications"] += 1
+        previous = self.last_found_position
+        if self._verify_cached_position():
+            self.recheck_policy.record(key, "ok" if self.last_found_position == previous else "moved", clicks)
+            return False
+        self.verify_stats["failures"] += 1
+        self.recheck_policy.record(key, "missed", clicks)
+        return True
+        
+    def set_locate_all(self, enabled, max_age=None):
+        """Режим "найти все": клик по каждому найденному экземпляру шаблона по очереди"""
+        self.locate_all = enabled
+        if max_age is not None:
+            self.hits_max_age = max(0.0, max_age)
+        self._invalidate_cache()
         
     def find_image_position(self, template_path: str, use_cache: bool = True) -> tuple:
         """
@@ -81,8 +272,8 @@ class ImageProcessor:
             tuple: (найдено, (x, y)) или (False, None)
         """
         try:
-            # Проверяем существование файла
-            if not template_path or not os.path.exists(template_path):
+            # Проверяем существование файла (через кэш шаблонов)
+            if not self.template_store.exists(template_path):
                 if 'on_error' in self.callbacks:
                     self.callbacks['on_error'](f"Файл шаблона не найден: {template_path}")
                 return False, None
@@ -92,7 +283,7 @@ class ImageProcessor:
                 return True, self.last_found_position
                 
             # Выполняем поиск
-            found, position = self._search_image_in_screen(template_path)
+            found, position = self._search(template_path)
             
             # Обновляем кэш
             if found:
@@ -124,8 +315,8 @@ class ImageProcessor:
             if not template_path:
                 template_path = self.current_template
                 
-            # Проверяем существование шаблона
-            if not template_path or not os.path.exists(template_path):
+            # Проверяем существование шаблона (через кэш шаблонов)
+            if not self.template_store.exists(template_path):
                 # Если есть область поиска — создаём шаблон автоматически
                 if self.search_area:
                     new_template = self._create_template_from_search_area()
@@ -146,16 +337,21 @@ class ImageProcessor:
             # Если пользователь недавно был активен — сбрасываем позицию
             if hasattr(self, 'user_activity_detected') and self.user_activity_detected:
                 self.last_found_position = None
+                self.pending_hits = []
                 self.user_activity_detected = False
                 
+            # Режим "найти все" — кликаем по очереди по всем найденным экземплярам
+            if self.locate_all:
+                return self._click_next_hit(template_path, click_type)
+                
             # Если позиция уже найдена и шаблон не менялся — кликаем по ней
             if (self.last_found_position and 
                 self.last_template_path == template_path):
                 # Периодически проверяем, что картинка еще там
                 self.clicks_since_last_search += 1
-                if self.clicks_since_last_search >= self.recheck_interval:
+                if self._recheck_needed():
                     # Время для перепроверки
-                    found, pos = self._search_image_in_screen(template_path)
+                    found, pos = self._search(template_path)
                     if found:
                         self.last_found_position = pos
                         self.clicks_since_last_search = 0
@@ -167,8 +363,7 @@ class ImageProcessor:
                         return False
                         
                 # Выполняем клик
-                import pyautogui
-                pyautogui.click(self.last_found_position, button=click_type)
+                self._get_input_backend().click(self.last_found_position, click_type)
                 
                 # Вызываем коллбэк успешного клика
                 if 'on_click_success' in self.callbacks:
@@ -177,7 +372,7 @@ class ImageProcessor:
                 return True
                 
             # Иначе ищем изображение
-            found, pos = self._search_image_in_screen(template_path)
+            found, pos = self._search(template_path)
             if found:
                 self.last_found_position = pos
                 self.last_template_path = template_path
@@ -185,8 +380,7 @@ class ImageProcessor:
                 self._update_cache(template_path, pos)
                 
                 # Выполняем клик
-                import pyautogui
-                pyautogui.click(pos, button=click_type)
+                self._get_input_backend().click(pos, click_type)
                 
                 # Вызываем коллбэк успешного клика
                 if 'on_click_success' in self.callbacks:
@@ -195,7 +389,7 @@ class ImageProcessor:
                 return True
             else:
                 self.last_found_position = None
-                if 'on_click_failed' in self.callbacks:
+                if 'on_click_failed' in self.callbacks and self.last_search_interrupted != "cancelled":
                     self.callbacks['on_click_failed']("Изображение не найдено")
                 return False
                 
@@ -205,95 +399,380 @@ class ImageProcessor:
                 self.callbacks['on_error'](f"Ошибка клика по изображению: {e}")
             return False
             
-    def _search_image_in_screen(self, template_path: str) -> tuple:
+    def _verify_cached_position(self) -> bool:
+        """Проверка, что шаблон все еще под сохраненной позицией (захват патча размером с шаблон)"""
+        template = self.template_store.get(self.last_template_path)
+        if template is None:
+            return False
+            
+        scale = (self.get_template_scale(self.last_template_path) or 1.0) if self.multi_scale else 1.0
+        width = max(1, int(round(template.width * scale)))
+        height = max(1, int(round(template.height * scale)))
+        margin = VERIFY_IMAGE_MARGIN
+        x, y = self.last_found_position
+        
+        try:
+            source = self._get_screen_source()
+            # Патч обрезается по всем краям экрана: у края он просто меньше
+            screen_width, screen_height = source.screen_size()
+            left = max(0, x - width // 2 - margin)
+            top = max(0, y - height // 2 - margin)
+            right = min(screen_width, x - width // 2 + width + margin)
+            bottom = min(screen_height, y - height // 2 + height + margin)
+            if right - left < width or bottom - top < height:
+                return False
+            with source.grab_frame((left, top, right - left, bottom - top)) as patch:
+                if self.template_matcher:
+                    match = self.template_matcher.match(patch, template, self.confidence, scale)
+                    if not match["found"]:
+                        return False
+                    # Цель могла сдвинуться на пару пикселей - уточняем позицию
+                    self.last_found_position = (match["position"][0] + patch.left,
+                                                match["position"][1] + patch.top)
+                    return True
+                    
+                return self._locate_center(template, patch.to_image()) is not None
+        except Exception as e:
+            print(f"Ошибка проверки позиции изображения: {e}")
+            return False
+            
+    @staticmethod
+    def _locate_center(template, image):
+        """Точный поиск без OpenCV (pyautogui.locate); центр (x, y) на снимке или None"""
+        import pyautogui
+        try:
+            location = pyautogui.locate(template.to_image(), image)
+        except pyautogui.ImageNotFoundException:
+            return None
+        return tuple(pyautogui.center(location)) if location else None
+        
+    def _search_bounds(self) -> tuple:
+        """Граница поиска (left, top, width, height): область поиска или весь экран"""
+        if self.search_area:
+            x1, y1, x2, y2 = self.search_area
+            return x1, y1, x2 - x1, y2 - y1
+        width, height = self._get_screen_source().screen_size()
+        return 0, 0, width, height
+        
+    def set_search_timeout(self, seconds):
+        """Срок одного поиска в секундах (0 - без срока)"""
+        self.search_timeout = max(0.0, seconds)
+        
+    def cancel_search(self):
+        """Прерывание текущего и последующих поисков (до reset_cancel)"""
+        self.cancel_token.cancel()
+        
+    def reset_cancel(self):
+        """Разрешение поиска после отмены"""
+        self.cancel_token.reset()
+        
+    def _new_deadline(self) -> Deadline:
+        """Срок нового поиска с токеном отмены детектора"""
+        return Deadline(self.search_timeout, self.cancel_token)
+        
+    def _report_interrupted(self, reason: str):
+        """Запоминание и вывод причины прерванного поиска"""
+        self.last_search_interrupted = reason
+        self.last_match = self.template_matcher.interrupted_result(reason) if self.template_matcher else None
+        print("Поиск изображения отменен" if reason == "cancelled" else "Поиск изображения прерван по сроку")
+        
+    def _search(self, template_path: str) -> tuple:
+        """Поиск изображения: со слежением - сначала рядом с последним попаданием"""
+        deadline = self._new_deadline()
+        self.last_search_interrupted = None
+        try:
+            template = self.template_store.get(template_path) if self.tracking else None
+            if template is None:
+                return self._search_image_in_screen(template_path, deadline=deadline)
+            return self.tracker.search(
+                lambda window: self._search_image_in_screen(template_path, window, deadline),
+                self._search_bounds(), key=template_path, target_size=template.size
+            )
+        except SearchInterrupted as e:
+            self._report_interrupted(e.reason)
+            return False, None
+        
+    def _search_image_in_screen(self, template_path: str, window: tuple = None,
+                                deadline: Deadline = None) -> tuple:
         """
         Поиск изображения на экране
         
         Args:
             template_path: Путь к шаблону
+            window: Окно (left, top, width, height) внутри области поиска; None - вся область
+            deadline: Срок и отмена поиска; при прерывании - SearchInterrupted
             
         Returns:
             tuple: (True, (x, y)) или (False, None)
         """
+        frame = None
         try:
-            import pyautogui
+            if deadline:
+                deadline.check()
             
             # Определяем область поиска
             region = None
-            if self.search_area:
+            if window:
+                region = tuple(window)
+            elif self.search_area:
                 x1, y1, x2, y2 = self.search_area
                 region = (x1, y1, x2 - x1, y2 - y1)
                 
             # Проверяем размеры шаблона и области поиска
-            try:
-                from PIL import Image
-                template_img = Image.open(template_path)
-                template_width, template_height = template_img.size
-                print(f"Размер шаблона: {template_width}x{template_height}")
+            template = self.template_store.get(template_path)
+            if template is None:
+                print(f"Файл шаблона не найден: {template_path}")
+                return False, None
+            template_width, template_height = template.size
+            
+            if region and not window:
+                region_width, region_height = region[2], region[3]
                 
-                if region:
-                    region_width, region_height = region[2], region[3]
-                    print(f"Размер области поиска: {region_width}x{region_height}")
+                # Проверяем, не превышает ли шаблон размеры области поиска
+                if template_width > region_width or template_height > region_height:
+                    print(f"ОШИБКА: Шаблон ({template_width}x{template_height}) больше области поиска ({region_width}x{region_height})")
+                    print("Создаем новый шаблон из области поиска...")
                     
-                    # Проверяем, не превышает ли шаблон размеры области поиска
-                    if template_width > region_width or template_height > region_height:
-                        print(f"ОШИБКА: Шаблон ({template_width}x{template_height}) больше области поиска ({region_width}x{region_height})")
-                        print("Создаем новый шаблон из области поиска...")
-                        
-                        # Создаем новый шаблон из области поиска
-                        new_template = self._create_template_from_search_area()
-                        if new_template:
-                            print(f"Используем новый шаблон: {new_template}")
-                            # Рекурсивно вызываем поиск с новым шаблоном
-                            return self._search_image_in_screen(new_template)
-                        else:
-                            print("Не удалось создать новый шаблон, используем поиск по всему экрану")
-                            region = None  # Используем весь экран
+                    # Создаем новый шаблон из области поиска
+                    new_template = self._create_template_from_search_area()
+                    if new_template:
+                        print(f"Используем новый шаблон: {new_template}")
+                        # Рекурсивно вызываем поиск с новым шаблоном
+                        return self._search_image_in_screen(new_template, deadline=deadline)
                     else:
-                        print("Размеры шаблона подходят для области поиска")
-                else:
-                    print("Поиск по всему экрану")
-                    
-            except Exception as e:
-                print(f"Ошибка при проверке размеров: {e}")
+                        print("Не удалось создать новый шаблон, используем поиск по всему экрану")
+                        region = None  # Используем весь экран
                 
-            # Отладочная информация
-            print(f"Поиск шаблона: {template_path}")
-            if region:
-                print(f"Область поиска: {region}")
-            else:
-                print("Область поиска: весь экран")
+            # Снимок области через общий источник кадров
+            frame = self._get_screen_source().grab_frame(region)
+            offset_x, offset_y = frame.left, frame.top
+            if deadline:
+                deadline.check()
+            
+            if self.template_matcher:
+                # Полный поиск - в пуле процессов, если он запущен
+                pool_matches = None if window else self._pool_detect(frame, [template_path], deadline)
                 
-            # Добавляем таймаут для поиска картинки
-            start_time = time.time()
-            timeout = 2.0  # 2 секунды таймаут
-            
-            # Ищем картинку на экране
-            if OPENCV_AVAILABLE:
-                location = pyautogui.locateOnScreen(
-                    template_path, 
-                    confidence=self.confidence,
-                    region=region
-                )
-            else:
-                # Без OpenCV - точный поиск
-                location = pyautogui.locateOnScreen(template_path, region=region)
+                # Сопоставление прямо по плоскости кадра
+                if pool_matches and pool_matches[0]:
+                    self.last_match = pool_matches[0]
+                elif self.multi_scale:
+                    self.last_match = self.template_matcher.match_multiscale(
+                        frame, template, self.confidence, self.scale_range, deadline=deadline
+                    )
+                else:
+                    self.last_match = self.template_matcher.match(frame, template, self.confidence,
+                                                                  deadline=deadline)
+                if self.last_match["found"]:
+                    center_x, center_y = self.last_match["position"]
+                    center = (center_x + offset_x, center_y + offset_y)
+                    scale = self.last_match.get("scale")
+                    scale_info = f", масштаб {scale:.2f}" if scale else ""
+                    print(f"Изображение найдено на позиции: {center} (оценка {self.last_match['score']:.3f}{scale_info})")
+                    return True, center
+                print(f"Изображение не найдено (лучшая оценка {self.last_match['score']:.3f})")
+                return False, None
+            
+            # Без OpenCV - точный поиск
+            location = self._locate_center(template, frame.to_image())
                 
             if location:
-                # Получаем центр найденного изображения
-                center = pyautogui.center(location)
+                # Получаем центр найденного изображения в координатах экрана
+                center_x, center_y = location
+                center = (center_x + offset_x, center_y + offset_y)
                 print(f"Изображение найдено на позиции: {center}")
                 return True, center
             else:
                 print("Изображение не найдено")
                 return False, None
                 
-        except pyautogui.ImageNotFoundException:
-            print("Изображение не найдено на экране")
-            return False, None
+        except SearchInterrupted:
+            raise
         except Exception as e:
             print(f"Ошибка при поиске изображения: {e}")
             return False, None
+        finally:
+            # Возвращаем буферы кадра в пул
+            if frame is not None:
+                frame.release()
+            
+    def find_all_image_positions(self, template_path: str) -> list:
+        """
+        Все экземпляры шаблона на экране за один проход поиска
+        
+        Args:
+            template_path: Путь к шаблону
+            
+        Returns:
+            list: словари position (x, y), score, box (x, y, w, h) в координатах экрана,
+                  в порядке чтения (сверху вниз, слева направо)
+        """
+        template = self.template_store.get(template_path)
+        if template is None:
+            return []
+            
+        frame = None
+        try:
+            region = None
+            if self.search_area:
+                x1, y1, x2, y2 = self.search_area
+                region = (x1, y1, x2 - x1, y2 - y1)
+            deadline = self._new_deadline()
+            frame = self._get_screen_source().grab_frame(region)
+            offset_x, offset_y = frame.left, frame.top
+            
+            hits = []
+            if self.template_matcher:
+                for match in self.template_matcher.match_all(frame, template, self.confidence,
+                                                             deadline=deadline):
+                    x, y, width, height = match["box"]
+                    hits.append({
+                        "position": (match["position"][0] + offset_x, match["position"][1] + offset_y),
+                        "score": match["score"],
+                        "box": (x + offset_x, y + offset_y, width, height),
+                    })
+            else:
+                # Без OpenCV - точный поиск всех вхождений
+                import pyautogui
+                for location in pyautogui.locateAll(template.to_image(), frame.to_image()):
+                    x, y = pyautogui.center(location)
+                    hits.append({
+                        "position": (x + offset_x, y + offset_y),
+                        "score": 1.0,
+                        "box": (location.left + offset_x, location.top + offset_y,
+                                location.width, location.height),
+                    })
+                    
+            hits.sort(key=lambda hit: (hit["box"][1], hit["box"][0]))
+            return hits
+            
+        except SearchInterrupted as e:
+            self._report_interrupted(e.reason)
+            return []
+        except Exception as e:
+            print(f"Ошибка при поиске всех изображений: {e}")
+            return []
+        finally:
+            # Возвращаем буферы кадра в пул
+            if frame is not None:
+                frame.release()
+                
+    def _click_next_hit(self, template_path: str, click_type: str) -> bool:
+        """Клик по следующей цели из списка; новый поиск - когда список пуст или устарел"""
+        stale = time.perf_counter() - self.pending_hits_time > self.hits_max_age
+        if not self.pending_hits or stale or self.pending_hits_template != template_path:
+            self.pending_hits = self.find_all_image_positions(template_path)
+            self.pending_hits_template = template_path
+            self.pending_hits_time = time.perf_counter()
+            if not self.pending_hits:
+                if 'on_click_failed' in self.callbacks:
+                    self.callbacks['on_click_failed']("Изображение не найдено")
+                return False
+                
+        hit = self.pending_hits.pop(0)
+        self.last_found_position = hit["position"]
+        self.last_template_path = template_path
+        self._get_input_backend().click(hit["position"], click_type)
+        
+        if 'on_click_success' in self.callbacks:
+            self.callbacks['on_click_success'](hit["position"])
+        return True
+        
+    def find_templates(self, template_paths: list) -> list:
+        """
+        Поиск нескольких шаблонов по одному снимку экрана
+        
+        Args:
+            template_paths: Пути к шаблонам
+            
+        Returns:
+            list: (найдено, (x, y), оценка) для каждого шаблона по порядку
+        """
+        results = [(False, None, 0.0)] * len(template_paths)
+        templates = [self.template_store.get(path) for path in template_paths]
+        loaded = [i for i, template in enumerate(templates) if template is not None]
+        if not loaded:
+            return results
+            
+        frame = None
+        try:
+            # Один снимок области на все шаблоны
+            region = None
+            if self.search_area:
+                x1, y1, x2, y2 = self.search_area
+                region = (x1, y1, x2 - x1, y2 - y1)
+            deadline = self._new_deadline()
+            frame = self._get_screen_source().grab_frame(region)
+            offset_x, offset_y = frame.left, frame.top
+            
+            if self.template_matcher:
+                # При прерывании уже найденные шаблоны сохраняются, остальные - не найдены
+                matches = self._pool_detect(frame, [template_paths[i] for i in loaded], deadline)
+                if not matches or None in matches:
+                    matches = self.template_matcher.match_many(
+                        frame, [templates[i] for i in loaded], self.confidence,
+                        multi_scale=self.multi_scale, scale_range=self.scale_range, deadline=deadline
+                    )
+                for i, match in zip(loaded, matches):
+                    if match["found"]:
+                        x, y = match["position"]
+                        results[i] = (True, (x + offset_x, y + offset_y), match["score"])
+                    else:
+                        results[i] = (False, None, match["score"])
+                return results
+                
+            # Без OpenCV - точный поиск каждого шаблона на том же снимке
+            screenshot = frame.to_image()
+            for i in loaded:
+                location = self._locate_center(templates[i], screenshot)
+                if location:
+                    x, y = location
+                    results[i] = (True, (x + offset_x, y + offset_y), 1.0)
+            return results
+            
+        except Exception as e:
+            print(f"Ошибка при поиске нескольких изображений: {e}")
+            return results
+        finally:
+            # Возвращаем буферы кадра в пул
+            if frame is not None:
+                frame.release()
+                
+    def find_any_image(self, template_paths: list) -> tuple:
+        """
+        Поиск любого из шаблонов на экране (с лучшей оценкой)
+        
+        Returns:
+            tuple: (найдено, (x, y), индекс шаблона) или (False, None, None)
+        """
+        best = None
+        for index, (found, position, score) in enumerate(self.find_templates(template_paths)):
+            if found and (best is None or score > best[2]):
+                best = (position, index, score)
+        if best is None:
+            return False, None, None
+        return True, best[0], best[1]
+        
+    def find_and_click_any(self, template_paths: list, click_type: str = "left") -> bool:
+        """Клик по любому из видимых шаблонов (например, по одной из нескольких кнопок)"""
+        try:
+            found, position, index = self.find_any_image(template_paths)
+            if not found:
+                if 'on_click_failed' in self.callbacks:
+                    self.callbacks['on_click_failed']("Ни одно изображение не найдено")
+                return False
+                
+            self._get_input_backend().click(position, click_type)
+            
+            if 'on_click_success' in self.callbacks:
+                self.callbacks['on_click_success'](position)
+            return True
+            
+        except Exception as e:
+            print(f"Ошибка при клике по одному из изображений: {e}")
+            if 'on_error' in self.callbacks:
+                self.callbacks['on_error'](f"Ошибка клика по изображению: {e}")
+            return False
             
     def _create_template_from_search_area(self) -> str:
         """Создание шаблона из области поиска"""
@@ -301,7 +780,6 @@ class ImageProcessor:
             if not self.search_area:
                 return None
                 
-            import pyautogui
             import uuid
             
             x1, y1, x2, y2 = self.search_area
@@ -313,7 +791,7 @@ class ImageProcessor:
                 return None
                 
             # Делаем скриншот области
-            screenshot = pyautogui.screenshot(region=(x1, y1, width, height))
+            screenshot = self._get_screen_source().grab((x1, y1, width, height))
             
             # Сохраняем временный файл
             template_path = f"{TEMP_TEMPLATE_PREFIX}{uuid.uuid4().hex[:8]}.png"
@@ -393,9 +871,9 @@ class ImageProcessor:
             # Делаем скриншот
             if self.search_area:
                 x1, y1, x2, y2 = self.search_area
-                screenshot = pyautogui.screenshot(region=(x1, y1, x2 - x1, y2 - y1))
+                screenshot = self._get_screen_source().grab((x1, y1, x2 - x1, y2 - y1))
             else:
-                screenshot = pyautogui.screenshot()
+                screenshot = self._get_screen_source().grab()
                 
             screenshot.save(save_path)
             return save_path
@@ -0,0 +1,531 @@
+"""
+Бэкенды ввода (мышь и клавиатура)
+Содержит InputBackend и его реализации: pyautogui, win32 (mouse_event), XTest
+(python-xlib), uinput (evdev) и RecordingInputBackend - запись событий в память
+без обращения к ОС для бенчмарков и проверки порядка событий
+"""
+
+import os
+import threading
+import time
+from config import *
+
+try:
+    from Xlib import X, XK, display as xdisplay
+    from Xlib.ext import xtest
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+try:
+    import evdev
+    from evdev import ecodes
+    EVDEV_AVAILABLE = True
+except ImportError:
+    EVDEV_AVAILABLE = False
+
+if WIN32_AVAILABLE:
+    import ctypes
+    from ctypes import wintypes
+    import win32api
+    import win32con
+
+    _INPUT_MOUSE = 0
+
+    class _WinMouseInput(ctypes.Structure):
+        _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                    ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
+                    ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong))]
+
+    class _WinKeyboardInput(ctypes.Structure):
+        _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                    ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong))]
+
+    class _WinInputUnion(ctypes.Union):
+        _fields_ = [("mi", _WinMouseInput), ("ki", _WinKeyboardInput)]
+
+    class _WinInput(ctypes.Structure):
+        """Структура INPUT для SendInput (union с клавиатурой задает нужный размер)"""
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _WinInputUnion)]
+
+
+class FailSafeException(Exception):
+    """Аварийная остановка: курсор в углу экрана"""
+
+
+class InputBackend:
+    """Базовый бэкенд ввода
+
+    Позиция (x, y) в координатах экрана; position=None - клик в текущей позиции
+    курсора. Клавиши называются как в pyautogui ("enter", "f5", "num1"),
+    сочетания пишутся через "+" ("ctrl+c"). Перед кликами бэкенд проверяет
+    аварийную остановку (check_failsafe), как pyautogui.FAILSAFE, но запрашивает
+    позицию курсора не чаще раза в failsafe_interval секунд.
+    """
+
+    name = "base"
+    low_latency = False  # Ввод без накладных расходов pyautogui (для экстремального режима)
+    failsafe = INPUT_FAILSAFE
+    failsafe_interval = INPUT_FAILSAFE_INTERVAL
+    _failsafe_checked = float("-inf")  # perf_counter последнего запроса позиции для check_failsafe
+
+    def position(self) -> tuple:
+        """Текущая позиция курсора"""
+        import pyautogui
+        return tuple(pyautogui.position())
+
+    def screen_size(self) -> tuple:
+        """Размер экрана (width, height)"""
+        import pyautogui
+        return tuple(pyautogui.size())
+
+    def check_failsafe(self, position: tuple = None):
+        """Исключение FailSafeException, если курсор пользователя (position) в углу экрана
+
+        Без position позиция курсора запрашивается не чаще раза в failsafe_interval:
+        у XTest это синхронный обмен с X-сервером, который на каждом клике съел бы
+        выигрыш бэкенда. Заданная position проверяется всегда.
+        """
+        if not self.failsafe:
+            return
+        if position is None:
+            now = time.perf_counter()
+            if now - self._failsafe_checked < self.failsafe_interval:
+                return
+            self._failsafe_checked = now
+            position = self._failsafe_position()
+            if position is None:
+                return
+        x, y = position
+        width, height = self.screen_size()
+        if x in (0, width - 1) and y in (0, height - 1):
+            raise FailSafeException(f"Аварийная остановка: курсор в углу экрана ({x}, {y})")
+
+    def _failsafe_position(self):
+        """Позиция курсора пользователя для check_failsafe (None - неизвестна, проверка пропускается)"""
+        return self.position()
+
+    def move(self, x: int, y: int):
+        raise NotImplementedError
+
+    def click(self, position: tuple = None, button: str = "left"):
+        """Нажатие и отпускание кнопки мыши (с переходом в position, если она задана)"""
+        raise NotImplementedError
+
+    def click_burst(self, count: int, position: tuple = None, button: str = "left"):
+        """Пачка из count кликов подряд (бэкенды с пакетной отправкой делают это одним вызовом)"""
+        if position is not None:
+            self.move(*position)
+        for _ in range(count):
+            self.click(button=button)
+
+    def press(self, key: str):
+        """Нажатие и отпускание клавиши или сочетания клавиш"""
+        raise NotImplementedError
+
+    def close(self):
+        """Освобождение ресурсов бэкенда"""
+
+    @staticmethod
+    def split_keys(key: str) -> list:
+        """Клавиши сочетания ("ctrl+c" -> ["ctrl", "c"]; "+" - сама клавиша плюс)"""
+        if len(key) > 1 and "+" in key:
+            return [part for part in key.split("+") if part]
+        return [key]
+
+
+class PyAutoGuiInputBackend(InputBackend):
+    """Ввод через pyautogui (переносимый, но с накладными расходами на каждый вызов)"""
+
+    name = "pyautogui"
+    failsafe = False  # Угол экрана проверяет сам pyautogui
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = INPUT_FAILSAFE
+        pyautogui.PAUSE = 0
+        self._pyautogui = pyautogui
+
+    def move(self, x: int, y: int):
+        self._pyautogui.moveTo(x, y)
+
+    def click(self, position: tuple = None, button: str = "left"):
+        if position is None:
+            self._pyautogui.click(button=button)
+        else:
+            self._pyautogui.click(position, button=button)
+
+    def click_burst(self, count: int, position: tuple = None, button: str = "left"):
+        if position is None:
+            self._pyautogui.click(clicks=count, interval=0, button=button)
+        else:
+            self._pyautogui.click(position, clicks=count, interval=0, button=button)
+
+    def press(self, key: str):
+        keys = self.split_keys(key)
+        if len(keys) > 1:
+            self._pyautogui.hotkey(*keys)
+        else:
+            self._pyautogui.press(key)
+
+
+class Win32InputBackend(PyAutoGuiInputBackend):
+    """Мышь через win32api.mouse_event (пачки - одним SendInput); клавиатура - через pyautogui"""
+
+    name = "win32"
+    low_latency = True
+    failsafe = INPUT_FAILSAFE  # mouse_event и SendInput угол экрана не проверяют
+
+    BUTTON_EVENTS = {
+        "left": (win32con.MOUSEEVENTF_LEFTDOWN, win32con.MOUSEEVENTF_LEFTUP),
+        "right": (win32con.MOUSEEVENTF_RIGHTDOWN, win32con.MOUSEEVENTF_RIGHTUP),
+        "middle": (win32con.MOUSEEVENTF_MIDDLEDOWN, win32con.MOUSEEVENTF_MIDDLEUP),
+    } if WIN32_AVAILABLE else {}
+
+    def __init__(self):
+        super().__init__()
+        self._burst_inputs = {}  # (количество, кнопка) -> готовый массив INPUT для SendInput
+
+    def position(self) -> tuple:
+        return tuple(win32api.GetCursorPos())
+
+    def screen_size(self) -> tuple:
+        return win32api.GetSystemMetrics(win32con.SM_CXSCREEN), win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+
+    def move(self, x: int, y: int):
+        win32api.SetCursorPos((int(x), int(y)))
+
+    def click(self, position: tuple = None, button: str = "left"):
+        self.check_failsafe()
+        if position is not None:
+            self.move(*position)
+        down, up = self.BUTTON_EVENTS[button]
+        win32api.mouse_event(down, 0, 0, 0, 0)
+        win32api.mouse_event(up, 0, 0, 0, 0)
+
+    def click_burst(self, count: int, position: tuple = None, button: str = "left"):
+        """Пачка кликов одним вызовом SendInput (массив из 2 * count событий)"""
+        self.check_failsafe()
+        if position is not None:
+            self.move(*position)
+        inputs = self._burst_inputs.get((count, button))
+        if inputs is None:
+            down, up = self.BUTTON_EVENTS[button]
+            inputs = (_WinInput * (2 * count))()
+            for i in range(2 * count):
+                inputs[i].type = _INPUT_MOUSE
+                inputs[i].mi.dwFlags = down if i % 2 == 0 else up
+            self._burst_inputs[(count, button)] = inputs
+        sent = ctypes.windll.user32.SendInput(len(inputs), inputs, ctypes.sizeof(_WinInput))
+        if sent != len(inputs):
+            raise OSError(f"SendInput отправил {sent} из {len(inputs)} событий")
+
+
+class XTestInputBackend(InputBackend):
+    """Ввод через расширение XTest (X11, python-xlib): одно соединение с дисплеем на все события"""
+
+    name = "xtest"
+    low_latency = True
+
+    BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+    # Имена клавиш pyautogui -> keysym X11
+    KEYSYMS = {
+        "enter": "Return", "return": "Return", "esc": "Escape", "escape": "Escape",
+        "space": "space", "tab": "Tab", "backspace": "BackSpace", "delete": "Delete",
+        "home": "Home", "end": "End", "pageup": "Prior", "pagedown": "Next",
+        "up": "Up", "down": "Down", "left": "Left", "right": "Right", "insert": "Insert",
+        "capslock": "Caps_Lock", "shift": "Shift_L", "ctrl": "Control_L", "alt": "Alt_L",
+        "win": "Super_L", "numpadenter": "KP_Enter", "add": "KP_Add", "subtract": "KP_Subtract",
+    }
+
+    def __init__(self):
+        if not XLIB_AVAILABLE:
+            raise RuntimeError("python-xlib недоступен - ввод через XTest невозможен")
+        self.display = xdisplay.Display()
+        self._keycodes = {}
+        self._lock = threading.Lock()
+
+    def position(self) -> tuple:
+        pointer = self.display.screen().root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def screen_size(self) -> tuple:
+        screen = self.display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def move(self, x: int, y: int):
+        with self._lock:
+            xtest.fake_input(self.display, X.MotionNotify, x=int(x), y=int(y))
+            self.display.flush()
+
+    def click(self, position: tuple = None, button: str = "left"):
+        code = self.BUTTONS[button]
+        with self._lock:
+            self.check_failsafe()
+            if position is not None:
+                xtest.fake_input(self.display, X.MotionNotify, x=int(position[0]), y=int(position[1]))
+            xtest.fake_input(self.display, X.ButtonPress, code)
+            xtest.fake_input(self.display, X.ButtonRelease, code)
+            self.display.flush()
+
+    def click_burst(self, count: int, position: tuple = None, button: str = "left"):
+        """Пачка кликов в буфере запросов Xlib и одна отправка серверу (flush)"""
+        code = self.BUTTONS[button]
+        with self._lock:
+            self.check_failsafe()
+            if position is not None:
+                xtest.fake_input(self.display, X.MotionNotify, x=int(position[0]), y=int(position[1]))
+            for _ in range(count):
+                xtest.fake_input(self.display, X.ButtonPress, code)
+                xtest.fake_input(self.display, X.ButtonRelease, code)
+            self.display.flush()
+
+    def _keycode(self, key: str) -> int:
+        keycode = self._keycodes.get(key)
+        if keycode is None:
+            name = self.KEYSYMS.get(key)
+            if name is None and key.startswith("num") and key[3:].isdigit():
+                name = f"KP_{key[3:]}"
+            if name is None and len(key) > 1 and key[0] == "f" and key[1:].isdigit():
+                name = key.upper()
+            keysym = XK.string_to_keysym(name or key)
+            keycode = self.display.keysym_to_keycode(keysym) if keysym else 0
+            if not keycode:
+                raise ValueError(f"Неизвестная клавиша: {key}")
+            self._keycodes[key] = keycode
+        return keycode
+
+    def press(self, key: str):
+        keycodes = [self._keycode(part) for part in self.split_keys(key)]
+        with self._lock:
+            for keycode in keycodes:
+                xtest.fake_input(self.display, X.KeyPress, keycode)
+            for keycode in reversed(keycodes):
+                xtest.fake_input(self.display, X.KeyRelease, keycode)
+            self.display.flush()
+
+    def close(self):
+        self.display.close()
+
+
+class UinputInputBackend(InputBackend):
+    """Ввод через виртуальное устройство /dev/uinput (evdev; работает и без X11, нужен доступ к uinput)"""
+
+    name = "uinput"
+    low_latency = True
+
+    # Имена клавиш pyautogui -> коды evdev без префикса KEY_
+    KEY_NAMES = {
+        "escape": "ESC", "return": "ENTER", "ctrl": "LEFTCTRL", "shift": "LEFTSHIFT",
+        "alt": "LEFTALT", "win": "LEFTMETA", "numpadenter": "KPENTER", "add": "KPPLUS",
+        "subtract": "KPMINUS",
+    }
+
+    def __init__(self, screen_size: tuple = None):
+        if not EVDEV_AVAILABLE:
+            raise RuntimeError("evdev недоступен - ввод через uinput невозможен")
+        if screen_size is None:
+            from .screen_source import get_screen_source
+            screen_size = get_screen_source().screen_size()
+        width, height = screen_size
+        self._screen_size = (width, height)
+        # Только реальные коды: KEY_MAX/KEY_CNT - границы таблицы, ядро отвечает на них EINVAL
+        keys = {code for code in ecodes.keys if code < ecodes.KEY_MAX}
+        keys |= {ecodes.BTN_LEFT, ecodes.BTN_RIGHT, ecodes.BTN_MIDDLE}
+        capabilities = {
+            ecodes.EV_KEY: sorted(keys),
+            ecodes.EV_ABS: [
+                (ecodes.ABS_X, evdev.AbsInfo(0, 0, width - 1, 0, 0, 0)),
+                (ecodes.ABS_Y, evdev.AbsInfo(0, 0, height - 1, 0, 0, 0)),
+            ],
+        }
+        self.device = evdev.UInput(capabilities, name="omniaclick-input")
+        self.buttons = {"left": ecodes.BTN_LEFT, "right": ecodes.BTN_RIGHT, "middle": ecodes.BTN_MIDDLE}
+        self._last_position = None
+        self._lock = threading.Lock()
+
+    def position(self) -> tuple:
+        # uinput не читает позицию курсора - последняя заданная или позиция из pyautogui
+        return self._last_position or super().position()
+
+    def screen_size(self) -> tuple:
+        return self._screen_size
+
+    def _failsafe_position(self):
+        # Позицию курсора пользователя знает только pyautogui (X11); без него проверка невозможна
+        try:
+            return super().position()
+        except Exception:
+            return None
+
+    def _move(self, x: int, y: int):
+        self.device.write(ecodes.EV_ABS, ecodes.ABS_X, int(x))
+        self.device.write(ecodes.EV_ABS, ecodes.ABS_Y, int(y))
+        self._last_position = (int(x), int(y))
+
+    def move(self, x: int, y: int):
+        with self._lock:
+            self._move(x, y)
+            self.device.syn()
+
+    def click(self, position: tuple = None, button: str = "left"):
+        code = self.buttons[button]
+        self.check_failsafe()
+        with self._lock:
+            if position is not None:
+                self._move(*position)
+                self.device.syn()
+            self.device.write(ecodes.EV_KEY, code, 1)
+            self.device.syn()
+            self.device.write(ecodes.EV_KEY, code, 0)
+            self.device.syn()
+
+    def click_burst(self, count: int, position: tuple = None, button: str = "left"):
+        code = self.buttons[button]
+        self.check_failsafe()
+        with self._lock:
+            if position is not None:
+                self._move(*position)
+                self.device.syn()
+            for _ in range(count):
+                self.device.write(ecodes.EV_KEY, code, 1)
+                self.device.syn()
+                self.device.write(ecodes.EV_KEY, code, 0)
+                self.device.syn()
+
+    def _keycode(self, key: str) -> int:
+        name = self.KEY_NAMES.get(key)
+        if name is None and key.startswith("num") and key[3:].isdigit():
+            name = f"KP{key[3:]}"
+        code = ecodes.ecodes.get(f"KEY_{(name or key).upper()}")
+        if code is None:
+            raise ValueError(f"Неизвестная клавиша: {key}")
+        return code
+
+    def press(self, key: str):
+        codes = [self._keycode(part) for part in self.split_keys(key)]
+        with self._lock:
+            for code in codes:
+                self.device.write(ecodes.EV_KEY, code, 1)
+            self.device.syn()
+            for code in reversed(codes):
+                self.device.write(ecodes.EV_KEY, code, 0)
+            self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+
+class RecordingInputBackend(InputBackend):
+    """Запись событий ввода в память с отметкой времени (без обращения к ОС)
+
+    События: (время perf_counter, тип, данные), где тип - "move" (x, y),
+    "down"/"up" (кнопка, (x, y)) или "key_down"/"key_up" (клавиша).
+    """
+
+    name = "null"
+    low_latency = True
+    failsafe = False  # Курсора нет - нечего проверять
+
+    def __init__(self, record: bool = True, max_events: int = INPUT_RECORD_MAX_EVENTS):
+        self.record = record
+        self.max_events = max_events
+        self.events = []
+        self.clicks = 0
+        self.key_presses = 0
+        self._position = (0, 0)
+        self._lock = threading.Lock()
+
+    def _add(self, kind: str, data):
+        if self.record and len(self.events) < self.max_events:
+            self.events.append((time.perf_counter(), kind, data))
+
+    def position(self) -> tuple:
+        return self._position
+
+    def move(self, x: int, y: int):
+        with self._lock:
+            self._position = (int(x), int(y))
+            self._add("move", self._position)
+
+    def click(self, position: tuple = None, button: str = "left"):
+        with self._lock:
+            if position is not None:
+                self._position = (int(position[0]), int(position[1]))
+                self._add("move", self._position)
+            self._add("down", (button, self._position))
+            self._add("up", (button, self._position))
+            self.clicks += 1
+
+    def click_burst(self, count: int, position: tuple = None, button: str = "left"):
+        with self._lock:
+            if position is not None:
+                self._position = (int(position[0]), int(position[1]))
+                self._add("move", self._position)
+            if self.record:
+                for _ in range(count):
+                    self._add("down", (button, self._position))
+                    self._add("up", (button, self._position))
+            self.clicks += count
+
+    def press(self, key: str):
+        keys = self.split_keys(key)
+        with self._lock:
+            for part in keys:
+                self._add("key_down", part)
+            for part in reversed(keys):
+                self._add("key_up", part)
+            self.key_presses += 1
+
+    def clear(self):
+        """Сброс записанных событий и счетчиков"""
+        with self._lock:
+            self.events = []
+            self.clicks = 0
+            self.key_presses = 0
+
+
+def create_input_backend(backend: str = None) -> InputBackend:
+    """Создание бэкенда ввода по имени ("auto", "pyautogui", "win32", "xtest", "uinput", "null")"""
+    backend = backend or INPUT_BACKEND
+    if backend == "null":
+        return RecordingInputBackend()
+    if backend == "pyautogui":
+        return PyAutoGuiInputBackend()
+    if backend in ("auto", "win32") and WIN32_AVAILABLE:
+        return Win32InputBackend()
+    if backend in ("auto", "xtest") and XLIB_AVAILABLE and os.environ.get("DISPLAY"):
+        try:
+            return XTestInputBackend()
+        except Exception as e:
+            print(f"Не удалось подключиться к XTest: {e}")
+    if backend == "uinput":
+        try:
+            return UinputInputBackend()
+        except Exception as e:
+            print(f"Не удалось создать устройство uinput: {e}")
+    if backend not in ("auto", "pyautogui"):
+        print(f"Бэкенд ввода {backend} недоступен - используется pyautogui")
+    return PyAutoGuiInputBackend()
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def get_input_backend() -> InputBackend:
+    """Общий бэкенд ввода приложения"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = create_input_backend()
+        return _default_backend
+
+
+def set_input_backend(backend: InputBackend):
+    """Замена общего бэкенда ввода (например, на RecordingInputBackend в бенчмарках)"""
+    global _default_backend
+    with _default_backend_lock:
+        _default_backend = backend
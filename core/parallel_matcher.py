@@ -0,0 +1,148 @@
+"""
+Параллельный поиск шаблонов
+Содержит ParallelMatcher - TemplateMatcher, который делит поиск по пулу потоков:
+большие кадры - на перекрывающиеся полосы, наборы шаблонов - по шаблонам
+(cv2.matchTemplate отпускает GIL, поэтому потоки работают на разных ядрах)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import numpy as np
+from config import *
+from .frame import Frame
+from .template_matcher import TemplateMatcher
+from .cancellation import SearchInterrupted
+
+
+def resolve_workers(workers: int) -> int:
+    """Число потоков: 0 - по числу ядер"""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+class ParallelMatcher(TemplateMatcher):
+    """Поиск шаблонов в пуле потоков
+
+    Полоса кадра включает template_height - 1 строк следующей полосы, поэтому
+    каждая позиция левого верхнего угла проверяется ровно в одной полосе.
+    Результаты полос объединяются по порядку сверху вниз, при равной оценке
+    побеждает более ранняя полоса - как у cv2.minMaxLoc при полном поиске,
+    так что найденная позиция не зависит от числа потоков (оценка может
+    отличаться в последних знаках из-за округления внутри matchTemplate).
+    """
+
+    def __init__(self, workers: int = TEMPLATE_MATCH_WORKERS, mode: str = TEMPLATE_MATCH_MODE,
+                 method: str = TEMPLATE_MATCH_METHOD, prefilter: bool = TEMPLATE_PREFILTER_ENABLED,
+                 min_tile_area: int = TEMPLATE_MATCH_MIN_TILE_AREA):
+        super().__init__(mode, method, prefilter)
+        self.workers = resolve_workers(workers)
+        self.min_tile_area = min_tile_area
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._worker = threading.local()  # Признак потока пула: внутри него полосы не делятся
+
+    def set_workers(self, workers: int):
+        """Изменение числа потоков (пул пересоздается при следующем поиске)"""
+        workers = resolve_workers(workers)
+        if workers != self.workers:
+            self.close()
+            self.workers = workers
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="match")
+            return self._executor
+
+    def close(self):
+        """Остановка пула потоков"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _search_plane(self, plane: np.ndarray, template_plane: np.ndarray, method: str, deadline=None):
+        """Полный поиск по полосам кадра в пуле потоков"""
+        template_height, template_width = template_plane.shape[:2]
+        out_height = plane.shape[0] - template_height + 1
+        out_width = plane.shape[1] - template_width + 1
+        if (self.workers <= 1 or getattr(self._worker, "active", False) or out_width <= 0 or
+                out_height < 2 * self.workers or out_height * out_width < self.min_tile_area):
+            return self._best(plane, template_plane, method)
+
+        rows = -(-out_height // self.workers)
+        tops = list(range(0, out_height, rows))
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self._best, plane[top:min(out_height, top + rows) + template_height - 1],
+                            template_plane, method)
+            for top in tops
+        ]
+
+        best = None
+        for top, future in zip(tops, futures):
+            hit = self._wait(future, futures, deadline)
+            if hit is not None and (best is None or hit[0] > best[0]):
+                best = (hit[0], hit[1], hit[2] + top)
+        return best
+
+    @staticmethod
+    def _wait(future, futures: list, deadline):
+        """Результат полосы; при отмене или истечении срока оставшиеся полосы снимаются"""
+        if deadline is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=PARALLEL_MATCH_POLL_INTERVAL)
+            except FutureTimeoutError:
+                try:
+                    deadline.check()
+                except SearchInterrupted:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+
+    def match_many(self, image, templates: list, threshold: float = DEFAULT_IMAGE_CONFIDENCE,
+                   multi_scale: bool = False, scale_range: tuple = TEMPLATE_SCALE_RANGE,
+                   deadline=None) -> list:
+        """
+        Поиск нескольких шаблонов в одном кадре, по шаблону на поток
+
+        Returns:
+            list: результат match (или match_multiscale) для каждого шаблона по порядку
+        """
+        if self.workers <= 1 or len(templates) < 2:
+            return super().match_many(image, templates, threshold, multi_scale, scale_range, deadline)
+
+        started = time.perf_counter()
+        if not isinstance(image, Frame):
+            pixels = np.asarray(image)
+            if pixels.ndim == 2:
+                pixels = np.stack([pixels] * 3, axis=2)
+            image = Frame(np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8))
+
+        # Плоскости кадра строятся заранее, чтобы потоки не ждали друг друга на блокировке Frame
+        self.frame_plane(image)
+        if self.prefilter is not None:
+            image.rgb
+
+        def search(template):
+            self._worker.active = True
+            return self._match_one(image, template, threshold, multi_scale, scale_range, deadline)
+
+        # Порядок результатов - порядок шаблонов, независимо от порядка завершения
+        results = list(self._get_executor().map(search, templates))
+
+        self.last_stats = {
+            "mode": self.mode,
+            "method": self.method,
+            "templates": len(templates),
+            "found": sum(1 for result in results if result["found"]),
+            "interrupted": sum(1 for result in results if result.get("interrupted")),
+            "workers": self.workers,
+            "match_ms": (time.perf_counter() - started) * 1000,
+        }
+        return results
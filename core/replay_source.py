@@ -0,0 +1,177 @@
+"""
+Воспроизведение записанных кадров
+Содержит ReplayScreenSource - источник кадров из папки PNG/NPZ или файла записанной сессии,
+и record_session для записи такой сессии с любого источника
+"""
+
+import os
+import threading
+import time
+import numpy as np
+from PIL import Image
+from config import *
+from .screen_source import ScreenSource, copy_region
+
+
+REPLAY_MODES = ["realtime", "fixed", "fast"]
+
+
+class ReplayScreenSource(ScreenSource):
+    """Источник кадров, воспроизводящий записанную сессию
+
+    Режимы:
+        realtime - кадры сменяются по записанным временным меткам
+        fixed    - кадры сменяются с постоянной частотой fps
+        fast     - каждый захват возвращает следующий кадр (максимальная скорость)
+
+    Кадры хранятся в координатах экрана начиная с origin (left, top), поэтому
+    детекторы получают те же массивы и вырезки, что и при живом захвате.
+    """
+
+    name = "replay"
+    fills_in_place = True
+
+    def __init__(self, path: str, mode: str = "fast", fps: float = 30.0, loop: bool = True):
+        super().__init__()
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Неизвестный режим воспроизведения: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.fps = fps
+        self.loop = loop
+        self.origin = (0, 0)
+
+        self.frames, self.timestamps = self._load(path)
+        if not self.frames:
+            raise ValueError(f"Нет кадров для воспроизведения: {path}")
+
+        self._lock = threading.Lock()
+        self.frame_index = 0
+        self.frames_served = 0
+        self._started_at = None
+
+    def _load(self, path: str) -> tuple:
+        """Загрузка кадров из папки или файла сессии"""
+        if os.path.isdir(path):
+            frames = []
+            for filename in sorted(os.listdir(path)):
+                full_path = os.path.join(path, filename)
+                extension = os.path.splitext(filename)[1].lower()
+                if extension == ".npz":
+                    with np.load(full_path) as data:
+                        frames.extend(self._to_frames(data["frames"] if "frames" in data else data[data.files[0]]))
+                elif extension in IMAGE_EXTENSIONS:
+                    with Image.open(full_path) as image:
+                        frames.append(np.asarray(image.convert("RGB")))
+            timestamps = [i / self.fps for i in range(len(frames))]
+            return frames, timestamps
+
+        with np.load(path) as data:
+            frames = self._to_frames(data["frames"])
+            if "timestamps" in data:
+                timestamps = [float(t) for t in data["timestamps"]]
+            else:
+                timestamps = [i / self.fps for i in range(len(frames))]
+            if "origin" in data:
+                self.origin = tuple(int(v) for v in data["origin"])
+        # Метки времени от начала сессии
+        first = timestamps[0] if timestamps else 0.0
+        return frames, [t - first for t in timestamps]
+
+    @staticmethod
+    def _to_frames(array) -> list:
+        """Разбиение массива (N, H, W, 3) или (H, W, 3) на список кадров RGB"""
+        array = np.asarray(array)
+        if array.ndim == 3:
+            array = array[None]
+        return [np.ascontiguousarray(frame[:, :, :3], dtype=np.uint8) for frame in array]
+
+    def _current_index(self) -> int:
+        """Индекс кадра для текущего захвата в зависимости от режима"""
+        count = len(self.frames)
+
+        if self.mode == "fast":
+            index = self.frame_index
+            self.frame_index += 1
+        else:
+            now = time.perf_counter()
+            if self._started_at is None:
+                self._started_at = now
+            elapsed = now - self._started_at
+            if self.mode == "fixed":
+                index = int(elapsed * self.fps)
+            else:
+                duration = self.timestamps[-1] + (1.0 / self.fps)
+                loops, position = divmod(elapsed, duration) if self.loop else (0, elapsed)
+                index = int(np.searchsorted(self.timestamps, position, side="right")) - 1
+                index += int(loops) * count
+            self.frame_index = index
+
+        if self.loop:
+            return index % count
+        return min(index, count - 1)
+
+    def _frame_origin(self, region: tuple) -> tuple:
+        return (region[0], region[1]) if region else self.origin
+
+    def _capture_into(self, region: tuple, out: np.ndarray):
+        with self._lock:
+            pixels = self.frames[self._current_index()]
+            self.frames_served += 1
+        copy_region(pixels, region, out, self.origin)
+
+    def rewind(self):
+        """Возврат к первому кадру"""
+        with self._lock:
+            self.frame_index = 0
+            self._started_at = None
+
+    def is_finished(self) -> bool:
+        """Все кадры воспроизведены (только без зацикливания)"""
+        return not self.loop and self.frame_index >= len(self.frames) - 1
+
+    def screen_size(self) -> tuple:
+        height, width = self.frames[0].shape[:2]
+        return width, height
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats.update({
+            "mode": self.mode,
+            "frames_total": len(self.frames),
+            "frames_served": self.frames_served,
+        })
+        return stats
+
+
+def record_session(source: ScreenSource, path: str, frame_count: int,
+                   region: tuple = None, fps: float = 30.0) -> str:
+    """
+    Запись сессии с источника кадров в файл .npz
+
+    Args:
+        source: Источник кадров (обычно живой экран)
+        path: Путь к файлу сессии
+        frame_count: Количество кадров
+        region: Регион захвата (left, top, width, height) или None - весь экран
+        fps: Частота записи
+
+    Returns:
+        str: Путь к сохраненному файлу
+    """
+    frames = []
+    timestamps = []
+    interval = 1.0 / fps if fps > 0 else 0.0
+    for _ in range(frame_count):
+        started = time.perf_counter()
+        frames.append(np.array(source.grab_array(region)))
+        timestamps.append(started)
+        remaining = interval - (time.perf_counter() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    origin = (region[0], region[1]) if region else (0, 0)
+    np.savez_compressed(path, frames=np.stack(frames), timestamps=np.array(timestamps),
+                        origin=np.array(origin))
+    return path if path.endswith(".npz") else f"{path}.npz"
@@ -0,0 +1,308 @@
+"""
+Модуль захвата экрана
+Содержит ScreenSource интерфейс и его реализации, через которые проходят все снимки экрана
+"""
+
+import threading
+import time
+import numpy as np
+from PIL import Image
+from config import *
+from .frame import Frame
+
+if MSS_AVAILABLE:
+    import mss
+
+
+class ScreenSource:
+    """Базовый источник кадров экрана
+
+    Регион задается как в pyautogui.screenshot: (left, top, width, height).
+    Наследники реализуют _capture_frame(region), который возвращает Frame,
+    или более простой _capture(region), который возвращает массив (H, W, 3) RGB.
+    Наследники с fills_in_place = True умеют писать кадр в готовый массив
+    (_capture_into) и при заданном пуле буферов не выделяют память на снимок.
+
+    Кадр из grab_frame принадлежит вызывающему: после поиска его нужно освободить
+    через release() (или with), чтобы буферы вернулись в пул.
+    """
+
+    name = "base"
+    fills_in_place = False
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.captures = 0
+        self.total_capture_time = 0.0
+        self.last_capture_time = 0.0
+        self.max_capture_time = 0.0
+        self.buffer_pool = None
+
+    def set_buffer_pool(self, pool):
+        """Установка пула буферов кадров (None - новый массив на каждый снимок)"""
+        self.buffer_pool = pool
+
+    def grab_frame(self, region: tuple = None) -> Frame:
+        """Захват области экрана в Frame"""
+        start = time.perf_counter()
+        frame = self._capture_frame(region)
+        self._record_capture(time.perf_counter() - start)
+        return frame
+
+    def grab_array(self, region: tuple = None) -> np.ndarray:
+        """Захват области экрана в собственный массив (H, W, 3) uint8 RGB"""
+        with self.grab_frame(region) as frame:
+            return np.array(frame.rgb)
+
+    def grab(self, region: tuple = None) -> Image.Image:
+        """Захват области экрана в PIL Image (совместимо с pyautogui.screenshot)"""
+        with self.grab_frame(region) as frame:
+            return frame.to_image()
+
+    def pixel(self, x: int, y: int) -> tuple:
+        """Цвет одного пикселя экрана (r, g, b)"""
+        with self.grab_frame((x, y, 1, 1)) as frame:
+            return tuple(int(c) for c in frame.rgb[0, 0, :3])
+
+    def screen_size(self) -> tuple:
+        """Размер экрана (width, height)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Освобождение ресурсов источника"""
+        pass
+
+    def _capture_frame(self, region: tuple) -> Frame:
+        left, top = self._frame_origin(region)
+        if self.buffer_pool is not None and self.fills_in_place:
+            width, height = (region[2], region[3]) if region else self.screen_size()
+            buffer = self.buffer_pool.acquire((int(height), int(width), 3))
+            self._capture_into(region, buffer.array)
+            return Frame(buffer.array, left, top, buffer=buffer)
+        return Frame(self._capture(region), left, top, pool=self.buffer_pool)
+
+    def _frame_origin(self, region: tuple) -> tuple:
+        """Координаты левого верхнего угла кадра на экране"""
+        return (region[0], region[1]) if region else (0, 0)
+
+    def _capture(self, region: tuple) -> np.ndarray:
+        if self.fills_in_place:
+            width, height = (region[2], region[3]) if region else self.screen_size()
+            pixels = np.empty((int(height), int(width), 3), dtype=np.uint8)
+            self._capture_into(region, pixels)
+            return pixels
+        raise NotImplementedError
+
+    def _capture_into(self, region: tuple, out: np.ndarray):
+        """Захват области в готовый массив (H, W, 3) RGB"""
+        raise NotImplementedError
+
+    def _record_capture(self, elapsed: float):
+        with self._stats_lock:
+            self.captures += 1
+            self.total_capture_time += elapsed
+            self.last_capture_time = elapsed
+            if elapsed > self.max_capture_time:
+                self.max_capture_time = elapsed
+
+    def get_stats(self) -> dict:
+        """Статистика задержки захвата"""
+        with self._stats_lock:
+            average = self.total_capture_time / self.captures if self.captures else 0.0
+            return {
+                "backend": self.name,
+                "captures": self.captures,
+                "avg_ms": average * 1000,
+                "last_ms": self.last_capture_time * 1000,
+                "max_ms": self.max_capture_time * 1000,
+            }
+
+    def reset_stats(self):
+        """Сброс статистики захвата"""
+        with self._stats_lock:
+            self.captures = 0
+            self.total_capture_time = 0.0
+            self.last_capture_time = 0.0
+            self.max_capture_time = 0.0
+
+
+class PyAutoGuiScreenSource(ScreenSource):
+    """Захват через pyautogui.screenshot (резервный вариант)"""
+
+    name = "pyautogui"
+
+    def _capture(self, region: tuple) -> np.ndarray:
+        import pyautogui
+        screenshot = pyautogui.screenshot(region=region) if region else pyautogui.screenshot()
+        return np.asarray(screenshot.convert("RGB"))
+
+    def screen_size(self) -> tuple:
+        import pyautogui
+        return tuple(pyautogui.size())
+
+
+class MssScreenSource(ScreenSource):
+    """Захват через mss с постоянным подключением к дисплею
+
+    Подключение к дисплею (и буферы mss) создаются один раз на поток
+    и переиспользуются между снимками; захватывается только запрошенная область.
+    """
+
+    name = "mss"
+
+    def __init__(self, monitor_index: int = 1):
+        super().__init__()
+        self.monitor_index = monitor_index
+        self._local = threading.local()
+        self._grabbers = []
+        self._grabbers_lock = threading.Lock()
+
+    def _get_grabber(self):
+        grabber = getattr(self._local, "grabber", None)
+        if grabber is None:
+            # mss не потокобезопасен - отдельный экземпляр на каждый поток
+            grabber = mss.mss()
+            self._local.grabber = grabber
+            with self._grabbers_lock:
+                self._grabbers.append(grabber)
+        return grabber
+
+    def _monitor(self, grabber) -> dict:
+        monitors = grabber.monitors
+        index = self.monitor_index if self.monitor_index < len(monitors) else 0
+        return monitors[index]
+
+    def _capture_frame(self, region: tuple) -> Frame:
+        grabber = self._get_grabber()
+        if region:
+            left, top, width, height = region
+            area = {"left": int(left), "top": int(top), "width": int(width), "height": int(height)}
+        else:
+            area = self._monitor(grabber)
+
+        shot = grabber.grab(area)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        if self.buffer_pool is None:
+            # Сырой BGRA буфер mss без копирования; RGB/серый считаются кадром по требованию
+            return Frame(bgra, area["left"], area["top"], order="BGRA")
+
+        # mss выделяет shot.raw на каждый снимок: он копируется в буфер пула и сразу
+        # освобождается, так что кадры (и их производные плоскости) живут в пуле
+        buffer = self.buffer_pool.acquire(bgra.shape)
+        np.copyto(buffer.array, bgra)
+        del shot, bgra
+        return Frame(buffer.array, area["left"], area["top"], order="BGRA", buffer=buffer)
+
+    def screen_size(self) -> tuple:
+        monitor = self._monitor(self._get_grabber())
+        return monitor["width"], monitor["height"]
+
+    def close(self):
+        with self._grabbers_lock:
+            for grabber in self._grabbers:
+                try:
+                    grabber.close()
+                except Exception:
+                    pass
+            self._grabbers = []
+        self._local = threading.local()
+
+
+class SyntheticScreenSource(ScreenSource):
+    """Экран в памяти для тестов и работы без дисплея"""
+
+    name = "synthetic"
+    fills_in_place = True
+
+    def __init__(self, image=None, size: tuple = (1920, 1080)):
+        super().__init__()
+        self._lock = threading.Lock()
+        if image is None:
+            image = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self.set_frame(image)
+
+    def set_frame(self, image):
+        """Замена содержимого экрана (PIL Image или массив (H, W, 3))"""
+        pixels = np.asarray(image)
+        if pixels.ndim == 2:
+            pixels = np.stack([pixels] * 3, axis=2)
+        pixels = np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8)
+        with self._lock:
+            self._pixels = pixels
+
+    def draw_rect(self, left: int, top: int, width: int, height: int, color: tuple):
+        """Закраска прямоугольника на экране"""
+        with self._lock:
+            pixels = self._pixels.copy()
+            pixels[top:top + height, left:left + width] = color[:3]
+            self._pixels = pixels
+
+    def _capture_into(self, region: tuple, out: np.ndarray):
+        with self._lock:
+            pixels = self._pixels
+        copy_region(pixels, region, out)
+
+    def screen_size(self) -> tuple:
+        with self._lock:
+            return self._pixels.shape[1], self._pixels.shape[0]
+
+
+def copy_region(pixels: np.ndarray, region: tuple, out: np.ndarray, origin: tuple = (0, 0)):
+    """
+    Копирование региона экрана из массива pixels (начинается в origin) в out
+
+    Часть региона за пределами pixels остается черной, как у реального захвата.
+    """
+    if not region:
+        np.copyto(out, pixels)
+        return
+    left, top, width, height = (int(v) for v in region)
+    left -= origin[0]
+    top -= origin[1]
+    src = pixels[max(0, top):top + height, max(0, left):left + width]
+    if src.shape[:2] != (height, width):
+        out.fill(0)
+    out[max(0, -top):max(0, -top) + src.shape[0], max(0, -left):max(0, -left) + src.shape[1]] = src
+
+
+def create_screen_source(backend: str = None) -> ScreenSource:
+    """Создание источника кадров по имени бэкенда ("auto", "mss", "pyautogui", "synthetic", "replay")"""
+    backend = backend or SCREEN_CAPTURE_BACKEND
+    if backend == "synthetic":
+        return SyntheticScreenSource()
+    if backend == "replay":
+        from .replay_source import ReplayScreenSource
+        return ReplayScreenSource(SCREEN_REPLAY_PATH, mode=SCREEN_REPLAY_MODE)
+    if backend == "pyautogui":
+        return PyAutoGuiScreenSource()
+    if backend in ("auto", "mss") and MSS_AVAILABLE:
+        return MssScreenSource()
+    if backend == "mss":
+        print("mss недоступен - используется захват через pyautogui")
+    return PyAutoGuiScreenSource()
+
+
+_default_source = None
+_default_source_lock = threading.Lock()
+
+
+def get_screen_source() -> ScreenSource:
+    """Общий источник кадров приложения"""
+    global _default_source
+    with _default_source_lock:
+        if _default_source is None:
+            _default_source = create_screen_source()
+            if FRAME_BUFFER_POOL_ENABLED:
+                from .buffer_pool import get_buffer_pool
+                _default_source.set_buffer_pool(get_buffer_pool())
+            if FRAME_CACHE_ENABLED:
+                from .frame_cache import CachedScreenSource
+                _default_source = CachedScreenSource(_default_source)
+        return _default_source
+
+
+def set_screen_source(source: ScreenSource):
+    """Замена общего источника кадров (например, на SyntheticScreenSource в тестах)"""
+    global _default_source
+    with _default_source_lock:
+        _default_source = source
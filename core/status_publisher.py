@@ -0,0 +1,53 @@
+"""
+Публикация состояния кликера для интерфейса
+Содержит StatusPublisher - поток кликов только записывает значения,
+а интерфейс забирает изменения со своей частотой в потоке Tk
+"""
+
+import threading
+
+
+class StatusPublisher:
+    """Последние значения статуса и счетчика кликов
+
+    Поток кликов вызывает publish_count после каждого клика - это одно
+    присваивание без блокировок и без обращения к виджетам. Интерфейс вызывает
+    drain с фиксированной частотой и получает только изменившиеся значения:
+    сколько бы кликов ни прошло между опросами, обновление одно.
+    """
+
+    def __init__(self):
+        self.click_count = 0
+        self.status = "stopped"
+        self._status_version = 0
+        self._status_lock = threading.Lock()
+        self._drained_count = None
+        self._drained_version = 0
+
+    def publish_count(self, click_count: int):
+        """Новое значение счетчика кликов (из потока кликов)"""
+        self.click_count = click_count
+
+    def publish_status(self, status: str):
+        """Смена статуса ("running", "stopped"); каждая смена доходит до интерфейса"""
+        with self._status_lock:
+            self.status = status
+            self._status_version += 1
+
+    def drain(self) -> tuple:
+        """
+        Изменения с прошлого вызова (из потока интерфейса)
+
+        Returns:
+            tuple: (статус или None, если не менялся; счетчик или None, если не менялся)
+        """
+        with self._status_lock:
+            version = self._status_version
+            status = self.status
+        changed_status = status if version != self._drained_version else None
+        self._drained_version = version
+
+        click_count = self.click_count
+        changed_count = click_count if click_count != self._drained_count or changed_status else None
+        self._drained_count = click_count
+        return changed_status, changed_count
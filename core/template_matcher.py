@@ -0,0 +1,562 @@
+"""
+Поиск шаблона в кадре через OpenCV
+Содержит Template - заранее декодированный шаблон, и TemplateMatcher, который
+запускает cv2.matchTemplate прямо по плоскостям захваченного кадра
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+from config import *
+from .frame import Frame
+from .template_prefilter import TemplatePrefilter
+from .cancellation import SearchInterrupted, check_deadline
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+
+class Template:
+    """Декодированный шаблон изображения
+
+    Пиксели хранятся в тех же форматах, что и плоскости Frame (RGB, BGR, серый),
+    поэтому сопоставление не делает преобразований шаблона на каждом поиске.
+    """
+
+    def __init__(self, pixels, path: str = None):
+        rgb = np.asarray(pixels)
+        if rgb.ndim == 2:
+            rgb = np.stack([rgb] * 3, axis=2)
+        self.rgb = np.ascontiguousarray(rgb[:, :, :3], dtype=np.uint8)
+        self.path = path
+        self.bgr = np.ascontiguousarray(self.rgb[:, :, ::-1])
+        if OPENCV_AVAILABLE:
+            self.gray = cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY)
+        else:
+            self.gray = np.asarray(Image.fromarray(self.rgb).convert("L"))
+
+        # Статистика яркости: однотонный шаблон (std ~ 0) не дает осмысленной оценки
+        self.mean = float(self.gray.mean())
+        self.std = float(self.gray.std())
+
+        # Масштабированные варианты для многомасштабного поиска: (режим, масштаб) -> массив,
+        # не больше TEMPLATE_SCALED_CACHE_SIZE (давно не использованные вытесняются)
+        self._scaled = OrderedDict()
+        self._scaled_bytes = 0
+        self._scaled_lock = threading.Lock()
+
+        # Цветовая подпись для предфильтра (False - еще не строилась)
+        self._signature = False
+
+    @classmethod
+    def from_file(cls, path: str):
+        """Загрузка и декодирование шаблона из файла"""
+        with Image.open(path) as image:
+            return cls(image.convert("RGB"), path)
+
+    @property
+    def width(self) -> int:
+        return self.rgb.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.rgb.shape[0]
+
+    @property
+    def size(self) -> tuple:
+        """Размер шаблона (width, height)"""
+        return self.width, self.height
+
+    def plane(self, mode: str, scale: float = 1.0) -> np.ndarray:
+        """Шаблон в режиме "gray" или "color" (BGR), масштабированный в scale раз"""
+        base = self.gray if mode == "gray" else self.bgr
+        scale = round(scale, 4)
+        if scale == 1.0:
+            return base
+        key = (mode, scale)
+        with self._scaled_lock:
+            scaled = self._scaled.get(key)
+            if scaled is not None:
+                self._scaled.move_to_end(key)
+                return scaled
+
+        width = max(1, int(round(self.width * scale)))
+        height = max(1, int(round(self.height * scale)))
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+        scaled = cv2.resize(base, (width, height), interpolation=interpolation)
+
+        with self._scaled_lock:
+            if key not in self._scaled:
+                self._scaled[key] = scaled
+                self._scaled_bytes += scaled.nbytes
+                while len(self._scaled) > TEMPLATE_SCALED_CACHE_SIZE:
+                    _, evicted = self._scaled.popitem(last=False)
+                    self._scaled_bytes -= evicted.nbytes
+        return scaled
+
+    def to_image(self) -> Image.Image:
+        """Шаблон как PIL Image (RGB)"""
+        return Image.fromarray(self.rgb)
+
+    @property
+    def nbytes(self) -> int:
+        """Память, занятая всеми вариантами шаблона (включая масштабированные)"""
+        return self.rgb.nbytes + self.bgr.nbytes + self.gray.nbytes + self._scaled_bytes
+
+
+class TemplateMatcher:
+    """Поиск лучшего совпадения шаблона в кадре через cv2.matchTemplate
+
+    Режимы:
+        gray  - сравнение в оттенках серого (быстрее в ~3 раза)
+        color - сравнение по трем каналам BGR
+
+    Оценка совпадения всегда приводится к шкале 0..1, где больше - лучше,
+    чтобы ее можно было сравнивать с confidence независимо от метода.
+    """
+
+    def __init__(self, mode: str = TEMPLATE_MATCH_MODE, method: str = TEMPLATE_MATCH_METHOD,
+                 prefilter: bool = TEMPLATE_PREFILTER_ENABLED):
+        if not OPENCV_AVAILABLE:
+            raise RuntimeError("OpenCV недоступен - поиск шаблона через matchTemplate невозможен")
+        self.set_mode(mode)
+        self.set_method(method)
+
+        # Цветовой предфильтр: matchTemplate только по областям-кандидатам
+        self.prefilter = TemplatePrefilter() if prefilter else None
+
+        # Масштаб, на котором шаблон был найден в прошлый раз: путь (или id) -> масштаб
+        self.scale_cache = {}
+
+        # Статистика последнего поиска
+        self.last_stats = {}
+
+    def set_mode(self, mode: str):
+        """Установка режима сравнения ("gray" или "color")"""
+        if mode not in TEMPLATE_MATCH_MODES:
+            raise ValueError(f"Неизвестный режим сравнения: {mode}")
+        self.mode = mode
+
+    def set_method(self, method: str):
+        """Установка метода сравнения (см. TEMPLATE_MATCH_METHODS)"""
+        if method not in TEMPLATE_MATCH_METHODS:
+            raise ValueError(f"Неизвестный метод сравнения: {method}")
+        self.method = method
+
+    def set_prefilter(self, enabled: bool):
+        """Включение/выключение цветового предфильтра"""
+        if not enabled:
+            self.prefilter = None
+        elif self.prefilter is None:
+            self.prefilter = TemplatePrefilter()
+
+    def method_for(self, template: Template) -> str:
+        """Метод для шаблона: у однотонного шаблона корреляция не определена"""
+        if self.method == "ccoeff_normed" and template.std < 0.5:
+            return "sqdiff_normed"
+        return self.method
+
+    def frame_plane(self, image) -> np.ndarray:
+        """Плоскость кадра для текущего режима (у Frame - запомненная)"""
+        if isinstance(image, Frame):
+            return image.gray if self.mode == "gray" else image.bgr
+        pixels = np.asarray(image)
+        if pixels.ndim == 2:
+            return pixels if self.mode == "gray" else cv2.cvtColor(pixels, cv2.COLOR_GRAY2BGR)
+        rgb = np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8)
+        code = cv2.COLOR_RGB2GRAY if self.mode == "gray" else cv2.COLOR_RGB2BGR
+        return cv2.cvtColor(rgb, code)
+
+    def template_plane(self, template: Template, scale: float = 1.0) -> np.ndarray:
+        """Плоскость шаблона для текущего режима"""
+        return template.plane(self.mode, scale)
+
+    def score_map(self, plane: np.ndarray, template_plane: np.ndarray, method: str = None) -> np.ndarray:
+        """Карта оценок 0..1 (больше - лучше) для каждой позиции левого верхнего угла"""
+        method = method or self.method
+        cv_method = {
+            "ccoeff_normed": cv2.TM_CCOEFF_NORMED,
+            "ccorr_normed": cv2.TM_CCORR_NORMED,
+            "sqdiff_normed": cv2.TM_SQDIFF_NORMED,
+        }[method]
+        result = cv2.matchTemplate(plane, template_plane, cv_method)
+        if method == "sqdiff_normed":
+            result = 1.0 - result
+        return result
+
+    def match(self, image, template: Template, threshold: float = DEFAULT_IMAGE_CONFIDENCE,
+              scale: float = 1.0, deadline=None) -> dict:
+        """
+        Поиск лучшего совпадения шаблона в кадре
+
+        Args:
+            image: Кадр (Frame, PIL Image или массив (H, W, 3) RGB)
+            template: Декодированный шаблон
+            threshold: Минимальная оценка, при которой шаблон считается найденным
+            scale: Масштаб шаблона
+            deadline: Срок и отмена поиска (Deadline); при прерывании - SearchInterrupted
+
+        Returns:
+            dict: found, position (центр в координатах кадра), score, box (x, y, w, h)
+        """
+        check_deadline(deadline)
+        started = time.perf_counter()
+        plane = self.frame_plane(image)
+        template_plane = self.template_plane(template, scale)
+        height, width = template_plane.shape[:2]
+
+        method = self.method_for(template)
+
+        result = {"found": False, "position": None, "score": 0.0, "box": None}
+        prefilter = "off"
+        regions = None
+        if self.prefilter is not None and scale == 1.0:
+            if self.prefilter.applies(plane.shape, template_plane.shape):
+                regions = self.prefilter.candidates(self._rgb(image), template)
+                prefilter = "fallback" if regions is None else "candidates"
+            else:
+                prefilter = "skipped"
+
+        hit = None
+        if regions:
+            # matchTemplate только по кандидатам; оценки те же, что при полном поиске
+            for left, top, region_width, region_height in regions:
+                check_deadline(deadline)
+                window = self._best(plane[top:top + region_height, left:left + region_width],
+                                    template_plane, method)
+                if window is not None and (hit is None or window[0] > hit[0]):
+                    hit = (window[0], window[1] + left, window[2] + top)
+            if hit is None or hit[0] < threshold:
+                # Кандидаты не подтвердились - цвета цели могли измениться
+                prefilter = "fallback"
+                hit = None
+        if hit is None:
+            check_deadline(deadline)
+            hit = self._search_plane(plane, template_plane, method, deadline)
+
+        if hit is not None:
+            score, x, y = hit
+            result = {
+                "found": score >= threshold,
+                "position": (x + width // 2, y + height // 2),
+                "score": float(score),
+                "box": (x, y, width, height),
+            }
+
+        self.last_stats = {
+            "mode": self.mode,
+            "method": self.method,
+            "score": result["score"],
+            "prefilter": prefilter,
+            "candidates": len(regions) if regions else 0,
+            "match_ms": (time.perf_counter() - started) * 1000,
+        }
+        return result
+
+    @staticmethod
+    def _rgb(image) -> np.ndarray:
+        """Кадр как массив (H, W, 3) RGB для цветового предфильтра"""
+        if isinstance(image, Frame):
+            return image.rgb
+        pixels = np.asarray(image)
+        if pixels.ndim == 2:
+            pixels = np.stack([pixels] * 3, axis=2)
+        return np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8)
+
+    def match_all(self, image, template: Template, threshold: float = DEFAULT_IMAGE_CONFIDENCE,
+                  max_results: int = LOCATE_ALL_MAX_RESULTS, overlap: float = LOCATE_ALL_NMS_OVERLAP,
+                  deadline=None) -> list:
+        """
+        Все совпадения шаблона выше threshold за один проход matchTemplate
+
+        Соседние позиции одного и того же объекта подавляются (non-maximum
+        suppression): из пересекающихся больше чем на overlap (IoU) рамок
+        остается рамка с лучшей оценкой.
+
+        Returns:
+            list: результаты (found, position, score, box) по убыванию оценки
+        """
+        check_deadline(deadline)
+        started = time.perf_counter()
+        plane = self.frame_plane(image)
+        template_plane = self.template_plane(template)
+        results = []
+
+        if plane.shape[0] >= template.height and plane.shape[1] >= template.width:
+            scores = self.score_map(plane, template_plane, self.method_for(template))
+            # Кандидаты - локальные максимумы карты оценок выше порога
+            peaks = (scores >= threshold) & (scores >= cv2.dilate(scores, np.ones((3, 3), np.uint8)))
+            ys, xs = np.nonzero(peaks)
+            values = scores[ys, xs]
+
+            # Ограничиваем число кандидатов до подавления лучшими по оценке
+            limit = max_results * 50
+            if len(values) > limit:
+                keep = np.argpartition(values, -limit)[-limit:]
+                ys, xs, values = ys[keep], xs[keep], values[keep]
+
+            order = np.argsort(-values, kind="stable")
+            for x, y, score in self._suppress(xs[order], ys[order], values[order],
+                                              template.width, template.height, overlap, max_results):
+                results.append({
+                    "found": True,
+                    "position": (x + template.width // 2, y + template.height // 2),
+                    "score": score,
+                    "box": (x, y, template.width, template.height),
+                })
+
+        self.last_stats = {
+            "mode": self.mode,
+            "method": self.method,
+            "matches": len(results),
+            "score": results[0]["score"] if results else 0.0,
+            "match_ms": (time.perf_counter() - started) * 1000,
+        }
+        return results
+
+    @staticmethod
+    def _suppress(xs: np.ndarray, ys: np.ndarray, values: np.ndarray, width: int, height: int,
+                  overlap: float, max_results: int) -> list:
+        """Жадное подавление немаксимумов для рамок одного размера (кандидаты по убыванию оценки)"""
+        kept = []
+        kept_x = np.empty(0, dtype=np.int64)
+        kept_y = np.empty(0, dtype=np.int64)
+        area = float(width * height)
+        for x, y, score in zip(xs.tolist(), ys.tolist(), values.tolist()):
+            if len(kept_x):
+                # Пересечение одинаковых рамок считается по сдвигу между ними
+                inter_w = np.clip(width - np.abs(kept_x - x), 0, None)
+                inter_h = np.clip(height - np.abs(kept_y - y), 0, None)
+                inter = inter_w * inter_h
+                if np.any(inter / (2 * area - inter) > overlap):
+                    continue
+            kept.append((x, y, float(score)))
+            kept_x = np.append(kept_x, x)
+            kept_y = np.append(kept_y, y)
+            if len(kept) >= max_results:
+                break
+        return kept
+
+    def _best(self, plane: np.ndarray, template_plane: np.ndarray, method: str):
+        """Лучшая позиция шаблона в плоскости: (score, x, y) или None, если шаблон не помещается"""
+        if plane.shape[0] < template_plane.shape[0] or plane.shape[1] < template_plane.shape[1]:
+            return None
+        _, score, _, (x, y) = cv2.minMaxLoc(self.score_map(plane, template_plane, method))
+        return float(score), x, y
+
+    def _search_plane(self, plane: np.ndarray, template_plane: np.ndarray, method: str, deadline=None):
+        """Полный поиск по плоскости кадра (подклассы могут делить его на части)"""
+        return self._best(plane, template_plane, method)
+
+    @staticmethod
+    def scales(scale_range: tuple = TEMPLATE_SCALE_RANGE, step: float = TEMPLATE_SCALE_STEP) -> list:
+        """Геометрическая сетка масштабов в диапазоне scale_range, включая 1.0"""
+        low, high = scale_range
+        step = max(1.01, step)
+        scales = [1.0] if low <= 1.0 <= high else []
+        scale = 1.0
+        while scale / step >= low:
+            scale /= step
+            scales.append(scale)
+        scale = 1.0
+        while scale * step <= high:
+            scale *= step
+            scales.append(scale)
+        return sorted(scales)
+
+    @staticmethod
+    def pyramid_levels(template: Template, scale_range: tuple = TEMPLATE_SCALE_RANGE) -> int:
+        """Число уменьшений кадра вдвое для грубого прохода: шаблон в самом мелком
+        масштабе не должен стать меньше TEMPLATE_PYRAMID_MIN_SIZE"""
+        smallest = min(template.width, template.height) * scale_range[0]
+        levels = 0
+        while levels < TEMPLATE_PYRAMID_MAX_LEVELS and smallest / 2 ** (levels + 1) >= TEMPLATE_PYRAMID_MIN_SIZE:
+            levels += 1
+        return levels
+
+    def _downscaled_plane(self, image, plane: np.ndarray, factor: int) -> np.ndarray:
+        """Уровень пирамиды кадра (у Frame - запомненный)"""
+        if factor <= 1:
+            return plane
+        if isinstance(image, Frame):
+            return image.downscaled(factor, "gray" if self.mode == "gray" else "bgr")
+        size = (max(1, plane.shape[1] // factor), max(1, plane.shape[0] // factor))
+        return cv2.resize(plane, size, interpolation=cv2.INTER_AREA)
+
+    def _refine(self, plane: np.ndarray, template: Template, scale: float, center: tuple,
+                margin: int, method: str, factor: int = 1):
+        """
+        Поиск в окне вокруг center на уровне пирамиды factor (1 - полное разрешение)
+
+        Args:
+            plane: Плоскость уровня (кадр, уменьшенный в factor раз)
+            center: Ожидаемый центр шаблона в координатах полного разрешения
+            margin: Запас окна в пикселях уровня
+
+        Returns:
+            tuple: (score, x, y) в координатах уровня или None
+        """
+        template_plane = self.template_plane(template, scale / factor)
+        height, width = template_plane.shape[:2]
+        left = max(0, int(center[0] / factor - width / 2) - margin)
+        top = max(0, int(center[1] / factor - height / 2) - margin)
+        window = plane[top:top + height + 2 * margin, left:left + width + 2 * margin]
+        hit = self._best(window, template_plane, method)
+        if hit is None:
+            return None
+        score, x, y = hit
+        return score, x + left, y + top
+
+    def match_multiscale(self, image, template: Template, threshold: float = DEFAULT_IMAGE_CONFIDENCE,
+                         scale_range: tuple = TEMPLATE_SCALE_RANGE,
+                         step: float = TEMPLATE_SCALE_STEP, deadline=None) -> dict:
+        """
+        Поиск шаблона в нескольких масштабах (изменение DPI или масштаба интерфейса)
+
+        Сначала проверяется масштаб, на котором шаблон был найден в прошлый раз.
+        Если там его нет, поиск идет от грубого к точному по пирамиде кадра (уровни
+        вдвое меньше предыдущего, у Frame запоминаются): все масштабы перебираются
+        на самом мелком уровне, позиция лучшего попадания уточняется в малом окне
+        на каждом следующем уровне, а на полном разрешении уточняются еще и
+        соседние масштабы.
+
+        Returns:
+            dict: как у match, плюс scale - масштаб найденного шаблона
+        """
+        check_deadline(deadline)
+        started = time.perf_counter()
+        plane = self.frame_plane(image)
+        method = self.method_for(template)
+        key = template.path or id(template)
+        matches_tried = 0
+        result = {"found": False, "position": None, "score": 0.0, "box": None, "scale": None}
+
+        # Прошлый масштаб - поиск стоит как обычный одномасштабный
+        cached_scale = self.scale_cache.get(key)
+        if cached_scale is not None:
+            hit = self._best(plane, self.template_plane(template, cached_scale), method)
+            matches_tried += 1
+            if hit is not None:
+                result = self._result(hit, template, cached_scale, threshold)
+
+        if not result["found"]:
+            # Грубый проход по масштабам на самом мелком уровне пирамиды
+            factor = 2 ** self.pyramid_levels(template, scale_range)
+            coarse_plane = self._downscaled_plane(image, plane, factor)
+
+            best = None  # (score, scale, центр на полном разрешении)
+            for scale in self.scales(scale_range, step):
+                check_deadline(deadline)
+                template_plane = self.template_plane(template, scale / factor)
+                hit = self._best(coarse_plane, template_plane, method)
+                matches_tried += 1
+                if hit is not None and (best is None or hit[0] > best[0]):
+                    height, width = template_plane.shape[:2]
+                    center = ((hit[1] + width / 2) * factor, (hit[2] + height / 2) * factor)
+                    best = (hit[0], scale, center)
+
+            if best is not None:
+                _, best_scale, center = best
+
+                # Спуск по промежуточным уровням: позиция уточняется в окне +-3 пикселя уровня
+                level = factor // 2
+                while level > 1:
+                    check_deadline(deadline)
+                    hit = self._refine(self._downscaled_plane(image, plane, level), template, best_scale,
+                                       center, 3, method, level)
+                    matches_tried += 1
+                    if hit is not None:
+                        height, width = self.template_plane(template, best_scale / level).shape[:2]
+                        center = ((hit[1] + width / 2) * level, (hit[2] + height / 2) * level)
+                    level //= 2
+
+                # Уточнение соседних масштабов в окне вокруг попадания на полном разрешении
+                half_step = math.sqrt(max(1.01, step))
+                margin = 2 * min(factor, 2) + 2
+                refined = None
+                for scale in (best_scale / half_step, best_scale, best_scale * half_step):
+                    check_deadline(deadline)
+                    hit = self._refine(plane, template, scale, center, margin, method)
+                    matches_tried += 1
+                    if hit is not None and (refined is None or hit[0] > refined[0][0]):
+                        refined = (hit, scale)
+                if refined is not None and refined[0][0] > result["score"]:
+                    result = self._result(refined[0], template, refined[1], threshold)
+
+        if result["found"]:
+            self.scale_cache[key] = result["scale"]
+
+        self.last_stats = {
+            "mode": self.mode,
+            "method": self.method,
+            "score": result["score"],
+            "scale": result["scale"],
+            "cached_scale": cached_scale,
+            "matches_tried": matches_tried,
+            "match_ms": (time.perf_counter() - started) * 1000,
+        }
+        return result
+
+    def match_many(self, image, templates: list, threshold: float = DEFAULT_IMAGE_CONFIDENCE,
+                   multi_scale: bool = False, scale_range: tuple = TEMPLATE_SCALE_RANGE,
+                   deadline=None) -> list:
+        """
+        Поиск нескольких шаблонов в одном кадре
+
+        Преобразование кадра (серый/BGR) и уровни пирамиды считаются один раз
+        и переиспользуются всеми шаблонами. При прерывании поиска уже найденные
+        результаты сохраняются, а для остальных шаблонов возвращается interrupted_result.
+
+        Returns:
+            list: результат match (или match_multiscale) для каждого шаблона по порядку
+        """
+        started = time.perf_counter()
+        if not isinstance(image, Frame):
+            # Обертка в Frame, чтобы плоскости запоминались между шаблонами
+            pixels = np.asarray(image)
+            if pixels.ndim == 2:
+                pixels = np.stack([pixels] * 3, axis=2)
+            image = Frame(np.ascontiguousarray(pixels[:, :, :3], dtype=np.uint8))
+
+        results = [self._match_one(image, template, threshold, multi_scale, scale_range, deadline)
+                   for template in templates]
+
+        self.last_stats = {
+            "mode": self.mode,
+            "method": self.method,
+            "templates": len(templates),
+            "found": sum(1 for result in results if result["found"]),
+            "interrupted": sum(1 for result in results if result.get("interrupted")),
+            "match_ms": (time.perf_counter() - started) * 1000,
+        }
+        return results
+
+    def _match_one(self, image, template: Template, threshold: float, multi_scale: bool,
+                   scale_range: tuple, deadline) -> dict:
+        """Поиск одного шаблона из набора; прерывание превращается в interrupted_result"""
+        try:
+            if multi_scale:
+                return self.match_multiscale(image, template, threshold, scale_range, deadline=deadline)
+            return self.match(image, template, threshold, deadline=deadline)
+        except SearchInterrupted as e:
+            return self.interrupted_result(e.reason)
+
+    @staticmethod
+    def interrupted_result(reason: str) -> dict:
+        """Результат прерванного поиска (reason - "cancelled" или "timeout")"""
+        return {"found": False, "position": None, "score": 0.0, "box": None, "interrupted": reason}
+
+    def _result(self, hit: tuple, template: Template, scale: float, threshold: float) -> dict:
+        """Результат поиска по (score, x, y) для шаблона в масштабе scale"""
+        score, x, y = hit
+        height, width = self.template_plane(template, scale).shape[:2]
+        return {
+            "found": score >= threshold,
+            "position": (x + width // 2, y + height // 2),
+            "score": score,
+            "box": (x, y, width, height),
+            "scale": scale,
+        }
@@ -0,0 +1,180 @@
+"""
+Цветовой предфильтр для поиска шаблонов
+Содержит TemplatePrefilter - отбор областей кадра, где цвета характерных пикселей
+шаблона стоят на своих местах, чтобы matchTemplate запускался только по ним
+"""
+
+import numpy as np
+from config import *
+
+if OPENCV_AVAILABLE:
+    import cv2
+
+
+class TemplateSignature:
+    """Цветовая подпись шаблона: характерные пиксели (смещение и цвет RGB)"""
+
+    def __init__(self, offsets: list, colors: list):
+        self.offsets = offsets  # [(dx, dy)] относительно левого верхнего угла
+        self.colors = colors  # [(r, g, b)]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+class TemplatePrefilter:
+    """Отбор кандидатов для matchTemplate по цветам характерных пикселей
+
+    Подпись строится один раз на шаблон: выбираются пиксели внутри однотонных
+    участков (цвет не меняется при сдвиге на пиксель), с редким для шаблона и
+    насыщенным цветом, разнесенные по шаблону. В кадре для каждого такого пикселя
+    проверяется цвет со сдвигом на смещение пикселя - позиция левого верхнего угла
+    остается кандидатом, если совпало не меньше len(подписи) - max_misses пикселей.
+    Близкие кандидаты сливаются в прямоугольные области.
+
+    Если подпись не строится (однотонный или серый шаблон), кандидатов нет или они
+    покрывают слишком большую часть кадра, возвращается None - нужен полный поиск.
+    На кадрах не больше min_area_ratio площадей шаблона предфильтр не применяется
+    (applies): перевод кадра в RGB и маски inRange там дороже самого matchTemplate.
+    """
+
+    def __init__(self, pixels: int = TEMPLATE_PREFILTER_PIXELS, tolerance: int = TEMPLATE_PREFILTER_TOLERANCE,
+                 max_misses: int = TEMPLATE_PREFILTER_MAX_MISSES,
+                 max_coverage: float = TEMPLATE_PREFILTER_MAX_COVERAGE,
+                 max_regions: int = TEMPLATE_PREFILTER_MAX_REGIONS,
+                 min_area_ratio: float = TEMPLATE_PREFILTER_MIN_AREA_RATIO):
+        self.pixels = max(2, pixels)
+        self.tolerance = tolerance
+        self.max_misses = max(0, max_misses)
+        self.max_coverage = max_coverage
+        self.max_regions = max_regions
+        self.min_area_ratio = min_area_ratio
+
+    def applies(self, frame_shape: tuple, template_shape: tuple) -> bool:
+        """Стоит ли запускать предфильтр для кадра и шаблона такой формы"""
+        frame_area = frame_shape[0] * frame_shape[1]
+        return frame_area > self.min_area_ratio * template_shape[0] * template_shape[1]
+
+    def signature(self, template):
+        """Подпись шаблона (запоминается в шаблоне); None - предфильтр для шаблона бесполезен"""
+        cached = getattr(template, "_signature", False)
+        if cached is not False:
+            return cached
+        signature = self._build_signature(template.rgb)
+        template._signature = signature
+        return signature
+
+    def _build_signature(self, rgb: np.ndarray):
+        height, width = rgb.shape[:2]
+        if height < 3 or width < 3:
+            return None
+
+        # Однотонные участки: у пикселя и соседей 3x3 цвет в пределах допуска
+        pixels = rgb.astype(np.int16)
+        spread = cv2.dilate(pixels, np.ones((3, 3), np.uint8)) - cv2.erode(pixels, np.ones((3, 3), np.uint8))
+        stable = spread.max(axis=2) <= self.tolerance // 2
+        stable[0, :] = stable[-1, :] = False
+        stable[:, 0] = stable[:, -1] = False
+        ys, xs = np.nonzero(stable)
+        if len(ys) < self.pixels:
+            return None
+
+        # Редкость цвета в шаблоне (квантование 4 бита на канал) и насыщенность
+        colors = pixels[ys, xs]
+        quantized = (colors[:, 0] >> 4) << 8 | (colors[:, 1] >> 4) << 4 | (colors[:, 2] >> 4)
+        counts = np.bincount(quantized, minlength=4096)[quantized]
+        saturation = colors.max(axis=1) - colors.min(axis=1)
+        score = saturation / 255.0 + 1.0 - counts / float(len(quantized))
+
+        # Жадный выбор: лучшие по оценке, с разными цветами и разнесенные по шаблону
+        min_distance = max(1, min(width, height) // 4)
+        offsets, chosen, used = [], [], set()
+        for index in np.argsort(-score, kind="stable").tolist():
+            color_key = int(quantized[index])
+            x, y = int(xs[index]), int(ys[index])
+            if color_key in used:
+                continue
+            if any(abs(x - ox) < min_distance and abs(y - oy) < min_distance for ox, oy in offsets):
+                continue
+            offsets.append((x, y))
+            chosen.append(tuple(int(c) for c in colors[index]))
+            used.add(color_key)
+            if len(offsets) >= self.pixels:
+                break
+
+        # Меньше двух разных цветов - предфильтр не отличит шаблон от фона
+        if len(offsets) < 2:
+            return None
+        return TemplateSignature(offsets, chosen)
+
+    def candidates(self, rgb: np.ndarray, template):
+        """
+        Области кадра, где может быть шаблон
+
+        Args:
+            rgb: Кадр (H, W, 3) RGB
+            template: Декодированный шаблон (в масштабе 1.0)
+
+        Returns:
+            list: Регионы (x, y, w, h) в координатах кадра, каждый вмещает шаблон;
+                  None - предфильтр не сработал, нужен полный поиск
+        """
+        signature = self.signature(template)
+        if signature is None:
+            return None
+        frame_height, frame_width = rgb.shape[:2]
+        out_height = frame_height - template.height + 1
+        out_width = frame_width - template.width + 1
+        if out_height <= 0 or out_width <= 0:
+            return None
+
+        # Каждый кандидат совпадает хотя бы в одном из первых misses + 1 пикселей,
+        # поэтому полные маски inRange нужны только для них
+        misses = min(self.max_misses, len(signature) - 2)
+        union = None
+        for (dx, dy), color in zip(signature.offsets[:misses + 1], signature.colors[:misses + 1]):
+            mask = cv2.inRange(rgb, *self._bounds(color))[dy:dy + out_height, dx:dx + out_width]
+            union = mask if union is None else cv2.bitwise_or(union, mask)
+        points = cv2.findNonZero(union)
+        if points is None or len(points) > self.max_coverage * out_width * out_height:
+            return None
+
+        # Остальные пиксели подписи проверяются только в точках-кандидатах
+        points = points.reshape(-1, 2)
+        xs = points[:, 0]
+        ys = points[:, 1]
+        votes = np.zeros(len(xs), np.int32)
+        for (dx, dy), color in zip(signature.offsets, signature.colors):
+            difference = np.abs(rgb[ys + dy, xs + dx].astype(np.int16) - np.array(color, np.int16))
+            votes += difference.max(axis=1) <= self.tolerance
+        keep = votes >= len(signature) - misses
+        if not keep.any():
+            return None
+        xs, ys = xs[keep], ys[keep]
+
+        # Слияние близких кандидатов: связные области на сетке ячеек
+        cell = TEMPLATE_PREFILTER_CELL
+        grid = np.zeros((out_height // cell + 1, out_width // cell + 1), np.uint8)
+        grid[ys // cell, xs // cell] = 1
+        count, _, stats, _ = cv2.connectedComponentsWithStats(grid, connectivity=8)
+        if count - 1 > self.max_regions:
+            return None
+
+        regions = []
+        covered = 0
+        for cell_x, cell_y, cell_width, cell_height, _ in stats[1:].tolist():
+            left, top = cell_x * cell, cell_y * cell
+            region = (left, top,
+                      min(frame_width - left, cell_width * cell + template.width - 1),
+                      min(frame_height - top, cell_height * cell + template.height - 1))
+            regions.append(region)
+            covered += region[2] * region[3]
+        if covered > self.max_coverage * frame_width * frame_height:
+            return None
+        return regions
+
+    def _bounds(self, color: tuple) -> tuple:
+        """Границы cv2.inRange для цвета с допуском"""
+        low = np.array([max(0, c - self.tolerance) for c in color], np.uint8)
+        high = np.array([min(255, c + self.tolerance) for c in color], np.uint8)
+        return low, high
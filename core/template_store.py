@@ -0,0 +1,167 @@
+"""
+Кэш декодированных шаблонов
+Содержит TemplateStore - хранилище шаблонов в памяти с проверкой mtime/размера файла
+и вытеснением давно не используемых шаблонов по бюджету памяти
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from config import *
+from .template_matcher import Template
+
+
+class TemplateStore:
+    """Хранилище декодированных шаблонов
+
+    Ключ - путь к файлу; запись действительна, пока у файла те же mtime и размер.
+    Файл проверяется (os.stat) не чаще раза в stat_interval секунд, поэтому
+    после прогрева поиск по последовательности шаблонов не обращается к диску.
+    """
+
+    def __init__(self, max_bytes: int = TEMPLATE_CACHE_MAX_MB * 1024 * 1024,
+                 stat_interval: float = TEMPLATE_STAT_INTERVAL):
+        self.max_bytes = max_bytes
+        self.stat_interval = stat_interval
+        self._entries = OrderedDict()  # path -> {"template", "stamp", "checked", "nbytes"}
+        self._missing = {}  # path -> время последней проверки отсутствующего файла
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+        # Статистика
+        self.hits = 0
+        self.loads = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.stat_calls = 0
+
+    def _stat(self, path: str):
+        """(mtime, размер) файла или None, если файла нет"""
+        self.stat_calls += 1
+        try:
+            info = os.stat(path)
+        except OSError:
+            return None
+        return info.st_mtime_ns, info.st_size
+
+    def get(self, path: str):
+        """
+        Декодированный шаблон по пути
+
+        Returns:
+            Template или None, если файла нет или его не удалось прочитать
+        """
+        if not path:
+            return None
+        now = time.perf_counter()
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry["checked"] < self.stat_interval:
+                self._entries.move_to_end(path)
+                self._account(path, entry)
+                self.hits += 1
+                return entry["template"]
+            missing_checked = self._missing.get(path)
+            if entry is None and missing_checked is not None and now - missing_checked < self.stat_interval:
+                return None
+
+        stamp = self._stat(path)
+        with self._lock:
+            if stamp is None:
+                self._remove(path)
+                self._missing[path] = now
+                return None
+            self._missing.pop(path, None)
+
+            entry = self._entries.get(path)
+            if entry is not None and entry["stamp"] == stamp:
+                entry["checked"] = now
+                self._entries.move_to_end(path)
+                self._account(path, entry)
+                self.hits += 1
+                return entry["template"]
+
+        # Файл новый или изменился - декодируем заново
+        try:
+            template = Template.from_file(path)
+        except Exception as e:
+            print(f"Ошибка чтения шаблона {path}: {e}")
+            return None
+
+        with self._lock:
+            if self._remove(path):
+                self.reloads += 1
+            else:
+                self.loads += 1
+            self._entries[path] = {"template": template, "stamp": stamp, "checked": now,
+                                   "nbytes": template.nbytes}
+            self.total_bytes += template.nbytes
+            self._evict(keep=path)
+        return template
+
+    def exists(self, path: str) -> bool:
+        """Проверка существования шаблона без лишних обращений к диску"""
+        return self.get(path) is not None
+
+    def _remove(self, path: str) -> bool:
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry["nbytes"]
+        return True
+
+    def _account(self, path: str, entry: dict):
+        """Учет роста шаблона: масштабированные варианты появляются уже после загрузки"""
+        nbytes = entry["template"].nbytes
+        if nbytes != entry["nbytes"]:
+            self.total_bytes += nbytes - entry["nbytes"]
+            entry["nbytes"] = nbytes
+            self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        """Вытеснение давно не используемых шаблонов сверх бюджета памяти"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            path = next(iter(self._entries))
+            if path == keep:
+                break
+            self._remove(path)
+            self.evictions += 1
+
+    def invalidate(self, path: str = None):
+        """Сброс одного шаблона или всего хранилища"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._missing.clear()
+                self.total_bytes = 0
+            else:
+                self._remove(path)
+                self._missing.pop(path, None)
+
+    def get_stats(self) -> dict:
+        """Статистика хранилища"""
+        with self._lock:
+            return {
+                "templates": len(self._entries),
+                "memory_mb": self.total_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "loads": self.loads,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "stat_calls": self.stat_calls,
+            }
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_template_store() -> TemplateStore:
+    """Общее хранилище шаблонов приложения"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TemplateStore()
+        return _default_store
@@ -0,0 +1,132 @@
+"""
+Слежение за целью
+Содержит TrackingSearch - поиск в небольшом окне вокруг последнего попадания
+с геометрическим расширением окна перед полным поиском
+"""
+
+from config import *
+
+
+class TrackingSearch:
+    """Поиск цели сначала рядом с последним попаданием
+
+    Окна растут как initial_window * expansion ** уровень (плюс размер цели) и
+    обрезаются границами области поиска. Если ни одно окно не дало попадания,
+    выполняется полный поиск. Попадания считаются отдельно для каждого уровня.
+    """
+
+    def __init__(self, initial_window: int = TRACKING_INITIAL_WINDOW,
+                 expansion: float = TRACKING_EXPANSION, max_levels: int = TRACKING_MAX_LEVELS):
+        self.anchor = None  # Последняя найденная позиция (x, y)
+        self.key = None  # Что ищем (путь шаблона, цвет), при смене ключа окно сбрасывается
+        self.configure(initial_window, expansion, max_levels)
+
+    def configure(self, initial_window: int = None, expansion: float = None, max_levels: int = None):
+        """Изменение размеров окон (со сбросом статистики)"""
+        if initial_window is not None:
+            self.initial_window = max(4, int(initial_window))
+        if expansion is not None:
+            self.expansion = max(1.1, float(expansion))
+        if max_levels is not None:
+            self.max_levels = max(1, int(max_levels))
+        self.reset_stats()
+
+    def reset(self):
+        """Сброс последней позиции (следующий поиск будет полным)"""
+        self.anchor = None
+
+    def reset_stats(self):
+        """Сброс статистики попаданий"""
+        self.level_attempts = [0] * self.max_levels
+        self.level_hits = [0] * self.max_levels
+        self.full_searches = 0
+        self.full_hits = 0
+
+    def windows(self, bounds: tuple, target_size: tuple = (0, 0)) -> list:
+        """
+        Окна поиска вокруг последней позиции по уровням
+
+        Args:
+            bounds: Граница поиска (left, top, width, height)
+            target_size: Размер цели (width, height), на который окно увеличивается
+
+        Returns:
+            list: Регионы (left, top, width, height); окна, покрывающие всю
+                  границу, не возвращаются - это уже полный поиск
+        """
+        if self.anchor is None:
+            return []
+        bounds_left, bounds_top, bounds_width, bounds_height = bounds
+        bounds_right = bounds_left + bounds_width
+        bounds_bottom = bounds_top + bounds_height
+        x, y = self.anchor
+
+        windows = []
+        for level in range(self.max_levels):
+            side = int(self.initial_window * self.expansion ** level)
+            half_width = side // 2 + target_size[0]
+            half_height = side // 2 + target_size[1]
+            left = max(bounds_left, x - half_width)
+            top = max(bounds_top, y - half_height)
+            right = min(bounds_right, x + half_width)
+            bottom = min(bounds_bottom, y + half_height)
+            if right <= left or bottom <= top:
+                break
+            if (left, top, right, bottom) == (bounds_left, bounds_top, bounds_right, bounds_bottom):
+                break
+            windows.append((left, top, right - left, bottom - top))
+        return windows
+
+    def search(self, search_fn, bounds: tuple, key=None, target_size: tuple = (0, 0)) -> tuple:
+        """
+        Поиск с расширяющимися окнами и полным поиском в конце
+
+        Args:
+            search_fn: Функция поиска search_fn(region) -> (найдено, (x, y));
+                       region None означает полный поиск
+            bounds: Граница поиска (left, top, width, height)
+            key: Что ищем; при смене ключа последняя позиция не используется
+            target_size: Размер цели (width, height)
+
+        Returns:
+            tuple: (найдено, (x, y)) или (False, None)
+        """
+        if key != self.key:
+            self.key = key
+            self.anchor = None
+
+        for level, region in enumerate(self.windows(bounds, target_size)):
+            self.level_attempts[level] += 1
+            found, position = search_fn(region)
+            if found:
+                self.level_hits[level] += 1
+                self.anchor = position
+                return True, position
+
+        self.full_searches += 1
+        found, position = search_fn(None)
+        if found:
+            self.full_hits += 1
+            self.anchor = position
+            return True, position
+        return False, None
+
+    def get_stats(self) -> dict:
+        """Попадания по уровням окна и доля поисков, обошедшихся без полного"""
+        levels = []
+        for level in range(self.max_levels):
+            attempts = self.level_attempts[level]
+            levels.append({
+                "window": int(self.initial_window * self.expansion ** level),
+                "attempts": attempts,
+                "hits": self.level_hits[level],
+                "hit_rate": self.level_hits[level] / attempts if attempts else 0.0,
+            })
+        window_hits = sum(self.level_hits)
+        searches = window_hits + self.full_searches
+        return {
+            "levels": levels,
+            "full_searches": self.full_searches,
+            "full_hits": self.full_hits,
+            "local_share": window_hits / searches if searches else 0.0,
+        }
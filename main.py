@@ -21,6 +21,8 @@ from core.clicker import ClickerEngine
 from core.hotkeys import HotkeyManager
 from core.color_detection import ColorDetector
 from core.image_processing import ImageProcessor
+from core.screen_source import get_screen_source
+from core.frame_bus import DetectorPool
 
 # Импорт утилит
 from utils.file_manager import FileManager
@@ -80,6 +82,9 @@ class OmniaClickApp:
         self.color_detector = ColorDetector()
         self.image_processor = ImageProcessor()
         
+        # Процессы поиска шаблонов (запускаются в _setup_system)
+        self.detector_pool = DetectorPool() if DETECTOR_PROCESSES > 0 else None
+        
         # Утилиты
         self.file_manager = FileManager()
         self.system_tray = SystemTrayManager()
@@ -101,11 +106,9 @@ class OmniaClickApp:
     def _setup_event_handlers(self):
         """Настройка обработчиков событий между компонентами"""
         
-        # Callbacks для clicker
-        self.clicker.set_callbacks(
-            on_click=self._on_click_performed,
-            on_status_change=self._on_clicker_status_change
-        )
+        # Статус и счетчик clicker забираются из потока Tk с фиксированной частотой
+        self._status_poll_id = None
+        self._poll_clicker_status()
         
         # Callbacks для hotkeys
         self.hotkeys.set_callbacks(
@@ -209,6 +212,15 @@ class OmniaClickApp:
         # Настройка системного трея
         self.system_tray.setup_tray()
         
+        # Запуск процессов поиска шаблонов
+        if self.detector_pool:
+            try:
+                self.detector_pool.start()
+                self.image_processor.set_detector_pool(self.detector_pool)
+            except Exception as e:
+                print(f"Не удалось запустить процессы поиска: {e}")
+                self.detector_pool = None
+                
     # ====== Новые callback методы ======
     
     def _before_area_selection(self) -> bool:
@@ -375,6 +387,9 @@ class OmniaClickApp:
         """Корректный выход из приложения"""
         try:
             self._force_stop_all()
+            if self.detector_pool:
+                self.image_processor.set_detector_pool(None)
+                self.detector_pool.close()
             self.cleanup_temp_files()
             if self.gui:
                 self.gui.window.quit()
@@ -505,12 +520,11 @@ class OmniaClickApp:
                         
             elif current_item['type'] == 'key':
                 # Нажимаем клавишу
-                import pyautogui
                 key = current_item['key']
                 presses = current_item.get('presses', 1)
                 
                 for _ in range(presses):
-                    pyautogui.press(key)
+                    self.clicker.input_backend.press(key)
                     success = True
                     
             if success:
@@ -523,15 +537,20 @@ class OmniaClickApp:
             print(f"Ошибка выполнения последовательности: {e}")
             return False
             
-    def _on_click_performed(self, click_count):
-        """Обработчик выполненного клика"""
-        self.gui.update_count(click_count)
-        self.system_tray.update_status("running", click_count)
-        
-    def _on_clicker_status_change(self, status):
-        """Обработчик изменения статуса кликера"""
-        self.gui.update_status(status)
-        self.system_tray.update_status(status, self.clicker.get_click_count())
+    def _poll_clicker_status(self):
+        """Перенос накопившихся изменений статуса и счетчика кликера в интерфейс и трей"""
+        try:
+            status, click_count = self.clicker.status_publisher.drain()
+            if status is not None:
+                self.gui.update_status(status)
+            if click_count is not None:
+                self.gui.update_count(click_count)
+            if status is not None or click_count is not None:
+                self.system_tray.update_status(self.clicker.status_publisher.status,
+                                               self.clicker.status_publisher.click_count)
+        except Exception as e:
+            print(f"Ошибка обновления статуса: {e}")
+        self._status_poll_id = self.window.after(max(1, int(1000 / STATUS_REFRESH_RATE)), self._poll_clicker_status)
         
     def _emergency_stop(self):
         """Экстренная остановка"""
@@ -601,8 +620,11 @@ class OmniaClickApp:
         
     def _on_closing(self):
         """Обработчик закрытия приложения"""
-        # Останавливаем кликер
+        # Останавливаем кликер и опрос его статуса
         self.clicker.stop_clicking()
+        if self._status_poll_id:
+            self.window.after_cancel(self._status_poll_id)
+            self._status_poll_id = None
         
         # Отключаем горячие клавиши
         self.hotkeys.disable_hotkeys()
@@ -614,6 +636,14 @@ class OmniaClickApp:
         self.file_manager.cleanup_temp_files()
         self.image_processor.cleanup_temp_files()
         
+        # Останавливаем процессы поиска и освобождаем разделяемую память
+        if self.detector_pool:
+            self.image_processor.set_detector_pool(None)
+            self.detector_pool.close()
+            
+        # Освобождаем подключение к дисплею источника кадров
+        get_screen_source().close()
+        
         # Закрываем приложение
         self.window.quit()
         self.window.destroy()
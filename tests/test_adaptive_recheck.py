@@ -0,0 +1,67 @@
+"""
+Тесты адаптивного интервала перепроверки (AdaptiveRecheck)
+"""
+
+from core.adaptive_recheck import AdaptiveRecheck
+from core.color_detection import ColorDetector
+from core.screen_source import SyntheticScreenSource
+
+
+def policy() -> AdaptiveRecheck:
+    return AdaptiveRecheck(initial=4, min_interval=1, max_interval=20, growth=2.0, shrink=0.25, move_shrink=0.5)
+
+
+def test_interval_grows_while_target_stays():
+    recheck = policy()
+    assert recheck.interval("a") == 4
+    recheck.record("a", "ok", 4)
+    assert recheck.interval("a") == 8
+    for _ in range(5):
+        recheck.record("a", "ok", 8)
+    assert recheck.interval("a") == 20  # ограничено сверху
+
+
+def test_miss_and_move_shrink_interval():
+    recheck = policy()
+    recheck.record("a", "moved", 4)
+    assert recheck.interval("a") == 2
+    recheck.record("a", "missed", 2)
+    assert recheck.interval("a") == 1  # ограничено снизу
+    stats = recheck.get_stats("a")
+    assert (stats["moved"], stats["missed"], stats["wasted_clicks"]) == (1, 1, 2)
+
+
+def test_targets_are_independent_and_resettable():
+    recheck = policy()
+    recheck.record("a", "ok", 4)
+    recheck.record("b", "missed", 4)
+    assert (recheck.interval("a"), recheck.interval("b")) == (8, 1)
+    assert recheck.get_stats()["targets"] == 2
+    recheck.reset("a")
+    assert recheck.interval("a") == 4
+    recheck.reset()
+    assert recheck.get_stats()["targets"] == 0
+
+
+def test_color_detector_learns_interval():
+    source = SyntheticScreenSource(size=(100, 100))
+    source.draw_rect(40, 40, 3, 3, (255, 0, 0))
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color("#FF0000")
+    detector.set_tolerance(0)
+    detector.set_adaptive_recheck(True)
+    detector.recheck_policy = policy()
+    detector.last_found_position = (41, 41)
+
+    detector.clicks_since_last_search = 3
+    assert not detector._recheck_needed()  # интервал 4 еще не прошел
+    detector.clicks_since_last_search = 4
+    assert not detector._recheck_needed()
+    assert detector.get_recheck_stats()["interval"] == 8
+
+    source.set_frame(source.grab_array() * 0)
+    detector.clicks_since_last_search = 8
+    assert detector._recheck_needed()
+    stats = detector.get_recheck_stats()
+    assert stats["interval"] == 2
+    assert stats["wasted_clicks"] == 8
@@ -0,0 +1,120 @@
+"""
+Тесты пула буферов кадров (FrameBufferPool) и подсчета владельцев Frame
+"""
+
+import numpy as np
+from core.buffer_pool import FrameBufferPool, MemoryTracker
+from core.frame_cache import CachedScreenSource
+from core.screen_source import SyntheticScreenSource
+
+
+def pooled_source(pool: FrameBufferPool, size: tuple = (64, 48)) -> SyntheticScreenSource:
+    source = SyntheticScreenSource(size=size)
+    source.set_buffer_pool(pool)
+    return source
+
+
+def test_buffer_returns_after_last_owner():
+    pool = FrameBufferPool()
+    frame = pooled_source(pool).grab_frame((0, 0, 32, 16))
+    assert pool.get_stats()["outstanding"] == 1
+
+    frame.retain()
+    frame.release()
+    assert pool.get_stats()["outstanding"] == 1
+    cropped = frame.crop((4, 4, 8, 8))
+    frame.release()
+    assert pool.get_stats()["outstanding"] == 1
+    cropped.release()
+    assert pool.get_stats()["outstanding"] == 0
+
+
+def test_same_shape_reuses_buffer():
+    pool = FrameBufferPool()
+    source = pooled_source(pool)
+    for _ in range(5):
+        with source.grab_frame((8, 8, 32, 16)):
+            pass
+    stats = pool.get_stats()
+    assert stats["allocations"] == 1
+    assert stats["reuses"] == 4
+    assert stats["peak_outstanding"] == 1
+
+
+def test_derived_planes_come_from_pool():
+    pool = FrameBufferPool()
+    source = pooled_source(pool)
+    with source.grab_frame((0, 0, 32, 16)) as frame:
+        frame.gray
+        assert pool.get_stats()["outstanding"] == 2
+    assert pool.get_stats()["outstanding"] == 0
+
+
+def test_released_frame_does_not_leak_pool_buffers():
+    pool = FrameBufferPool()
+    frame = pooled_source(pool).grab_frame((0, 0, 32, 16))
+    frame.release()
+    assert frame.gray.shape == (16, 32)
+    assert pool.get_stats()["outstanding"] == 0
+
+
+class StubShot:
+    """Снимок mss: новый буфер BGRA на каждый захват"""
+
+    def __init__(self, width: int, height: int):
+        self.width, self.height = width, height
+        self.raw = bytearray(np.full((height, width, 4), (30, 20, 10, 255), dtype=np.uint8).tobytes())
+
+
+class StubGrabber:
+    monitors = [{"left": 0, "top": 0, "width": 64, "height": 48}] * 2
+
+    def grab(self, area: dict) -> StubShot:
+        return StubShot(area["width"], area["height"])
+
+
+def test_mss_frames_are_pooled():
+    from core.screen_source import MssScreenSource
+
+    pool = FrameBufferPool()
+    source = MssScreenSource()
+    source._local.grabber = StubGrabber()
+    source.set_buffer_pool(pool)
+    for _ in range(3):
+        with source.grab_frame((4, 4, 16, 8)) as frame:
+            assert frame.order == "BGRA" and frame.region == (4, 4, 16, 8)
+            assert tuple(frame.rgb[0, 0]) == (10, 20, 30)
+    stats = pool.get_stats()
+    assert stats["outstanding"] == 0
+    assert stats["allocations"] == 2  # сырой BGRA и RGB, дальше только повторное использование
+    assert stats["reuses"] == 4
+
+
+def test_free_list_is_bounded():
+    pool = FrameBufferPool(max_free_per_shape=2)
+    buffers = [pool.acquire((4, 4, 3)) for _ in range(4)]
+    for buffer in buffers:
+        buffer.release()
+        buffer.release()  # повторное освобождение ничего не делает
+    stats = pool.get_stats()
+    assert stats["free_buffers"] == 2
+    assert stats["outstanding"] == 0
+
+
+def test_cache_keeps_frame_until_expired():
+    pool = FrameBufferPool()
+    cache = CachedScreenSource(pooled_source(pool), max_age=60.0)
+    with cache.grab_frame((0, 0, 16, 16)) as frame:
+        assert np.array_equal(frame.rgb, np.zeros((16, 16, 3), dtype=np.uint8))
+    assert pool.get_stats()["outstanding"] == 1  # кадр еще держит кэш
+    cache.invalidate()
+    assert pool.get_stats()["outstanding"] == 0
+
+
+def test_memory_tracker_samples():
+    tracker = MemoryTracker(sample_interval=0.0)
+    tracker.reset()
+    tracker.sample()
+    tracker.sample()
+    stats = tracker.get_stats()
+    assert stats["samples"] == 2
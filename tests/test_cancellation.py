@@ -0,0 +1,83 @@
+"""
+Тесты сроков и отмены поиска (Deadline, CancelToken)
+"""
+
+import time
+import numpy as np
+import pytest
+from config import *
+from core.cancellation import CancelToken, Deadline, SearchInterrupted, check_deadline
+from core.color_detection import ColorDetector
+from core.screen_source import SyntheticScreenSource
+
+
+def test_deadline_without_limits_never_interrupts():
+    deadline = Deadline()
+    assert deadline.remaining() is None
+    assert deadline.reason() is None
+    deadline.check()
+    check_deadline(None)
+
+
+def test_deadline_expires():
+    deadline = Deadline(0.01)
+    assert 0 < deadline.remaining() <= 0.01
+    time.sleep(0.02)
+    assert deadline.remaining() == 0.0
+    with pytest.raises(SearchInterrupted) as error:
+        deadline.check()
+    assert error.value.reason == "timeout"
+
+
+def test_cancel_wins_over_timeout_and_resets():
+    token = CancelToken()
+    deadline = Deadline(0.001, token)
+    time.sleep(0.005)
+    token.cancel()
+    assert deadline.reason() == "cancelled"
+    token.reset()
+    assert deadline.reason() == "timeout"
+
+
+def test_cancelled_color_search_reports_reason():
+    source = SyntheticScreenSource(size=(200, 100))
+    source.draw_rect(50, 50, 4, 4, (255, 0, 0))
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color("#FF0000")
+
+    detector.cancel_search()
+    assert detector.find_color_position(use_cache=False) == (False, None)
+    assert detector.last_search_interrupted == "cancelled"
+
+    detector.reset_cancel()
+    assert detector.find_color_position(use_cache=False) == (True, (50, 50))
+    assert detector.last_search_interrupted is None
+
+
+@pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+def test_match_many_keeps_results_before_interruption():
+    from core.frame import Frame
+    from core.template_matcher import Template, TemplateMatcher
+
+    class Countdown(Deadline):
+        """Срок, который истекает после заданного числа проверок"""
+
+        def __init__(self, checks: int):
+            super().__init__()
+            self.checks = checks
+
+        def reason(self):
+            self.checks -= 1
+            return "timeout" if self.checks < 0 else None
+
+    screen = np.random.default_rng(4).integers(0, 256, (80, 120, 3), dtype=np.uint8)
+    templates = [Template(screen[10:20, 10:20].copy()), Template(screen[50:60, 70:80].copy())]
+    matcher = TemplateMatcher(prefilter=False)
+    full = matcher.match_many(Frame(screen), templates)
+    assert all(result["found"] for result in full)
+
+    # Одна проверка в match_many и по две на каждый полный поиск
+    results = matcher.match_many(Frame(screen), templates, deadline=Countdown(3))
+    assert results[0]["found"] and results[0]["box"] == (10, 10, 10, 10)
+    assert results[1]["interrupted"] == "timeout"
+    assert matcher.last_stats["interrupted"] == 1
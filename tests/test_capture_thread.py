@@ -0,0 +1,97 @@
+"""
+Тесты фонового захвата (BackgroundCaptureSource)
+"""
+
+import time
+import numpy as np
+import pytest
+from core.capture_thread import BackgroundCaptureSource
+from core.screen_source import SyntheticScreenSource
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if condition():
+            return True
+        time.sleep(0.001)
+    return False
+
+
+@pytest.fixture
+def capture():
+    source = SyntheticScreenSource(size=(64, 48))
+    capture = BackgroundCaptureSource(source, region=(8, 8, 32, 24), max_fps=0, max_staleness=1.0)
+    capture.start()
+    yield capture
+    capture.stop()
+
+
+def test_latest_frame_follows_screen(capture):
+    capture.source.draw_rect(8, 8, 32, 24, (10, 20, 30))
+    assert wait_for(lambda: capture.frames_produced > 2)
+    assert wait_for(lambda: tuple(capture.grab_array((10, 10, 4, 4))[0, 0]) == (10, 20, 30))
+
+    with capture.grab_frame((10, 10, 4, 4)) as frame:
+        assert frame.region == (10, 10, 4, 4)
+        assert not frame.raw.flags.writeable
+
+
+def test_region_outside_ring_frame_falls_back(capture):
+    assert wait_for(lambda: capture.frames_produced > 0)
+    pixels = capture.grab_array((0, 0, 64, 48))
+    assert pixels.shape == (48, 64, 3)
+    assert capture.fallback_captures == 1
+
+
+def test_stopped_source_captures_directly():
+    source = SyntheticScreenSource(size=(16, 16))
+    capture = BackgroundCaptureSource(source)
+    assert capture.grab_array((0, 0, 4, 4)).shape == (4, 4, 3)
+    assert capture.get_stats()["fallback_captures"] == 1
+
+
+def test_held_frame_survives_later_reads(capture):
+    capture.source.draw_rect(8, 8, 32, 24, (1, 2, 3))
+    assert wait_for(lambda: tuple(capture.grab_array((8, 8, 1, 1))[0, 0]) == (1, 2, 3))
+
+    held = capture.latest()
+    crop = held.crop((8, 8, 4, 4))
+    snapshot = np.array(held.raw)
+
+    # Цель меняется, а потребитель успевает прочитать еще два свежих кадра
+    capture.source.draw_rect(8, 8, 32, 24, (200, 100, 50))
+    for _ in range(2):
+        produced = capture.frames_produced
+        assert wait_for(lambda: capture.frames_produced > produced + capture.ring_size)
+        with capture.latest() as frame:
+            assert frame is not held
+    assert wait_for(lambda: tuple(capture.grab_array((8, 8, 1, 1))[0, 0]) == (200, 100, 50))
+
+    assert np.array_equal(held.raw, snapshot)
+    assert tuple(crop.raw[0, 0, :3]) == (1, 2, 3)
+    crop.release()
+    held.release()
+    # Без владельцев слот снова достается производителю
+    assert wait_for(lambda: held.refs == 0)
+
+
+def test_all_slots_held_pauses_producer():
+    source = SyntheticScreenSource(size=(16, 16))
+    capture = BackgroundCaptureSource(source, ring_size=3, max_fps=0)
+    capture.start()
+    try:
+        held = []
+        while len(held) < 3:
+            assert wait_for(lambda: capture._latest is not None and
+                            all(capture._latest[1] is not frame for frame in held))
+            held.append(capture.latest())
+        produced = capture.frames_produced
+        time.sleep(0.05)
+        assert capture.frames_produced == produced
+        held.pop(0).release()
+        assert wait_for(lambda: capture.frames_produced > produced)
+    finally:
+        capture.stop()
+        for frame in held:
+            frame.release()
@@ -0,0 +1,48 @@
+"""
+Тесты планировщика кликов по абсолютным срокам (ClickScheduler)
+"""
+
+import time
+from core.click_scheduler import ClickScheduler
+
+
+def test_deadlines_do_not_accumulate_work_time():
+    scheduler = ClickScheduler(spin_budget=0.001, max_lag=1.0)
+    interval = 0.01
+    for _ in range(10):
+        time.sleep(0.004)  # Работа между кликами не должна удлинять период
+        assert scheduler.wait_next(interval)
+    elapsed = scheduler.last_tick - scheduler.started
+    assert 0.1 <= elapsed < 0.2
+    assert abs(scheduler.deadline - (scheduler.started + 10 * interval)) < 1e-9
+    stats = scheduler.get_stats()
+    assert stats["ticks"] == 10 and stats["rebased"] == 0
+    assert stats["jitter_p50_us"] >= 0.0
+
+
+def test_lag_rebases_instead_of_catching_up():
+    scheduler = ClickScheduler(spin_budget=0.0, max_lag=0.02)
+    time.sleep(0.1)
+    before = time.perf_counter()
+    assert scheduler.wait_next(0.001)
+    # Пропущенные клики не догоняются: следующий срок отсчитывается от текущего времени
+    assert scheduler.rebased == 1
+    assert scheduler.deadline >= before
+    assert scheduler.wait_next(0.005)
+    assert time.perf_counter() - before >= 0.005
+
+
+def test_stop_interrupts_long_wait():
+    scheduler = ClickScheduler(spin_budget=0.0)
+    started = time.perf_counter()
+    assert not scheduler.wait_next(5.0, running=lambda: time.perf_counter() - started < 0.05)
+    assert time.perf_counter() - started < 1.0
+    assert scheduler.ticks == 0
+
+
+def test_start_resets_stats():
+    scheduler = ClickScheduler(spin_budget=0.0)
+    scheduler.wait_next(0.001)
+    scheduler.start()
+    assert scheduler.get_stats()["ticks"] == 0
+    assert scheduler.get_stats()["rate"] == 0.0
@@ -0,0 +1,207 @@
+"""
+Тесты ClickerEngine без дисплея: ввод пишется в RecordingInputBackend,
+кадры берутся из SyntheticScreenSource
+"""
+
+import time
+import pytest
+from config import *
+from core.clicker import ClickerEngine
+from core.color_detection import ColorDetector
+from core.input_backend import RecordingInputBackend
+from core.screen_source import SyntheticScreenSource
+
+
+@pytest.fixture
+def backend():
+    return RecordingInputBackend()
+
+
+@pytest.fixture
+def engine(backend):
+    engine = ClickerEngine(input_backend=backend)
+    engine.set_background_capture(False)
+    engine.set_interval(MIN_INTERVAL)
+    yield engine
+    engine.stop_clicking()
+
+
+def run_until(engine, done, timeout: float = 5.0):
+    """Запуск цикла кликов до выполнения условия done()"""
+    assert engine.start_clicking()
+    deadline = time.perf_counter() + timeout
+    while not done() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    engine.stop_clicking()
+    assert done()
+
+
+def kinds(backend, *names):
+    """События бэкенда заданных типов без отметок времени"""
+    return [(kind, data) for _, kind, data in backend.events if kind in names]
+
+
+def test_normal_mode_clicks_in_place(engine, backend):
+    engine.set_click_type("right")
+    run_until(engine, lambda: backend.clicks >= 3)
+    assert kinds(backend, "down", "up")[:6] == [("down", ("right", (0, 0))), ("up", ("right", (0, 0)))] * 3
+    assert kinds(backend, "move") == []
+    assert engine.get_click_count() == backend.clicks
+
+
+def test_burst_counts(engine, backend):
+    engine.set_burst_size(7)
+    run_until(engine, lambda: backend.clicks >= 28)
+    assert backend.clicks % 7 == 0
+    assert len(kinds(backend, "down")) == backend.clicks
+    assert engine.get_click_count() == backend.clicks
+    assert engine.get_scheduler_stats()["burst_size"] == 7
+
+
+def test_burst_size_is_clamped(engine):
+    engine.set_burst_size(0)
+    assert engine.burst_size == 1
+    engine.set_burst_size(MAX_CLICK_BURST_SIZE * 2)
+    assert engine.burst_size == MAX_CLICK_BURST_SIZE
+
+
+def test_sequence_click_order(engine, backend):
+    engine.set_click_mode(CLICK_MODES["SEQUENCE"])
+    engine.set_sequence_points([
+        {"x": 10, "y": 20, "clicks": 2},
+        {"x": 30, "y": 40},
+    ])
+    run_until(engine, lambda: backend.clicks >= 6)
+    positions = [data[1] for kind, data in kinds(backend, "down")]
+    assert positions[:6] == [(10, 20), (10, 20), (30, 40)] * 2
+
+
+def test_keyboard_key_order(engine, backend):
+    engine.set_click_mode(CLICK_MODES["KEYBOARD"])
+    engine.set_keyboard_sequence([
+        {"key": "f05", "presses": 2},
+        {"key": "num_1", "presses": 1},
+        {"key": "page_up", "presses": 1},
+    ])
+    run_until(engine, lambda: backend.key_presses >= 4)
+    assert kinds(backend, "key_down")[:4] == [
+        ("key_down", "f5"), ("key_down", "f5"), ("key_down", "num1"), ("key_down", "pageup"),
+    ]
+
+
+def test_color_mode_clicks_synthetic_target(engine, backend):
+    source = SyntheticScreenSource(size=(320, 200))
+    source.draw_rect(200, 50, 12, 8, (255, 0, 0))
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color("#FF0000")
+    detector.set_tolerance(0)
+    engine.set_color_detector(detector)
+    engine.set_input_backend(backend)
+    engine.set_click_mode(CLICK_MODES["COLOR"])
+
+    run_until(engine, lambda: backend.clicks >= 3)
+    for _, (button, (x, y)) in kinds(backend, "down"):
+        assert button == "left"
+        assert 200 <= x < 212 and 50 <= y < 58
+
+
+def test_set_input_backend_reaches_detectors(engine):
+    detector = ColorDetector(screen_source=SyntheticScreenSource(size=(64, 64)))
+    engine.set_color_detector(detector)
+    replacement = RecordingInputBackend()
+    engine.set_input_backend(replacement)
+    assert engine.input_backend is replacement
+    assert detector.input_backend is replacement
+
+
+def run_steps(engine, count):
+    """Выполнение count шагов текущего режима без потока кликов; число кликов"""
+    step = engine._compile_step()
+    return sum(step() for _ in range(count))
+
+
+def test_compiled_normal_step_counts_bursts(engine, backend):
+    engine.set_burst_size(4)
+    assert run_steps(engine, 3) == 12
+    assert backend.clicks == 12
+
+
+def test_compiled_sequence_step(engine, backend):
+    engine.set_click_mode(CLICK_MODES["SEQUENCE"])
+    engine.set_sequence_points([{"x": 1, "y": 2, "clicks": 2}, {"x": 3, "y": 4}])
+    assert run_steps(engine, 6) == 6
+    positions = [data[1] for kind, data in kinds(backend, "down")]
+    assert positions == [(1, 2), (1, 2), (3, 4)] * 2
+
+
+def test_compiled_keyboard_step_resolves_keys_once(engine, backend):
+    engine.set_click_mode(CLICK_MODES["KEYBOARD"])
+    engine.set_keyboard_sequence([{"key": "ctrl+c", "presses": 1}, {"key": "esc", "presses": 1}])
+    assert run_steps(engine, 2) == 2
+    assert kinds(backend, "key_down", "key_up") == [
+        ("key_down", "ctrl"), ("key_down", "c"), ("key_up", "c"), ("key_up", "ctrl"),
+        ("key_down", "escape"), ("key_up", "escape"),
+    ]
+
+
+def test_compiled_color_step_without_target_does_not_click(engine, backend):
+    detector = ColorDetector(screen_source=SyntheticScreenSource(size=(64, 64)))
+    detector.set_target_color("#FF0000")
+    engine.set_color_detector(detector)
+    engine.set_input_backend(backend)
+    engine.set_click_mode(CLICK_MODES["COLOR"])
+    assert run_steps(engine, 2) == 0
+    assert backend.clicks == 0
+
+
+def test_setters_drop_compiled_step(engine):
+    engine._step = engine._compile_step()
+    engine.set_click_type("right")
+    assert engine._step is None
+
+
+def test_resolve_key():
+    from core.clicker import resolve_key
+
+    assert resolve_key("page_up") == "pageup"
+    assert resolve_key("num_7") == "num7"
+    assert resolve_key("f12") == "f12"
+    assert resolve_key("f01") == "f1"
+    assert resolve_key("f13") == "f13"
+    assert resolve_key("a") == "a"
+
+
+def test_extreme_mode_uses_separate_low_latency_backend(monkeypatch):
+    import core.clicker
+
+    class SlowBackend(RecordingInputBackend):
+        low_latency = False
+
+    fast = RecordingInputBackend()
+    monkeypatch.setattr(core.clicker, "create_input_backend", lambda name=None: fast)
+    slow = SlowBackend()
+    engine = ClickerEngine(input_backend=slow)
+    engine.set_background_capture(False)
+    try:
+        assert engine.extreme_available()
+        assert engine.set_extreme_mode(True)
+        run_until(engine, lambda: fast.clicks >= 3)
+        assert slow.clicks == 0
+
+        engine.set_extreme_mode(False)
+        run_until(engine, lambda: slow.clicks >= 3)
+    finally:
+        engine.stop_clicking()
+
+
+def test_extreme_mode_unavailable_without_low_latency_backend(monkeypatch):
+    import core.clicker
+
+    class SlowBackend(RecordingInputBackend):
+        low_latency = False
+
+    monkeypatch.setattr(core.clicker, "create_input_backend", lambda name=None: SlowBackend())
+    engine = ClickerEngine(input_backend=SlowBackend())
+    assert not engine.extreme_available()
+    assert not engine.set_extreme_mode(True)
+    assert not engine.extreme_mode
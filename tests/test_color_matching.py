@@ -0,0 +1,69 @@
+"""
+Тесты векторизованного поиска цвета (ColorMatcher)
+"""
+
+import numpy as np
+import pytest
+from core.color_matching import ColorMatcher
+
+
+def blank(width: int = 40, height: int = 30) -> np.ndarray:
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def test_max_difference_matches_color_matches_formula():
+    assert ColorMatcher.max_difference(0) == 0
+    assert ColorMatcher.max_difference(10) == 76
+    assert ColorMatcher.max_difference(100) == 765
+
+
+def test_first_keeps_column_major_order():
+    pixels = blank()
+    pixels[5, 20] = (255, 0, 0)
+    pixels[2, 25] = (255, 0, 0)
+    pixels[9, 20] = (255, 0, 0)
+    found, position = ColorMatcher().find(pixels, (255, 0, 0), 0)
+    assert found and position == (20, 5)
+
+
+def test_tolerance_bounds():
+    pixels = blank()
+    pixels[3, 4] = (250, 5, 0)  # Суммарная разность 10
+    matcher = ColorMatcher()
+    assert not matcher.find(pixels, (255, 0, 0), 1)[0]  # порог 7
+    assert matcher.find(pixels, (255, 0, 0), 2) == (True, (4, 3))  # порог 15
+
+
+def test_strategies():
+    pixels = blank()
+    pixels[1, 1] = (200, 0, 0)
+    pixels[20, 30] = (255, 0, 0)
+    matcher = ColorMatcher()
+    assert matcher.find(pixels, (255, 0, 0), 10, strategy="first") == (True, (1, 1))
+    assert matcher.find(pixels, (255, 0, 0), 10, strategy="best") == (True, (30, 20))
+    assert matcher.find(pixels, (255, 0, 0), 10, strategy="nearest", anchor=(28, 18)) == (True, (30, 20))
+
+
+def test_not_found():
+    matcher = ColorMatcher()
+    assert matcher.find(blank(), (255, 0, 0), 5) == (False, None)
+    assert matcher.last_stats["matches"] == 0
+
+
+@pytest.mark.parametrize("left, top", [(0, 0), (37, 21), (13, 6), (59, 41)])
+def test_coarse_to_fine_never_skips_min_size_target(left, top):
+    pixels = blank(64, 48)
+    pixels[top:top + 5, left:left + 5] = (0, 200, 0)
+    found, (x, y) = ColorMatcher().find_coarse_to_fine(pixels, (0, 200, 0), 0, min_size=5)
+    assert found
+    assert left <= x < left + 5 and top <= y < top + 5
+
+
+def test_coarse_to_fine_matches_full_search_for_first():
+    pixels = blank(64, 48)
+    pixels[10:16, 30:36] = (0, 0, 255)
+    pixels[30:36, 8:14] = (0, 0, 255)
+    matcher = ColorMatcher()
+    expected = matcher.find(pixels, (0, 0, 255), 0)
+    assert matcher.find_coarse_to_fine(pixels, (0, 0, 255), 0, min_size=6) == expected
+    assert matcher.last_stats["pixels_examined"] < 64 * 48
@@ -0,0 +1,64 @@
+"""
+Тесты кадра (Frame): вырезки без копирования и общие производные плоскости
+"""
+
+import numpy as np
+import pytest
+from core.frame import Frame
+from core.screen_source import SyntheticScreenSource
+
+
+def bgra_frame(width: int = 40, height: int = 30) -> Frame:
+    raw = np.zeros((height, width, 4), dtype=np.uint8)
+    raw[..., 0] = 30   # B
+    raw[..., 1] = 20   # G
+    raw[..., 2] = 10   # R
+    raw[..., 3] = 255
+    return Frame(raw, left=100, top=50, order="BGRA")
+
+
+def test_planes_from_bgra():
+    frame = bgra_frame()
+    assert tuple(frame.rgb[0, 0]) == (10, 20, 30)
+    assert tuple(frame.bgr[0, 0]) == (30, 20, 10)
+    assert frame.gray.shape == (30, 40)
+    assert frame.rgb is frame.rgb  # плоскость считается один раз
+    assert not frame.rgb.flags.writeable
+
+
+def test_crop_shares_buffer_and_planes():
+    frame = bgra_frame()
+    gray = frame.gray
+    cropped = frame.crop((110, 60, 8, 6))
+    assert cropped.region == (110, 60, 8, 6)
+    assert np.shares_memory(cropped.raw, frame.raw)
+    assert np.shares_memory(cropped.gray, gray)
+    assert frame.crop((100, 50, 40, 30)) is not None
+    assert frame.crop((90, 50, 8, 6)) is None
+    assert frame.crop((135, 75, 8, 6)) is None
+
+
+def test_contains_point():
+    frame = bgra_frame()
+    assert frame.contains_point(100, 50)
+    assert frame.contains_point(139, 79)
+    assert not frame.contains_point(140, 79)
+
+
+def test_downscaled_plane():
+    frame = Frame(np.zeros((32, 48, 3), dtype=np.uint8))
+    assert frame.downscaled(2).shape == (16, 24)
+    assert frame.downscaled(1) is frame.gray
+
+
+def test_unknown_channel_order():
+    with pytest.raises(ValueError):
+        Frame(np.zeros((2, 2, 3), dtype=np.uint8), order="RGBA")
+
+
+def test_source_frame_has_screen_origin():
+    source = SyntheticScreenSource(size=(64, 48))
+    source.draw_rect(20, 10, 2, 2, (9, 8, 7))
+    frame = source.grab_frame((16, 8, 10, 10))
+    assert (frame.left, frame.top) == (16, 8)
+    assert tuple(frame.rgb[2, 4]) == (9, 8, 7)
@@ -0,0 +1,147 @@
+"""
+Тесты шины кадров в разделяемой памяти (FrameBus) и процесса поиска
+"""
+
+import queue
+import threading
+import numpy as np
+import pytest
+from config import *
+
+
+def noise_screen(seed: int = 2, size: tuple = (160, 120)) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (size[1], size[0], 4), dtype=np.uint8)
+
+
+@pytest.fixture
+def bus():
+    from core.frame_bus import FrameBus
+
+    bus = FrameBus(160 * 120 * 4, slots=2)
+    yield bus
+    bus.close()
+
+
+def test_write_keeps_raw_layout(bus):
+    from core.frame import Frame
+
+    raw = noise_screen()
+    slot = bus.acquire(0)
+    shape, order = bus.write(slot, Frame(raw, order="BGRA"))
+    assert shape == raw.shape and order == "BGRA"
+    view = np.ndarray(shape, dtype=np.uint8, buffer=bus.blocks[slot].buf)
+    assert np.array_equal(view, raw)
+    del view
+
+
+def test_slots_are_exclusive_until_freed(bus):
+    from core.frame import Frame
+
+    first, second = bus.acquire(0), bus.acquire(0)
+    assert {first, second} == {0, 1}
+    assert bus.acquire(0.01) is None
+    bus.free(first)
+    assert bus.acquire(0) == first
+    assert bus.write(second, Frame(noise_screen(size=(200, 120)), order="BGRA")) is None
+
+
+def run_worker(bus, job) -> tuple:
+    """Один прогон процесса поиска в потоке: результат задания"""
+    from core.frame_bus import _detector_worker
+
+    jobs, results = queue.Queue(), queue.Queue()
+    worker = threading.Thread(target=_detector_worker, args=(bus.names, jobs, results), daemon=True)
+    worker.start()
+    jobs.put(job)
+    result = results.get(timeout=10)
+    jobs.put(None)
+    worker.join(timeout=5)
+    return result
+
+
+@pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+def test_worker_tries_parent_scale_first(bus, tmp_path):
+    import cv2
+    from core.frame import Frame
+
+    pattern = cv2.resize(np.random.default_rng(8).integers(0, 256, (6, 8, 3), dtype=np.uint8), (32, 24),
+                         interpolation=cv2.INTER_CUBIC)
+    path = str(tmp_path / "scaled.png")
+    cv2.imwrite(path, pattern)
+    screen = np.full((120, 160, 3), 90, dtype=np.uint8)
+    scaled = cv2.resize(pattern, (int(32 * 1.3), int(24 * 1.3)), interpolation=cv2.INTER_CUBIC)
+    screen[30:30 + scaled.shape[0], 50:50 + scaled.shape[1]] = scaled
+
+    slot = bus.acquire(0)
+    shape, order = bus.write(slot, Frame(screen, order="BGR"))
+    settings = {"mode": "color", "method": "ccoeff_normed", "prefilter": False, "threshold": 0.8,
+                "multi_scale": True, "scale_range": (0.8, 1.5), "scales": {path: 1.3}}
+    _, matches, error = run_worker(bus, (1, slot, shape, order, [path], settings))
+    assert error is None
+    assert matches[0]["found"] and matches[0]["scale"] == 1.3
+    assert matches[0]["box"] == (50, 30, 42, 31)
+
+
+@pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+def test_worker_matches_in_slot(bus, tmp_path):
+    import cv2
+    from core.frame import Frame
+    from core.frame_bus import _detector_worker
+
+    raw = noise_screen()
+    frame = Frame(raw, order="BGRA")
+    path = str(tmp_path / "target.png")
+    cv2.imwrite(path, np.ascontiguousarray(frame.bgr[40:60, 70:94]))
+
+    slot = bus.acquire(0)
+    shape, order = bus.write(slot, frame)
+    jobs, results = queue.Queue(), queue.Queue()
+    worker = threading.Thread(target=_detector_worker, args=(bus.names, jobs, results), daemon=True)
+    worker.start()
+    settings = {"mode": "color", "method": "ccoeff_normed", "prefilter": False, "threshold": 0.9,
+                "multi_scale": False, "scale_range": TEMPLATE_SCALE_RANGE}
+    jobs.put((7, slot, shape, order, [path, str(tmp_path / "missing.png")], settings))
+    job_id, matches, error = results.get(timeout=10)
+    jobs.put(None)
+    worker.join(timeout=5)
+
+    assert (job_id, error) == (7, None)
+    assert matches[0]["found"] and matches[0]["box"] == (70, 40, 24, 20)
+    assert matches[1] is None
+
+
+class RecordedPool:
+    """Пул с заранее заданными результатами (без процессов)"""
+
+    running = True
+
+    def __init__(self, matches):
+        self.matches = matches
+        self.jobs = []
+
+    def detect(self, frame, template_paths, settings, deadline=None):
+        self.jobs.append((list(template_paths), settings))
+        return self.matches
+
+
+@pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+def test_pool_scales_reach_parent_cache():
+    from core.frame import Frame
+    from core.image_processing import ImageProcessor
+    from core.screen_source import SyntheticScreenSource
+
+    found = {"found": True, "position": (5, 5), "score": 0.95, "box": (0, 0, 10, 10), "scale": 1.25}
+    missed = {"found": False, "position": None, "score": 0.1, "box": None, "scale": 0.8}
+    pool = RecordedPool([found, missed])
+    processor = ImageProcessor(screen_source=SyntheticScreenSource(size=(64, 48)))
+    processor.set_detector_pool(pool)
+    processor.set_multi_scale(True)
+
+    assert processor._pool_detect(Frame(np.zeros((48, 64, 3), dtype=np.uint8)), ["a.png", "b.png"]) == [found, missed]
+    assert processor.template_matcher.scale_cache == {"a.png": 1.25}
+    assert pool.jobs[0][1]["multi_scale"]
+    assert pool.jobs[0][1]["scales"] == {}
+
+    # Следующее задание несет уже известный масштаб шаблона
+    processor._pool_detect(Frame(np.zeros((48, 64, 3), dtype=np.uint8)), ["a.png", "b.png"])
+    assert pool.jobs[1][1]["scales"] == {"a.png": 1.25}
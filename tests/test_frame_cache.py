@@ -0,0 +1,58 @@
+"""
+Тесты кэша кадров (CachedScreenSource)
+"""
+
+import time
+import numpy as np
+from core.frame_cache import CachedScreenSource
+from core.screen_source import SyntheticScreenSource
+
+
+def noise_screen(width: int, height: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def test_hits_and_crops():
+    screen = noise_screen(200, 100)
+    source = SyntheticScreenSource(screen)
+    cache = CachedScreenSource(source, max_age=60.0)
+
+    full = cache.grab_array()
+    assert np.array_equal(cache.grab_array(), full)
+    assert np.array_equal(cache.grab_array((20, 10, 50, 30)), screen[10:40, 20:70])
+
+    stats = cache.get_stats()
+    assert (stats["cache_misses"], stats["cache_hits"], stats["cache_crop_hits"]) == (1, 1, 1)
+    assert stats["cache_hit_rate"] == 2 / 3
+    assert source.get_stats()["captures"] == 1
+
+
+def test_region_outside_cached_frame_is_captured():
+    source = SyntheticScreenSource(size=(100, 100))
+    cache = CachedScreenSource(source, max_age=60.0)
+    cache.grab_array((0, 0, 50, 50))
+    cache.grab_array((40, 40, 20, 20))
+    assert cache.get_stats()["cache_misses"] == 2
+
+
+def test_expiry_and_invalidate():
+    source = SyntheticScreenSource(size=(32, 32))
+    cache = CachedScreenSource(source, max_age=0.0)
+    cache.grab_array()
+    time.sleep(0.001)
+    cache.grab_array()
+    assert cache.get_stats()["cache_misses"] == 2
+
+    # Последний кадр снова свежий при большем окне, пока кэш не сброшен
+    cache.set_max_age(60.0)
+    cache.grab_array()
+    assert cache.get_stats()["cache_hits"] == 1
+    cache.invalidate()
+    cache.grab_array()
+    assert cache.get_stats()["cache_misses"] == 3
+
+
+def test_cached_frames_are_read_only():
+    cache = CachedScreenSource(SyntheticScreenSource(size=(16, 16)), max_age=60.0)
+    with cache.grab_frame() as frame:
+        assert not frame.raw.flags.writeable
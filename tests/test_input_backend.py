@@ -0,0 +1,132 @@
+"""
+Тесты бэкендов ввода (RecordingInputBackend и выбор бэкенда)
+"""
+
+import time
+
+from core.input_backend import InputBackend, RecordingInputBackend, create_input_backend
+
+
+def kinds(backend):
+    """События бэкенда без отметок времени"""
+    return [(kind, data) for _, kind, data in backend.events]
+
+
+def test_click_records_move_down_up():
+    backend = RecordingInputBackend()
+    backend.click((10, 20), "right")
+    backend.click()
+    assert kinds(backend) == [
+        ("move", (10, 20)), ("down", ("right", (10, 20))), ("up", ("right", (10, 20))),
+        ("down", ("left", (10, 20))), ("up", ("left", (10, 20))),
+    ]
+    assert backend.clicks == 2
+    assert backend.position() == (10, 20)
+
+
+def test_events_are_timestamped_in_order():
+    backend = RecordingInputBackend()
+    for x in range(5):
+        backend.move(x, x)
+    times = [stamp for stamp, _, _ in backend.events]
+    assert times == sorted(times)
+
+
+def test_hotkey_is_pressed_and_released_in_reverse():
+    backend = RecordingInputBackend()
+    backend.press("ctrl+shift+s")
+    backend.press("+")
+    assert kinds(backend) == [
+        ("key_down", "ctrl"), ("key_down", "shift"), ("key_down", "s"),
+        ("key_up", "s"), ("key_up", "shift"), ("key_up", "ctrl"),
+        ("key_down", "+"), ("key_up", "+"),
+    ]
+    assert backend.key_presses == 2
+
+
+def test_split_keys():
+    assert InputBackend.split_keys("ctrl+c") == ["ctrl", "c"]
+    assert InputBackend.split_keys("+") == ["+"]
+    assert InputBackend.split_keys("enter") == ["enter"]
+
+
+def test_click_burst_records_every_click():
+    backend = RecordingInputBackend()
+    backend.click_burst(3, (5, 6))
+    assert backend.clicks == 3
+    assert kinds(backend) == [("move", (5, 6))] + [("down", ("left", (5, 6))), ("up", ("left", (5, 6)))] * 3
+
+
+def test_max_events_and_clear():
+    backend = RecordingInputBackend(max_events=4)
+    for _ in range(5):
+        backend.click()
+    assert len(backend.events) == 4
+    assert backend.clicks == 5
+
+    backend.clear()
+    assert backend.events == [] and backend.clicks == 0 and backend.key_presses == 0
+
+    silent = RecordingInputBackend(record=False)
+    silent.click((1, 1))
+    assert silent.events == [] and silent.clicks == 1
+
+
+def test_null_backend_by_name():
+    backend = create_input_backend("null")
+    assert isinstance(backend, RecordingInputBackend)
+    assert backend.low_latency
+
+
+class CornerBackend(RecordingInputBackend):
+    """Бэкенд записи с проверкой угла экрана 100x80"""
+
+    failsafe = True
+
+    def screen_size(self) -> tuple:
+        return (100, 80)
+
+
+def test_failsafe_in_screen_corners():
+    import pytest
+    from core.input_backend import FailSafeException
+
+    backend = CornerBackend()
+    for corner in [(0, 0), (99, 0), (0, 79), (99, 79)]:
+        with pytest.raises(FailSafeException):
+            backend.check_failsafe(corner)
+    backend.check_failsafe((0, 40))
+    backend.check_failsafe((50, 50))
+
+    backend.failsafe = False
+    backend.check_failsafe((0, 0))
+
+
+def test_failsafe_queries_cursor_at_most_once_per_interval():
+    import pytest
+    from core.input_backend import FailSafeException
+
+    class CountingBackend(CornerBackend):
+        queries = 0
+
+        def position(self) -> tuple:
+            self.queries += 1
+            return (99, 79)
+
+    backend = CountingBackend()
+    backend.failsafe_interval = 0.05
+    with pytest.raises(FailSafeException):
+        backend.check_failsafe()
+    for _ in range(100):
+        backend.check_failsafe()
+    assert backend.queries == 1
+
+    # Заданная позиция проверяется всегда, без запроса курсора
+    with pytest.raises(FailSafeException):
+        backend.check_failsafe((0, 0))
+    assert backend.queries == 1
+
+    time.sleep(0.06)
+    with pytest.raises(FailSafeException):
+        backend.check_failsafe()
+    assert backend.queries == 2
@@ -0,0 +1,59 @@
+"""
+Тесты параллельного поиска шаблонов (ParallelMatcher)
+"""
+
+import numpy as np
+import pytest
+from config import *
+
+pytestmark = pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+
+
+def noise_screen(seed: int = 5, size: tuple = (320, 240)) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("workers", [2, 3, 4])
+@pytest.mark.parametrize("position", [(0, 0), (140, 97), (300, 224)])
+def test_strips_find_same_position_as_full_search(workers, position):
+    from core.frame import Frame
+    from core.parallel_matcher import ParallelMatcher
+    from core.template_matcher import Template, TemplateMatcher
+
+    screen = noise_screen()
+    left, top = position
+    template = Template(screen[top:top + 16, left:left + 20].copy())
+    full = TemplateMatcher(prefilter=False).match(Frame(screen), template)
+    matcher = ParallelMatcher(workers=workers, prefilter=False, min_tile_area=1)
+    try:
+        result = matcher.match(Frame(screen), template)
+    finally:
+        matcher.close()
+    assert result["box"] == full["box"] == (left, top, 20, 16)
+
+
+def test_match_many_keeps_template_order():
+    from core.frame import Frame
+    from core.parallel_matcher import ParallelMatcher
+    from core.template_matcher import Template
+
+    screen = noise_screen(9)
+    positions = [(200, 30), (12, 150), (90, 90), (260, 200)]
+    templates = [Template(screen[top:top + 12, left:left + 12].copy()) for left, top in positions]
+    matcher = ParallelMatcher(workers=3, prefilter=False, min_tile_area=1)
+    try:
+        results = matcher.match_many(Frame(screen), templates)
+    finally:
+        matcher.close()
+    assert [result["box"][:2] for result in results] == positions
+    assert matcher.last_stats["found"] == len(positions)
+
+
+def test_single_worker_uses_plain_search():
+    from core.parallel_matcher import ParallelMatcher
+
+    matcher = ParallelMatcher(workers=1, prefilter=False)
+    screen = noise_screen(3, (64, 48))
+    hit = matcher._search_plane(screen, screen[10:20, 5:15].copy(), "ccoeff_normed")
+    assert hit[1:] == (5, 10)
+    assert matcher._executor is None
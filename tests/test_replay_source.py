@@ -0,0 +1,53 @@
+"""
+Тесты воспроизведения записанных кадров (ReplayScreenSource, record_session)
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+from core.replay_source import ReplayScreenSource, record_session
+from core.screen_source import SyntheticScreenSource
+
+
+def solid(value: int, width: int = 20, height: int = 10) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_folder_fast_mode_loops(tmp_path):
+    for i, value in enumerate((10, 20, 30)):
+        Image.fromarray(solid(value)).save(tmp_path / f"{i:04d}.png")
+    source = ReplayScreenSource(str(tmp_path), mode="fast")
+
+    values = [int(source.grab_array()[0, 0, 0]) for _ in range(4)]
+    assert values == [10, 20, 30, 10]
+    assert source.screen_size() == (20, 10)
+
+
+def test_without_loop_stays_on_last_frame(tmp_path):
+    for i, value in enumerate((1, 2)):
+        Image.fromarray(solid(value)).save(tmp_path / f"{i:04d}.png")
+    source = ReplayScreenSource(str(tmp_path), mode="fast", loop=False)
+    values = [int(source.pixel(0, 0)[0]) for _ in range(3)]
+    assert values == [1, 2, 2]
+    assert source.is_finished()
+    source.rewind()
+    assert source.pixel(0, 0)[0] == 1
+
+
+def test_recorded_session_keeps_screen_coordinates(tmp_path):
+    live = SyntheticScreenSource(size=(100, 80))
+    live.draw_rect(50, 40, 4, 4, (255, 0, 0))
+    path = record_session(live, str(tmp_path / "session"), frame_count=2, region=(40, 30, 30, 20), fps=0)
+
+    replay = ReplayScreenSource(path, mode="fast")
+    assert replay.origin == (40, 30)
+    assert replay.pixel(51, 41) == (255, 0, 0)
+    pixels = replay.grab_array((48, 38, 8, 8))
+    assert tuple(pixels[2, 2]) == (255, 0, 0)
+    assert tuple(pixels[0, 0]) == (0, 0, 0)
+
+
+def test_unknown_mode_rejected(tmp_path):
+    Image.fromarray(solid(0)).save(tmp_path / "0.png")
+    with pytest.raises(ValueError):
+        ReplayScreenSource(str(tmp_path), mode="slow")
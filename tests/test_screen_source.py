@@ -0,0 +1,53 @@
+"""
+Тесты источников кадров (SyntheticScreenSource) и поиска цвета через источник
+"""
+
+import numpy as np
+from config import *
+from core.color_detection import ColorDetector
+from core.screen_source import SyntheticScreenSource, create_screen_source
+
+
+def test_synthetic_grab_region():
+    source = SyntheticScreenSource(size=(100, 80))
+    source.draw_rect(10, 20, 5, 4, (1, 2, 3))
+
+    pixels = source.grab_array((8, 18, 10, 10))
+    assert pixels.shape == (10, 10, 3)
+    assert tuple(pixels[2, 2]) == (1, 2, 3)
+    assert tuple(pixels[0, 0]) == (0, 0, 0)
+    assert source.pixel(12, 21) == (1, 2, 3)
+    assert source.grab((0, 0, 30, 20)).size == (30, 20)
+    assert source.screen_size() == (100, 80)
+
+
+def test_synthetic_region_outside_screen_is_black():
+    source = SyntheticScreenSource(np.full((10, 10, 3), 255, dtype=np.uint8))
+    pixels = source.grab_array((-2, 5, 6, 8))
+    assert pixels.shape == (8, 6, 3)
+    assert not pixels[:, :2].any()
+    assert (pixels[:5, 2:] == 255).all()
+    assert not pixels[5:].any()
+
+
+def test_capture_stats():
+    source = create_screen_source("synthetic")
+    source.grab_array((0, 0, 10, 10))
+    source.grab_array((0, 0, 10, 10))
+    stats = source.get_stats()
+    assert stats["backend"] == "synthetic"
+    assert stats["captures"] == 2
+    source.reset_stats()
+    assert source.get_stats()["captures"] == 0
+
+
+def test_color_detector_uses_search_area_offsets():
+    source = SyntheticScreenSource(size=(200, 150))
+    source.draw_rect(120, 90, 3, 3, (255, 0, 0))
+    source.draw_rect(10, 10, 3, 3, (255, 0, 0))  # вне области поиска
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color("#FF0000")
+    detector.set_tolerance(0)
+    detector.set_search_area(100, 80, 180, 140)
+
+    assert detector.find_color_position(use_cache=False) == (True, (120, 90))
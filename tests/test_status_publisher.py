@@ -0,0 +1,60 @@
+"""
+Тесты публикации состояния кликера (StatusPublisher)
+"""
+
+from core.status_publisher import StatusPublisher
+
+
+def test_drain_returns_only_changes():
+    publisher = StatusPublisher()
+    assert publisher.drain() == (None, 0)
+    assert publisher.drain() == (None, None)
+
+    for count in range(1, 1001):
+        publisher.publish_count(count)
+    assert publisher.drain() == (None, 1000)
+    assert publisher.drain() == (None, None)
+
+
+def test_every_status_change_is_delivered():
+    publisher = StatusPublisher()
+    publisher.drain()
+    # Быстрый запуск и остановка между опросами не теряются
+    publisher.publish_status("running")
+    publisher.publish_status("stopped")
+    assert publisher.drain() == ("stopped", 0)
+
+    publisher.publish_status("stopped")
+    status, _ = publisher.drain()
+    assert status == "stopped"
+    assert publisher.drain() == (None, None)
+
+
+def test_status_change_repeats_count():
+    publisher = StatusPublisher()
+    publisher.publish_count(5)
+    publisher.drain()
+    publisher.publish_status("running")
+    assert publisher.drain() == ("running", 5)
+
+
+def test_engine_publishes_clicks_and_status():
+    import time
+    from config import MIN_INTERVAL
+    from core.clicker import ClickerEngine
+    from core.input_backend import RecordingInputBackend
+
+    backend = RecordingInputBackend()
+    engine = ClickerEngine(input_backend=backend)
+    engine.set_background_capture(False)
+    engine.set_interval(MIN_INTERVAL)
+    engine.start_clicking()
+    assert engine.status_publisher.drain()[0] == "running"
+    deadline = time.perf_counter() + 5.0
+    while backend.clicks < 10 and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    engine.stop_clicking()
+
+    status, count = engine.status_publisher.drain()
+    assert status == "stopped"
+    assert count == engine.get_click_count() == backend.clicks >= 10
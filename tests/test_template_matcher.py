@@ -0,0 +1,234 @@
+"""
+Тесты поиска шаблонов через cv2.matchTemplate (TemplateMatcher, ImageProcessor)
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+from config import *
+from core.frame import Frame
+from core.screen_source import SyntheticScreenSource
+
+pytestmark = pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+
+
+def noise_screen(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Шумный экран: у любого участка четкий единственный максимум корреляции"""
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def save_template(path, pixels: np.ndarray) -> str:
+    Image.fromarray(pixels).save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("mode", TEMPLATE_MATCH_MODES)
+@pytest.mark.parametrize("method", TEMPLATE_MATCH_METHODS)
+def test_match_finds_exact_position(mode, method):
+    from core.template_matcher import Template, TemplateMatcher
+
+    screen = noise_screen(160, 120)
+    template = Template(screen[40:56, 70:94])
+    result = TemplateMatcher(mode=mode, method=method).match(Frame(screen), template, threshold=0.9)
+    assert result["found"]
+    assert result["box"] == (70, 40, 24, 16)
+    assert result["position"] == (82, 48)
+    assert result["score"] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_template_larger_than_frame_is_not_found():
+    from core.template_matcher import Template, TemplateMatcher
+
+    result = TemplateMatcher().match(noise_screen(20, 20), Template(noise_screen(30, 10)))
+    assert not result["found"]
+    assert result["position"] is None
+
+
+def test_unknown_mode_rejected():
+    from core.template_matcher import TemplateMatcher
+
+    with pytest.raises(ValueError):
+        TemplateMatcher(mode="hsv")
+
+
+def test_image_processor_returns_screen_coordinates(tmp_path):
+    from core.image_processing import ImageProcessor
+
+    screen = noise_screen(300, 200, seed=3)
+    path = save_template(tmp_path / "target.png", screen[120:140, 210:240])
+    processor = ImageProcessor(screen_source=SyntheticScreenSource(screen))
+    processor.set_search_area(150, 100, 290, 190)
+
+    assert processor.find_image_position(path, use_cache=False) == (True, (225, 130))
+
+
+def test_image_processor_reports_miss(tmp_path):
+    from core.image_processing import ImageProcessor
+
+    path = save_template(tmp_path / "target.png", noise_screen(20, 20, seed=4))
+    processor = ImageProcessor(screen_source=SyntheticScreenSource(noise_screen(120, 90, seed=5)))
+    processor.set_confidence(0.95)
+    assert processor.find_image_position(path, use_cache=False) == (False, None)
+
+
+def smooth_pattern(size: int, seed: int = 7) -> np.ndarray:
+    """Плавный узор: после изменения масштаба остается узнаваемым (в отличие от шума)"""
+    import cv2
+
+    coarse = np.random.default_rng(seed).integers(0, 256, (6, 6, 3), dtype=np.uint8)
+    return cv2.resize(coarse, (size, size), interpolation=cv2.INTER_CUBIC)
+
+
+def test_multiscale_finds_scaled_template_and_caches_scale():
+    import cv2
+    from core.template_matcher import Template, TemplateMatcher
+
+    base = smooth_pattern(40)
+    scaled = cv2.resize(base, (60, 60), interpolation=cv2.INTER_LINEAR)
+    screen = np.full((240, 320, 3), 40, dtype=np.uint8)
+    screen[100:160, 150:210] = scaled
+    template = Template(base, path="button.png")
+    matcher = TemplateMatcher()
+
+    result = matcher.match_multiscale(Frame(screen), template, threshold=0.8)
+    assert result["found"]
+    assert result["scale"] == pytest.approx(1.5, rel=0.08)
+    x, y = result["position"]
+    assert abs(x - 180) <= 3 and abs(y - 130) <= 3
+    assert matcher.scale_cache["button.png"] == result["scale"]
+
+    # Повторный поиск начинается с запомненного масштаба и им же заканчивается
+    again = matcher.match_multiscale(Frame(screen), template, threshold=0.8)
+    assert again["position"] == result["position"]
+    assert matcher.last_stats["cached_scale"] == result["scale"]
+    assert matcher.last_stats["matches_tried"] == 1
+
+
+def test_multiscale_descends_a_multilevel_pyramid():
+    import cv2
+    from core.template_matcher import Template, TemplateMatcher
+
+    base = smooth_pattern(160, seed=3)
+    scaled = cv2.resize(base, (200, 200), interpolation=cv2.INTER_LINEAR)
+    screen = np.full((720, 960, 3), 40, dtype=np.uint8)
+    screen[300:500, 500:700] = scaled
+    template = Template(base)
+    assert TemplateMatcher.pyramid_levels(template, (0.5, 2.0)) == 3
+
+    matcher = TemplateMatcher()
+    frame = Frame(screen)
+    result = matcher.match_multiscale(frame, template, threshold=0.8)
+    assert result["found"]
+    assert result["scale"] == pytest.approx(1.25, rel=0.08)
+    x, y = result["position"]
+    assert abs(x - 600) <= 3 and abs(y - 400) <= 3
+    # Грубый проход на уровне 1/8, спуск через 1/4 и 1/2
+    assert {"gray/8", "gray/4", "gray/2"} <= set(frame._planes)
+
+
+def test_small_template_skips_pyramid():
+    from core.template_matcher import Template, TemplateMatcher
+
+    assert TemplateMatcher.pyramid_levels(Template(smooth_pattern(12)), (0.5, 2.0)) == 0
+    assert TemplateMatcher.pyramid_levels(Template(smooth_pattern(40)), (0.5, 2.0)) == 1
+
+
+def test_scaled_planes_are_counted_and_capped(monkeypatch):
+    import core.template_matcher as template_matcher
+    from core.template_matcher import Template
+
+    monkeypatch.setattr(template_matcher, "TEMPLATE_SCALED_CACHE_SIZE", 3)
+    template = Template(smooth_pattern(40))
+    base_bytes = template.nbytes
+    half = template.plane("gray", 0.5)
+    assert template.nbytes == base_bytes + half.nbytes
+
+    for scale in (0.6, 0.7, 0.8, 0.9):
+        template.plane("gray", scale)
+    assert len(template._scaled) == 3
+    assert ("gray", 0.5) not in template._scaled
+    assert template.nbytes == base_bytes + sum(plane.nbytes for plane in template._scaled.values())
+
+
+def test_scale_grid_contains_one():
+    from core.template_matcher import TemplateMatcher
+
+    scales = TemplateMatcher.scales((0.5, 2.0), 1.1)
+    assert 1.0 in scales
+    assert scales == sorted(scales)
+    assert scales[0] >= 0.5 and scales[-1] <= 2.0
+    assert TemplateMatcher.scales((1.2, 1.5), 1.1)[0] > 1.0
+
+
+def test_match_many_keeps_template_order():
+    from core.template_matcher import Template, TemplateMatcher
+
+    screen = noise_screen(200, 150, seed=8)
+    templates = [Template(screen[10:30, 150:180]), Template(noise_screen(20, 20, seed=9)),
+                 Template(screen[100:120, 20:44])]
+    results = TemplateMatcher().match_many(screen, templates, threshold=0.9)
+    assert [result["found"] for result in results] == [True, False, True]
+    assert results[0]["box"][:2] == (150, 10)
+    assert results[2]["box"][:2] == (20, 100)
+
+
+def test_find_templates_uses_one_capture(tmp_path):
+    from core.image_processing import ImageProcessor
+
+    screen = noise_screen(240, 160, seed=10)
+    source = SyntheticScreenSource(screen)
+    paths = [
+        save_template(tmp_path / "a.png", screen[20:40, 30:60]),
+        str(tmp_path / "missing.png"),
+        save_template(tmp_path / "b.png", screen[120:140, 200:230]),
+    ]
+    processor = ImageProcessor(screen_source=source)
+    results = processor.find_templates(paths)
+
+    assert source.get_stats()["captures"] == 1
+    assert results[0][:2] == (True, (45, 30))
+    assert results[1] == (False, None, 0.0)
+    assert results[2][:2] == (True, (215, 130))
+
+
+def test_match_all_suppresses_neighbours():
+    from core.template_matcher import Template, TemplateMatcher
+
+    screen = np.zeros((120, 200, 3), dtype=np.uint8)
+    pattern = noise_screen(16, 12, seed=1)
+    screen[20:32, 30:46] = pattern
+    screen[70:82, 150:166] = pattern
+    screen[22:34, 100:116] = pattern
+
+    results = TemplateMatcher().match_all(screen, Template(pattern), threshold=0.9)
+    assert sorted(result["box"][:2] for result in results) == [(30, 20), (100, 22), (150, 70)]
+    assert all(result["score"] > 0.99 for result in results)
+
+    limited = TemplateMatcher().match_all(screen, Template(pattern), threshold=0.9, max_results=2)
+    assert len(limited) == 2
+
+
+def test_suppress_keeps_best_of_overlapping_boxes():
+    from core.template_matcher import TemplateMatcher
+
+    xs = np.array([10, 11, 40, 13])
+    ys = np.array([10, 10, 10, 12])
+    values = np.array([0.99, 0.95, 0.9, 0.85])
+    kept = TemplateMatcher._suppress(xs, ys, values, 10, 10, overlap=0.3, max_results=10)
+    assert [(x, y) for x, y, _ in kept] == [(10, 10), (40, 10)]
+
+
+def test_find_all_image_positions_in_reading_order(tmp_path):
+    from core.image_processing import ImageProcessor
+
+    screen = np.zeros((100, 160, 3), dtype=np.uint8)
+    pattern = noise_screen(10, 10, seed=11)
+    for left, top in ((120, 10), (20, 60), (60, 10)):
+        screen[top:top + 10, left:left + 10] = pattern
+    path = save_template(tmp_path / "icon.png", pattern)
+    processor = ImageProcessor(screen_source=SyntheticScreenSource(screen))
+    processor.set_search_area(10, 5, 150, 95)
+
+    hits = processor.find_all_image_positions(path)
+    assert [hit["box"][:2] for hit in hits] == [(60, 10), (120, 10), (20, 60)]
+    assert hits[0]["position"] == (65, 15)
@@ -0,0 +1,97 @@
+"""
+Тесты цветового предфильтра поиска шаблонов (TemplatePrefilter)
+"""
+
+import numpy as np
+import pytest
+from config import *
+
+pytestmark = pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+
+
+def button() -> np.ndarray:
+    """Шаблон из однотонных насыщенных блоков (как у кнопки интерфейса)"""
+    pixels = np.zeros((24, 32, 3), dtype=np.uint8)
+    pixels[:12, :16] = (220, 30, 30)
+    pixels[:12, 16:] = (30, 200, 40)
+    pixels[12:, :16] = (40, 60, 230)
+    pixels[12:, 16:] = (240, 220, 20)
+    return pixels
+
+
+def screen_with(template: np.ndarray, left: int, top: int, size: tuple = (400, 300)) -> np.ndarray:
+    screen = np.full((size[1], size[0], 3), 128, dtype=np.uint8)
+    screen[top:top + template.shape[0], left:left + template.shape[1]] = template
+    return screen
+
+
+def test_candidates_contain_template():
+    from core.template_matcher import Template
+    from core.template_prefilter import TemplatePrefilter
+
+    screen = screen_with(button(), 250, 180)
+    regions = TemplatePrefilter().candidates(screen, Template(button()))
+    assert regions
+    assert any(left <= 250 and top <= 180 and left + width >= 282 and top + height >= 204
+               for left, top, width, height in regions)
+    assert sum(width * height for _, _, width, height in regions) < 400 * 300 * 0.25
+
+
+def test_prefiltered_match_equals_full_search():
+    from core.frame import Frame
+    from core.template_matcher import Template, TemplateMatcher
+
+    screen = screen_with(button(), 250, 180)
+    template = Template(button())
+    full = TemplateMatcher(prefilter=False).match(Frame(screen), template)
+    matcher = TemplateMatcher(prefilter=True)
+    result = matcher.match(Frame(screen), template)
+    assert matcher.last_stats["prefilter"] == "candidates"
+    assert result["box"] == full["box"] == (250, 180, 32, 24)
+    assert result["score"] == pytest.approx(full["score"], abs=1e-4)
+
+
+def test_flat_template_falls_back_to_full_search():
+    from core.frame import Frame
+    from core.template_matcher import Template, TemplateMatcher
+    from core.template_prefilter import TemplatePrefilter
+
+    flat = np.full((10, 10, 3), 90, dtype=np.uint8)
+    assert TemplatePrefilter().signature(Template(flat)) is None
+
+    screen = screen_with(flat, 30, 40)
+    matcher = TemplateMatcher(prefilter=True)
+    result = matcher.match(Frame(screen), Template(flat))
+    assert matcher.last_stats["prefilter"] == "fallback"
+    assert result["found"]
+
+
+def test_recoloured_target_falls_back_to_full_search():
+    from core.frame import Frame
+    from core.template_matcher import Template, TemplateMatcher
+
+    # Те же формы в других оттенках: кандидатов нет, полный поиск в сером все равно находит цель
+    screen = screen_with(255 - button(), 100, 60)
+    matcher = TemplateMatcher(mode="gray", prefilter=True)
+    matcher.match(Frame(screen), Template(button()), threshold=0.0)
+    assert matcher.last_stats["prefilter"] == "fallback"
+
+
+def test_small_frames_skip_prefilter():
+    from core.frame import Frame
+    from core.template_matcher import Template, TemplateMatcher
+
+    template = Template(button())
+    patch = screen_with(button(), 3, 3, size=(38, 30))
+    matcher = TemplateMatcher(prefilter=True)
+    result = matcher.match(Frame(patch), template)
+    assert matcher.last_stats["prefilter"] == "skipped"
+    assert result["box"] == (3, 3, 32, 24)
+    assert not matcher.prefilter.applies(patch.shape, button().shape)
+    assert matcher.prefilter.applies((300, 400), button().shape)
+
+
+def test_prefilter_is_off_by_default():
+    from core.template_matcher import TemplateMatcher
+
+    assert TemplateMatcher().prefilter is None
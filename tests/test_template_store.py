@@ -0,0 +1,103 @@
+"""
+Тесты кэша декодированных шаблонов (TemplateStore)
+"""
+
+import os
+import numpy as np
+from PIL import Image
+from core.template_store import TemplateStore
+
+
+def write_template(path, value: int, size: int = 8) -> str:
+    Image.fromarray(np.full((size, size, 3), value, dtype=np.uint8)).save(path)
+    return str(path)
+
+
+def test_hits_skip_disk_within_stat_interval(tmp_path):
+    path = write_template(tmp_path / "a.png", 10)
+    store = TemplateStore(stat_interval=60.0)
+    template = store.get(path)
+    assert store.get(path) is template
+    assert store.exists(path)
+    stats = store.get_stats()
+    assert (stats["loads"], stats["hits"], stats["stat_calls"]) == (1, 2, 1)
+
+
+def test_changed_mtime_reloads(tmp_path):
+    path = write_template(tmp_path / "a.png", 10)
+    store = TemplateStore(stat_interval=0.0)
+    first = store.get(path)
+    assert store.get(path) is first  # тот же mtime и размер
+
+    write_template(path, 200)
+    info = os.stat(path)
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+    second = store.get(path)
+    assert second is not first
+    assert int(second.rgb[0, 0, 0]) == 200
+    assert store.get_stats()["reloads"] == 1
+
+
+def test_missing_file(tmp_path):
+    store = TemplateStore(stat_interval=0.0)
+    assert store.get(str(tmp_path / "missing.png")) is None
+    assert not store.exists(str(tmp_path / "missing.png"))
+    assert store.get(None) is None
+
+
+def test_deleted_file_is_dropped(tmp_path):
+    path = write_template(tmp_path / "a.png", 10)
+    store = TemplateStore(stat_interval=0.0)
+    store.get(path)
+    os.remove(path)
+    assert store.get(path) is None
+    assert store.get_stats()["templates"] == 0
+    assert store.total_bytes == 0
+
+
+def test_lru_eviction_by_byte_budget(tmp_path):
+    paths = [write_template(tmp_path / f"{i}.png", i, size=16) for i in range(3)]
+    store = TemplateStore(stat_interval=60.0)
+    one = store.get(paths[0]).nbytes
+    store.max_bytes = 2 * one
+
+    store.get(paths[0])
+    store.get(paths[1])
+    store.get(paths[0])  # paths[1] теперь давно не используемый
+    store.get(paths[2])
+
+    stats = store.get_stats()
+    assert stats["templates"] == 2
+    assert stats["evictions"] == 1
+    assert store.total_bytes <= store.max_bytes
+    loads = stats["loads"]
+    store.get(paths[0])
+    assert store.get_stats()["loads"] == loads  # не вытеснен
+    store.get(paths[1])
+    assert store.get_stats()["loads"] == loads + 1  # вытеснен и загружен заново
+
+
+def test_scaled_planes_count_toward_budget(tmp_path):
+    paths = [write_template(tmp_path / f"{i}.png", i, size=16) for i in range(2)]
+    store = TemplateStore(stat_interval=60.0)
+    first = store.get(paths[0])
+    store.get(paths[1])
+    store.max_bytes = store.total_bytes
+
+    # Масштабированные варианты после загрузки учитываются при следующем обращении
+    first.plane("color", 2.0)
+    assert store.get(paths[0]) is first
+    assert store.total_bytes == first.nbytes
+    assert store.get_stats()["evictions"] == 1
+    assert store.get_stats()["templates"] == 1
+
+
+def test_invalidate(tmp_path):
+    path = write_template(tmp_path / "a.png", 10)
+    store = TemplateStore(stat_interval=60.0)
+    store.get(path)
+    store.invalidate(path)
+    store.get(path)
+    assert store.get_stats()["loads"] == 2
+    store.invalidate()
+    assert store.get_stats()["templates"] == 0
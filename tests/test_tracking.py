@@ -0,0 +1,78 @@
+"""
+Тесты слежения за целью (TrackingSearch)
+"""
+
+from core.color_detection import ColorDetector
+from core.screen_source import SyntheticScreenSource
+from core.tracking import TrackingSearch
+
+
+def point_search(target):
+    """Функция поиска, которая находит target, если он внутри региона; и журнал регионов"""
+    calls = []
+
+    def search(region):
+        calls.append(region)
+        if region is None:
+            return True, target
+        left, top, width, height = region
+        if left <= target[0] < left + width and top <= target[1] < top + height:
+            return True, target
+        return False, None
+
+    return search, calls
+
+
+def test_first_search_is_full():
+    tracker = TrackingSearch(initial_window=20, expansion=2, max_levels=3)
+    search, calls = point_search((50, 50))
+    assert tracker.search(search, (0, 0, 400, 300)) == (True, (50, 50))
+    assert calls == [None]
+
+
+def test_windows_grow_and_stay_in_bounds():
+    tracker = TrackingSearch(initial_window=20, expansion=2, max_levels=3)
+    tracker.anchor = (5, 100)
+    windows = tracker.windows((0, 0, 400, 300))
+    assert len(windows) == 3
+    assert [w[2] for w in windows] == sorted(w[2] for w in windows)
+    for left, top, width, height in windows:
+        assert left >= 0 and top >= 0 and left + width <= 400 and top + height <= 300
+
+
+def test_moved_target_found_in_wider_window():
+    tracker = TrackingSearch(initial_window=20, expansion=2, max_levels=3)
+    search, calls = point_search((100, 100))
+    tracker.search(search, (0, 0, 400, 300))
+
+    search, calls = point_search((120, 100))
+    assert tracker.search(search, (0, 0, 400, 300)) == (True, (120, 100))
+    assert None not in calls
+    stats = tracker.get_stats()
+    assert stats["levels"][0]["hits"] == 0
+    assert sum(level["hits"] for level in stats["levels"]) == 1
+    assert stats["full_searches"] == 1
+
+
+def test_key_change_forgets_anchor():
+    tracker = TrackingSearch()
+    search, _ = point_search((100, 100))
+    tracker.search(search, (0, 0, 400, 300), key="a")
+    search, calls = point_search((100, 100))
+    tracker.search(search, (0, 0, 400, 300), key="b")
+    assert calls == [None]
+
+
+def test_color_detector_follows_target():
+    source = SyntheticScreenSource(size=(400, 300))
+    source.draw_rect(200, 150, 4, 4, (255, 0, 0))
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color("#FF0000")
+    detector.set_tolerance(0)
+    detector.set_tracking(True, initial_window=32)
+
+    assert detector.find_color_position(use_cache=False) == (True, (200, 150))
+    source.set_frame(source.grab_array() * 0)
+    source.draw_rect(210, 155, 4, 4, (255, 0, 0))
+    assert detector.find_color_position(use_cache=False) == (True, (210, 155))
+    assert detector.get_tracking_stats()["levels"][0]["hits"] == 1
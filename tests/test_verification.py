@@ -0,0 +1,108 @@
+"""
+Тесты проверки сохраненной позиции по патчу (ColorDetector, ImageProcessor)
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+from config import *
+from core.color_detection import ColorDetector
+from core.screen_source import SyntheticScreenSource
+
+
+class StrictScreenSource(SyntheticScreenSource):
+    """Экран, который, как mss, не захватывает регионы за краем"""
+
+    def grab_frame(self, region: tuple = None):
+        if region is not None:
+            left, top, width, height = region
+            screen_width, screen_height = self.screen_size()
+            assert left >= 0 and top >= 0 and left + width <= screen_width and top + height <= screen_height
+        return super().grab_frame(region)
+
+
+def color_detector(source) -> ColorDetector:
+    detector = ColorDetector(screen_source=source)
+    detector.set_target_color("#FF0000")
+    detector.set_tolerance(0)
+    detector.set_verify_every(1)
+    return detector
+
+
+def test_color_patch_follows_small_shift():
+    source = SyntheticScreenSource(size=(200, 100))
+    source.draw_rect(50, 40, 1, 1, (255, 0, 0))
+    detector = color_detector(source)
+    detector.last_found_position = (50, 40)
+    detector.clicks_since_last_search = 1
+
+    source.set_frame(np.zeros((100, 200, 3), dtype=np.uint8))
+    source.draw_rect(51, 41, 1, 1, (255, 0, 0))
+    assert not detector._recheck_needed()
+    assert detector.last_found_position == (51, 41)
+    assert detector.get_verify_stats() == {"verifications": 1, "failures": 0}
+
+
+def test_color_patch_failure_requests_full_search():
+    source = SyntheticScreenSource(size=(200, 100))
+    detector = color_detector(source)
+    detector.last_found_position = (50, 40)
+    detector.clicks_since_last_search = 1
+    assert detector._recheck_needed()
+    assert detector.get_verify_stats() == {"verifications": 1, "failures": 1}
+
+
+def test_color_patch_is_clamped_at_screen_edge():
+    source = StrictScreenSource(size=(200, 100))
+    source.draw_rect(199, 99, 1, 1, (255, 0, 0))
+    detector = color_detector(source)
+    detector.last_found_position = (199, 99)
+    detector.clicks_since_last_search = 1
+    assert not detector._recheck_needed()
+    assert detector.get_verify_stats() == {"verifications": 1, "failures": 0}
+
+
+def test_verify_every_counts_clicks():
+    source = SyntheticScreenSource(size=(200, 100))
+    source.draw_rect(50, 40, 1, 1, (255, 0, 0))
+    detector = color_detector(source)
+    detector.set_verify_every(3)
+    detector.last_found_position = (50, 40)
+    for clicks in (1, 2):
+        detector.clicks_since_last_search = clicks
+        assert not detector._recheck_needed()
+    assert detector.get_verify_stats()["verifications"] == 0
+
+
+@pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+def test_image_patch_verification(tmp_path):
+    from core.image_processing import ImageProcessor
+
+    screen = np.random.default_rng(12).integers(0, 256, (120, 200, 3), dtype=np.uint8)
+    path = str(tmp_path / "t.png")
+    Image.fromarray(screen[40:60, 100:130]).save(path)
+    source = SyntheticScreenSource(screen)
+    processor = ImageProcessor(screen_source=source)
+    processor.last_template_path = path
+    processor.last_found_position = (114, 49)  # на пиксель мимо центра (115, 50)
+
+    assert processor._verify_cached_position()
+    assert processor.last_found_position == (115, 50)
+
+    source.set_frame(np.zeros_like(screen))
+    assert not processor._verify_cached_position()
+
+
+@pytest.mark.skipif(not OPENCV_AVAILABLE, reason="OpenCV недоступен")
+def test_image_patch_is_clamped_at_screen_edge(tmp_path):
+    from core.image_processing import ImageProcessor
+
+    screen = np.random.default_rng(13).integers(0, 256, (120, 200, 3), dtype=np.uint8)
+    path = str(tmp_path / "corner.png")
+    Image.fromarray(screen[100:120, 170:200]).save(path)
+    processor = ImageProcessor(screen_source=StrictScreenSource(screen))
+    processor.last_template_path = path
+    processor.last_found_position = (185, 110)
+
+    assert processor._verify_cached_position()
+    assert processor.last_found_position == (185, 110)
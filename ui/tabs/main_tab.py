@@ -124,14 +124,14 @@ class MainTab:
         ttk.Checkbutton(settings_frame, text="Турбо режим (минимальная задержка)", 
                        variable=self.turbo_mode_var, command=self._toggle_turbo).pack(anchor=tk.W, pady=2)
         
-        # Экстремальный режим
-        if WIN32_AVAILABLE:
+        # Экстремальный режим (нужен бэкенд ввода без накладных расходов: win32, xtest, uinput)
+        if self.app.clicker.extreme_available():
             ttk.Checkbutton(settings_frame, text="⚡ ЭКСТРЕМАЛЬНЫЙ режим (до 10,000+ кликов/сек)", 
                            variable=self.extreme_mode_var, command=self._toggle_extreme).pack(anchor=tk.W, pady=2)
             ttk.Label(settings_frame, text="⚠️ Внимание: может вызвать нестабильность системы!", 
                      font=("Arial", 7), foreground="red").pack(anchor=tk.W, pady=(0, 5))
         else:
-            ttk.Label(settings_frame, text="Экстремальный режим (недоступно - установите pywin32)", 
+            ttk.Label(settings_frame, text="Экстремальный режим (недоступно - установите pywin32 или python-xlib)", 
                      foreground="gray", font=("Arial", 8)).pack(anchor=tk.W, pady=2)
                      
     def _setup_click_type(self):
@@ -13,12 +13,16 @@ import keyboard
 from typing import Optional, Callable
 
 from config import *
+from core.screen_source import get_screen_source
 
 
 class ColorPicker:
     """Пипетка для выбора цвета с экрана"""
     
-    def __init__(self):
+    def __init__(self, screen_source=None):
+        # Источник кадров (None - общий источник приложения)
+        self.screen_source = screen_source
+        
         # Состояние пипетки
         self.picking_active = False
         self.pick_thread = None
@@ -77,7 +81,9 @@ class ColorPicker:
                     if keyboard.is_pressed('space'):
                         # Получаем позицию курсора и цвет пикселя
                         x, y = pyautogui.position()
-                        pixel = pyautogui.screenshot().getpixel((x, y))
+                        # Захватываем только один пиксель под курсором
+                        source = self.screen_source or get_screen_source()
+                        pixel = source.pixel(x, y)
                         hex_color = f"#{pixel[0]:02x}{pixel[1]:02x}{pixel[2]:02x}"
                         
                         # Вызываем коллбэк с результатом
@@ -18,6 +18,11 @@ class SystemTrayManager:
         self.tray_icon = None
         self.running = False
         
+        # Иконки рисуются один раз; при смене статуса подставляется готовая
+        self.icons = {}
+        self.current_status = None
+        self.current_title = None
+        
         # Коллбэки
         self.on_show_callback = None
         self.on_start_callback = None
@@ -77,11 +82,14 @@ class SystemTrayManager:
             if self.tray_icon:
                 return True
                 
-            icon_image = self.create_icon("stopped")
+            self.icons = {status: self.create_icon(status) for status in ("running", "stopped")}
+            icon_image = self.icons["stopped"]
+            self.current_status = "stopped"
+            self.current_title = f"{APP_NAME} - Остановлен"
             self.tray_icon = Icon(
                 name=APP_NAME,
                 icon=icon_image,
-                title=f"{APP_NAME} - Остановлен",
+                title=self.current_title,
                 menu=self.create_menu()
             )
             
@@ -117,14 +125,18 @@ class SystemTrayManager:
             self.running = False
             
     def update_status(self, status, click_count=0):
-        """Обновление статуса трея"""
+        """Обновление статуса трея (иконка меняется только при смене статуса)"""
         if not self.tray_icon or not self.running:
             return
             
         try:
             # Обновляем иконку
-            new_icon = self.create_icon(status)
-            self.tray_icon.icon = new_icon
+            if status != self.current_status:
+                icon = self.icons.get(status)
+                if icon is None:
+                    icon = self.icons[status] = self.create_icon(status)
+                self.tray_icon.icon = icon
+                self.current_status = status
             
             # Обновляем заголовок
             if status == "running":
@@ -132,7 +144,9 @@ class SystemTrayManager:
             else:
                 title = f"{APP_NAME} - Остановлен"
                 
-            self.tray_icon.title = title
+            if title != self.current_title:
+                self.tray_icon.title = title
+                self.current_title = title
             
         except Exception as e:
             print(f"Ошибка при обновлении статуса трея: {e}")
@@ -14,14 +14,18 @@ import uuid
 from typing import Optional, Callable, Tuple
 
 from config import *
+from core.screen_source import get_screen_source
 
 
 class TemplateCapture:
     """Захват шаблонов изображений с экрана"""
     
-    def __init__(self, overlay_manager):
+    def __init__(self, overlay_manager, screen_source=None):
         self.overlay_manager = overlay_manager
         
+        # Источник кадров (None - общий источник приложения)
+        self.screen_source = screen_source
+        
         # Состояние захвата
         self.capture_active = False
         self.capture_thread = None
@@ -33,6 +37,10 @@ class TemplateCapture:
         """Установка коллбэков"""
         self.callbacks.update(callbacks)
         
+    def _get_screen_source(self):
+        """Текущий источник кадров"""
+        return self.screen_source or get_screen_source()
+        
     def capture_template(self, callback: Optional[Callable] = None) -> Optional[str]:
         """Запуск захвата шаблона"""
         if self.capture_active:
@@ -166,7 +174,7 @@ class TemplateCapture:
              
             if width > 5 and height > 5:  # Минимальный размер
                 # Делаем скриншот области
-                screenshot = pyautogui.screenshot(region=(left, top, width, height))
+                screenshot = self._get_screen_source().grab((left, top, width, height))
                 
                 # Сохраняем временный файл
                 template_path = f"{TEMP_TEMPLATE_PREFIX}{uuid.uuid4().hex[:8]}.png"
@@ -253,7 +261,7 @@ class TemplateCapture:
                 return None
                 
             # Делаем скриншот области
-            screenshot = pyautogui.screenshot(region=(left, top, width, height))
+            screenshot = self._get_screen_source().grab((left, top, width, height))
             
             # Сохраняем временный файл
             template_path = f"{TEMP_TEMPLATE_PREFIX}{uuid.uuid4().hex[:8]}.png"